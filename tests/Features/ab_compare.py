@@ -0,0 +1,142 @@
+"""
+Compare two deployments or builds: run the same tests against both, interleaved, and report per-route and per-step
+deltas of B against A with bootstrap confidence intervals.
+
+    python ab_compare.py prod preview --repetitions 10 -- -k "TL001 or DF002"
+    python ab_compare.py http://localhost:3100 http://localhost:3200 --markdown delta.md -- test_timeline.py
+
+Targets are names from config.TARGETS or URLs. Everything after -- is passed to pytest.
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+
+import config
+import results_store
+
+
+REPETITIONS = 8
+MIN_RUNS = 3
+BOOTSTRAP_RESAMPLES = 2000
+CONFIDENCE = 0.95
+ROUTE_METRICS = ("ttfb", "load")
+
+ROUTE_SAMPLES_SQL = """
+select m.run_id, 'route ' || m.route || ' ' || m.metric, m.value
+from page_metrics m join runs r on r.id = m.run_id
+where r.target_url = ? and m.metric in ({})
+""".format(", ".join("?" for _ in ROUTE_METRICS))
+# Steps of failed tests are left out; a failure usually ends a step early.
+STEP_SAMPLES_SQL = """
+select s.run_id, 'step ' || s.test_id || ' ' || s.step, s.seconds * 1000
+from step_timings s
+join runs r on r.id = s.run_id
+join results t on t.run_id = s.run_id and t.test_id = s.test_id
+where r.target_url = ? and t.outcome = 'passed'
+"""
+
+
+def run_interleaved(a: str, b: str, repetitions: int, store: str, pytest_args: list[str]) -> int:
+    """
+    Run pytest against A and B `repetitions` times each, alternating ABBA so drift over time hits both sides equally.
+    Returns the number of pytest runs that had failures.
+    """
+    failed_runs = 0
+    for repetition in range(repetitions):
+        for target in (a, b) if repetition % 2 == 0 else (b, a):
+            print(f"repetition {repetition + 1}/{repetitions}: {target}", flush=True)
+            result = subprocess.run(
+                [sys.executable, "-m", "pytest", "-q", f"--target={target}", f"--results-db={store}", *pytest_args],
+                cwd=os.path.dirname(os.path.abspath(__file__)),
+            )
+            failed_runs += result.returncode != 0
+    return failed_runs
+
+
+def per_run_medians(conn: sqlite3.Connection, target_url: str) -> dict[str, list[float]]:
+    """
+    One median per run for every route metric and test step measured against the target, in ms.
+    """
+    samples: dict[str, dict[int, list[float]]] = {}
+    rows = conn.execute(ROUTE_SAMPLES_SQL, (target_url, *ROUTE_METRICS)).fetchall() + conn.execute(STEP_SAMPLES_SQL, (target_url,)).fetchall()
+    for run_id, name, value in rows:
+        samples.setdefault(name, {}).setdefault(run_id, []).append(value)
+    return {name: [statistics.median(values) for _, values in sorted(runs.items())] for name, runs in samples.items()}
+
+
+def bootstrap_delta(a: list[float], b: list[float], rng: random.Random) -> tuple[float, float, float]:
+    """
+    Difference of medians (B - A) with its bootstrap confidence interval.
+    """
+    diffs = sorted(
+        statistics.median(rng.choices(b, k=len(b))) - statistics.median(rng.choices(a, k=len(a)))
+        for _ in range(BOOTSTRAP_RESAMPLES)
+    )
+    tail = (1 - CONFIDENCE) / 2
+    return statistics.median(b) - statistics.median(a), diffs[int(tail * BOOTSTRAP_RESAMPLES)], diffs[int((1 - tail) * BOOTSTRAP_RESAMPLES) - 1]
+
+
+def compare(conn: sqlite3.Connection, a_url: str, b_url: str) -> list[dict]:
+    rng = random.Random(0)
+    a_series, b_series = per_run_medians(conn, a_url), per_run_medians(conn, b_url)
+    rows = []
+    for name in sorted(set(a_series) & set(b_series)):
+        a, b = a_series[name], b_series[name]
+        if len(a) < MIN_RUNS or len(b) < MIN_RUNS:
+            continue
+        delta, low, high = bootstrap_delta(a, b, rng)
+        base = statistics.median(a)
+        verdict = "slower" if low > 0 else "faster" if high < 0 else "no clear change"
+        rows.append({"name": name, "a": base, "b": statistics.median(b), "delta": delta, "low": low, "high": high,
+                     "relative": delta / base if base else 0.0, "verdict": verdict, "runs": min(len(a), len(b))})
+    # Routes before steps, biggest relative change first.
+    return sorted(rows, key=lambda row: (not row["name"].startswith("route"), -abs(row["relative"])))
+
+
+def format_rows(rows: list[dict], markdown: bool) -> list[str]:
+    header = ["", "A ms", "B ms", "delta ms", "delta", f"{CONFIDENCE:.0%} CI ms", "runs", "verdict"]
+    cells = [
+        [row["name"], f"{row['a']:.0f}", f"{row['b']:.0f}", f"{row['delta']:+.0f}", f"{row['relative']:+.1%}",
+         f"[{row['low']:+.0f}, {row['high']:+.0f}]", str(row["runs"]), row["verdict"]]
+        for row in rows
+    ]
+    if markdown:
+        return ["| " + " | ".join(header) + " |", "|" + "---|" * len(header)] + ["| " + " | ".join(cell) + " |" for cell in cells]
+    width = max([len(row["name"]) for row in rows] + [10]) + 2
+    lines = [f"{header[0]:<{width}}" + "".join(f"{column:>14}" for column in header[1:-1]) + f"  {header[-1]}"]
+    lines += [f"{cell[0]:<{width}}" + "".join(f"{column:>14}" for column in cell[1:-1]) + f"  {cell[-1]}" for cell in cells]
+    return lines
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("a", help="Baseline target, e.g. prod.")
+    parser.add_argument("b", help="Candidate target, e.g. preview.")
+    parser.add_argument("--repetitions", type=int, default=REPETITIONS)
+    parser.add_argument("--store", default=None, help="Keep the runs in this SQLite file instead of a temporary one.")
+    parser.add_argument("--markdown", default=None, help="Also write the table as Markdown, e.g. for a PR comment.")
+    parser.add_argument("pytest_args", nargs=argparse.REMAINDER)
+    args = parser.parse_args()
+
+    a_url, b_url = config.resolve_target(args.a), config.resolve_target(args.b)
+    pytest_args = args.pytest_args[1:] if args.pytest_args[:1] == ["--"] else args.pytest_args
+    # Without --store the runs go to a scratch file that is removed with its directory once compared.
+    with tempfile.TemporaryDirectory() as scratch:
+        store = args.store or os.path.join(scratch, "ab_runs.sqlite")
+        failed_runs = run_interleaved(args.a, args.b, args.repetitions, store, pytest_args)
+        conn = results_store.connect(store)
+        rows = compare(conn, a_url, b_url)
+        conn.close()
+    print(f"\nA = {a_url}\nB = {b_url}")
+    if failed_runs:
+        print(f"{failed_runs} pytest run(s) had failures; their failed tests are left out of the step timings.")
+    print("\n".join(format_rows(rows, markdown=False)) if rows else f"Fewer than {MIN_RUNS} comparable runs per side.")
+    if args.markdown and rows:
+        with open(args.markdown, "w", encoding="utf-8") as f:
+            f.write(f"Performance of {b_url} against {a_url} ({args.repetitions} interleaved runs each)\n\n")
+            f.write("\n".join(format_rows(rows, markdown=True)) + "\n")
@@ -0,0 +1,169 @@
+import statistics
+
+import requests
+
+from api_client import CHUNK_PATTERN, SERVER_REFERENCE_PATTERN
+from throttling import route_of
+
+
+STORAGE_KEY = "__actionTimings"
+TOP_ACTIONS = 3
+FETCH_TIMEOUT = 10
+
+# Installed with Page.addScriptToEvaluateOnNewDocument, so it wraps fetch before the app's own scripts run.
+# Server actions are fetch POSTs carrying a Next-Action header. Each call is timed as:
+#   server: request sent to first response byte, from the call's Resource Timing entry (headers received if none)
+#   bytes:  encoded response body size, i.e. the flight payload on the wire
+#   client: body fully received until the next frame has painted, i.e. React applying the result
+# Calls are kept in sessionStorage so they survive the full page loads of driver.get and form redirects.
+INSTALL_JS = f"""
+(() => {{
+    if (window.__actionTimingInstalled) return;
+    window.__actionTimingInstalled = true;
+    let firstInput = null;
+    for (const type of ['pointerdown', 'keydown']) {{
+        addEventListener(type, () => {{ if (firstInput === null) firstInput = performance.now(); }}, {{capture: true}});
+    }}
+    performance.setResourceTimingBufferSize(1000);
+    const claimed = new WeakSet();
+    const save = call => {{
+        try {{
+            const calls = JSON.parse(sessionStorage.getItem('{STORAGE_KEY}') || '[]');
+            calls.push(call);
+            sessionStorage.setItem('{STORAGE_KEY}', JSON.stringify(calls));
+        }} catch (e) {{}}
+    }};
+    const originalFetch = window.fetch;
+    window.fetch = async function (input, init) {{
+        const headers = new Headers(init && init.headers ? init.headers : input instanceof Request ? input.headers : undefined);
+        const id = headers.get('Next-Action');
+        if (!id) return originalFetch.apply(this, arguments);
+        const url = new URL(input instanceof Request ? input.url : String(input), location.href).href;
+        const start = performance.now();
+        const call = {{id, page: location.pathname, phase: firstInput === null || start < firstInput ? 'load' : 'interaction'}};
+        const response = await originalFetch.apply(this, arguments);
+        const headersReceived = performance.now();
+        response.clone().arrayBuffer().then(body => {{
+            const received = performance.now();
+            requestAnimationFrame(() => setTimeout(() => {{
+                const settled = performance.now();
+                const timing = performance.getEntriesByType('resource').find(
+                    r => r.initiatorType === 'fetch' && r.name === url && r.startTime >= start - 1 && !claimed.has(r)
+                );
+                if (timing) claimed.add(timing);
+                save({{
+                    ...call,
+                    status: response.status,
+                    total: settled - start,
+                    server: timing && timing.responseStart ? timing.responseStart - timing.requestStart : headersReceived - start,
+                    bytes: timing && timing.encodedBodySize ? timing.encodedBodySize : body.byteLength,
+                    client: settled - received,
+                }});
+            }}));
+        }}, () => {{}});
+        return response;
+    }};
+}})();
+"""
+# Returns and clears the calls recorded so far, with the page's scripts for resolving action IDs to names.
+# Pages other than the app's (about:blank, data: URLs) have no sessionStorage and report nothing.
+COLLECT_JS = f"""
+(() => {{
+    try {{
+        const calls = JSON.parse(sessionStorage.getItem('{STORAGE_KEY}') || '[]');
+        sessionStorage.removeItem('{STORAGE_KEY}');
+        const scripts = performance.getEntriesByType('resource').filter(r => r.initiatorType === 'script').map(r => r.name);
+        return {{calls, scripts: [...new Set([...Array.from(document.scripts, s => s.src), ...scripts])]}};
+    }} catch (e) {{
+        return null;
+    }}
+}})()
+"""
+
+
+class ActionAttribution:
+    """
+    Server-action calls made by the pages the tests drive, named and attributed to the route and phase
+    (page load, or after the first user input) they were made in.
+
+    Action IDs change with every build; they are resolved to names from the `createServerReference` calls in the
+    client chunks the browser loaded, the same table api_client reads to call actions directly.
+    """
+
+    def __init__(self):
+        self.names: dict[str, str] = {}
+        self.calls: list[dict] = []
+        self._scanned: set[str] = set()
+
+    def install(self, target, backend, nodeid: str, timings: dict[str, list[dict]]):
+        """
+        Wrap fetch in every document the tab loads, and collect the calls before each target.get leaves the page.
+        Call `collect` once more before the browser quits for the calls of the last page.
+        """
+        backend.cdp("Page.addScriptToEvaluateOnNewDocument", {"source": INSTALL_JS})
+        original_get = target.get
+
+        def get(url: str):
+            self.collect(backend.evaluate, nodeid, timings)
+            original_get(url)
+
+        target.get = get
+
+    def collect(self, evaluate, nodeid: str, timings: dict[str, list[dict]]):
+        """
+        Move the calls recorded in the tab into `calls`, and each call's timing into `timings` under `action <name>`.
+        """
+        try:
+            recorded = evaluate(COLLECT_JS)
+        except Exception:
+            return
+        if not recorded or not recorded["calls"]:
+            return
+        self._resolve(recorded["scripts"])
+        for call in recorded["calls"]:
+            name = self.names.get(call["id"], f"unknown {call['id'][:12]}")
+            self.calls.append({**call, "name": name, "route": route_of(call["page"]), "nodeid": nodeid})
+            timings.setdefault(f"action {name}", []).append(
+                {"total": call["total"], "server": call["server"], "client": call["client"], "bytes": call["bytes"]}
+            )
+
+    def _resolve(self, scripts: list[str]):
+        for url in scripts:
+            if url in self._scanned or not CHUNK_PATTERN.search(url):
+                continue
+            self._scanned.add(url)
+            try:
+                source = requests.get(url, timeout=FETCH_TIMEOUT).text
+            except requests.RequestException:
+                continue
+            self.names.update({found: action for found, action in SERVER_REFERENCE_PATTERN.findall(source)})
+
+    def report_lines(self) -> list[str]:
+        """
+        Per route and phase, slowest first: the time spent in server actions and the actions behind it, each split
+        into median server time, payload size and client processing.
+        """
+        groups: dict[tuple[str, str], list[dict]] = {}
+        for call in self.calls:
+            groups.setdefault((call["route"], call["phase"]), []).append(call)
+
+        lines = [f"{'':<40}{'calls':>6}{'total ms':>10}{'server':>8}{'kB':>8}{'client':>8}"]
+        for (route, phase), calls in sorted(groups.items(), key=lambda g: -sum(c["total"] for c in g[1])):
+            by_action: dict[str, list[dict]] = {}
+            for call in calls:
+                by_action.setdefault(call["name"], []).append(call)
+            ranked = sorted(by_action.items(), key=lambda a: -sum(c["total"] for c in a[1]))
+            lines.append(f"{route} ({phase}): {sum(c['total'] for c in calls):.0f} ms in server actions, mostly {ranked[0][0]}")
+            for name, action_calls in ranked[:TOP_ACTIONS]:
+                lines.append(
+                    f"  {name:<38}{len(action_calls):>6}{sum(c['total'] for c in action_calls):>10.0f}"
+                    f"{statistics.median(c['server'] for c in action_calls):>8.0f}"
+                    f"{statistics.median(c['bytes'] for c in action_calls) / 1024:>8.1f}"
+                    f"{statistics.median(c['client'] for c in action_calls):>8.0f}"
+                )
+            if len(ranked) > TOP_ACTIONS:
+                lines.append(f"  ... {len(ranked) - TOP_ACTIONS} more action(s)")
+        unresolved = sorted({c["id"] for c in self.calls if c["id"] not in self.names})
+        if unresolved:
+            lines += ["", f"{len(unresolved)} action ID(s) not found in the loaded client chunks: {', '.join(unresolved)}"]
+        return lines
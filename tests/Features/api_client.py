@@ -0,0 +1,226 @@
+import base64
+import json
+import re
+from datetime import datetime, timezone
+from urllib.parse import urljoin, urlparse
+
+import requests
+
+
+# @supabase/ssr splits auth cookies longer than this into name.0, name.1, ...
+COOKIE_CHUNK_SIZE = 3180
+CHUNK_PATTERN = re.compile(r"""/_next/static/chunks/[^"'\\\s]+?\.js""")
+# Client bundles reference actions as createServerReference("<id>", callServer, void 0, findSourceMapURL, "<name>").
+SERVER_REFERENCE_PATTERN = re.compile(r"""createServerReference\)?\(\s*"([0-9a-f]{40,})"[^"]*?"(\w+)"\s*\)""")
+# Page whose client bundle imports each action, used both to discover its ID and as the POST target.
+ACTION_PAGES = {
+    "getDoctors": "/patient/book",
+    "getOrganisations": "/patient/book",
+    "getAvailableSlots": "/patient/book",
+    "createAppointment": "/patient/book",
+    "getPatientTimeline": "/timeline",
+    "updateProfile": "/profile",
+}
+
+
+class ServerActionError(Exception):
+    pass
+
+
+class FormData(dict):
+    """
+    Fields of a FormData argument, for actions such as createAppointment(formData).
+    """
+
+
+def encode_reply(value, forms: list[FormData] | None = None):
+    """
+    Encode action arguments the way React's encodeReply does for plain JSON values, datetimes and FormData.
+    FormData arguments are appended to `forms` and referenced as $K<n>; their fields travel as multipart parts.
+    """
+    if isinstance(value, FormData):
+        forms.append(value)
+        return f"$K{len(forms):x}"
+    if isinstance(value, datetime):
+        return "$D" + value.astimezone(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+    if isinstance(value, str):
+        return "$" + value if value.startswith("$") else value
+    if isinstance(value, dict):
+        return {key: encode_reply(item, forms) for key, item in value.items() if item is not None}
+    if isinstance(value, (list, tuple)):
+        return [encode_reply(item, forms) for item in value]
+    return value
+
+
+def parse_flight(body: bytes) -> dict[str, object]:
+    """
+    Split an RSC flight response into its rows. JSON rows are decoded, text rows kept as strings,
+    and other tagged rows stored as (tag, payload).
+    """
+    rows: dict[str, object] = {}
+    i = 0
+    while i < len(body):
+        colon = body.index(b":", i)
+        row_id = body[i:colon].decode()
+        i = colon + 1
+        if body[i:i + 1] == b"T":
+            comma = body.index(b",", i)
+            length = int(body[i + 1:comma], 16)
+            rows[row_id] = body[comma + 1:comma + 1 + length].decode()
+            i = comma + 1 + length
+            continue
+        end = body.find(b"\n", i)
+        end = len(body) if end == -1 else end
+        line = body[i:end].decode()
+        i = end + 1
+        if line[:1].isupper():
+            rows[row_id] = (line[0], line[1:])
+        elif line:
+            rows[row_id] = json.loads(line)
+    return rows
+
+
+def resolve_flight(value, rows: dict[str, object]):
+    if isinstance(value, list):
+        return [resolve_flight(item, rows) for item in value]
+    if isinstance(value, dict):
+        return {key: resolve_flight(item, rows) for key, item in value.items()}
+    if not isinstance(value, str) or not value.startswith("$"):
+        return value
+    if value.startswith("$$"):
+        return value[1:]
+    if value == "$undefined":
+        return None
+    if value.startswith("$D"):
+        return datetime.fromisoformat(value[2:].replace("Z", "+00:00"))
+    reference = value[2:] if value.startswith("$@") else value[1:]
+    row_id, *path = reference.split(":")
+    if row_id not in rows or not re.fullmatch(r"[0-9a-f]+", row_id):
+        raise ServerActionError(f"Unsupported flight value {value!r}")
+    row = rows[row_id]
+    if isinstance(row, tuple):
+        tag, payload = row
+        raise ServerActionError(f"Server action failed: {payload}" if tag == "E" else f"Unsupported flight row {tag}")
+    resolved = resolve_flight(row, rows)
+    for key in path:
+        resolved = resolved[int(key)] if isinstance(resolved, list) else resolved[key]
+    return resolved
+
+
+class AppSession:
+    """
+    A logged-in role that talks to Supabase and the app's server actions over plain HTTP, without a browser.
+    """
+
+    def __init__(self, base_url: str, supabase_url: str, anon_key: str, email: str, password: str,
+                 action_ids: dict[str, str] | None = None):
+        self.base_url = base_url
+        self.supabase_url = supabase_url.rstrip("/")
+        self.anon_key = anon_key
+        self.http = requests.Session()
+
+        response = self.http.post(
+            f"{self.supabase_url}/auth/v1/token?grant_type=password",
+            headers={"apikey": anon_key},
+            json={"email": email, "password": password},
+        )
+        response.raise_for_status()
+        self.auth = response.json()
+        self.user_id = self.auth["user"]["id"]
+        self._set_auth_cookies()
+        # Sessions of one deployment can share this table, so only the first of them scans the client chunks.
+        self.action_ids: dict[str, str] = {} if action_ids is None else action_ids
+
+    @property
+    def cookie_name(self) -> str:
+        return f"sb-{urlparse(self.supabase_url).hostname.split('.')[0]}-auth-token"
+
+    def _set_auth_cookies(self, expires_at: int | None = None):
+        # Same storage key and base64url cookie encoding as @supabase/ssr, so middleware and actions see a normal session.
+        session = dict(self.auth)
+        session.setdefault("expires_at", int(datetime.now(timezone.utc).timestamp()) + session.get("expires_in", 3600))
+        if expires_at is not None:
+            session["expires_at"] = expires_at
+        encoded = "base64-" + base64.urlsafe_b64encode(json.dumps(session).encode()).decode().rstrip("=")
+        name = self.cookie_name
+        domain = urlparse(self.base_url).hostname
+        for cookie in [c for c in self.http.cookies if c.name.split(".")[0] == name]:
+            self.http.cookies.clear(cookie.domain, cookie.path, cookie.name)
+        chunks = [encoded[i:i + COOKIE_CHUNK_SIZE] for i in range(0, len(encoded), COOKIE_CHUNK_SIZE)]
+        if len(chunks) == 1:
+            self.http.cookies.set(name, encoded, domain=domain)
+        else:
+            for index, chunk in enumerate(chunks):
+                self.http.cookies.set(f"{name}.{index}", chunk, domain=domain)
+
+    def expire(self):
+        """
+        Mark the cookie session as expired, as it is after an hour in the browser, so the next request makes
+        middleware refresh it.
+        """
+        self._set_auth_cookies(expires_at=int(datetime.now(timezone.utc).timestamp()) - 60)
+
+    def adopt_session(self, response: requests.Response) -> bool:
+        """
+        Take over the session middleware wrote into `response` after refreshing it, as the browser would.
+        Refresh tokens are single-use, so the old one is no good once middleware has spent it. Returns whether the
+        response carried a session.
+        """
+        cookies = {cookie.name: cookie.value for cookie in response.cookies if cookie.name.split(".")[0] == self.cookie_name}
+        encoded = cookies.get(self.cookie_name) or "".join(cookies[name] for name in sorted(cookies, key=lambda n: int(n.rsplit(".", 1)[1])))
+        if not encoded.startswith("base64-"):
+            return False
+        payload = encoded[len("base64-"):]
+        self.auth = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        self._set_auth_cookies()
+        return True
+
+    def rest(self, table: str, **params) -> list[dict]:
+        """
+        Query Supabase PostgREST as this user, e.g. rest("profiles", id=f"eq.{uid}", select="phone").
+        """
+        response = self.http.get(
+            f"{self.supabase_url}/rest/v1/{table}",
+            params=params,
+            headers={"apikey": self.anon_key, "Authorization": f"Bearer {self.auth['access_token']}"},
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def action_id(self, name: str) -> str:
+        """
+        Find an action's ID in the client chunks of the page that imports it. IDs change with every deployment.
+        """
+        if name not in self.action_ids:
+            page = self.http.get(f"{self.base_url}{ACTION_PAGES[name]}")
+            page.raise_for_status()
+            for chunk in dict.fromkeys(CHUNK_PATTERN.findall(page.text)):
+                source = self.http.get(urljoin(self.base_url, chunk)).text
+                self.action_ids.update({action: found for found, action in SERVER_REFERENCE_PATTERN.findall(source)})
+            if name not in self.action_ids:
+                raise ServerActionError(f"Server action {name} not found in the client chunks of {ACTION_PAGES[name]}")
+        return self.action_ids[name]
+
+    def action(self, name: str, *args):
+        """
+        Call a server action with the same request a client component would send, and return its decoded result.
+        """
+        forms: list[FormData] = []
+        body = json.dumps(encode_reply(list(args), forms))
+        headers = {"Next-Action": self.action_id(name), "Accept": "text/x-component"}
+        if forms:
+            # With FormData among the arguments the whole reply is multipart: the JSON as part 0, then each form's fields.
+            parts = [("0", (None, body))]
+            parts += [(f"{n}_{key}", (None, value)) for n, form in enumerate(forms, 1) for key, value in form.items()]
+            response = self.http.post(f"{self.base_url}{ACTION_PAGES[name]}", files=parts, headers=headers)
+        else:
+            response = self.http.post(
+                f"{self.base_url}{ACTION_PAGES[name]}", data=body, headers={**headers, "Content-Type": "text/plain;charset=UTF-8"}
+            )
+        if "text/x-component" not in response.headers.get("content-type", ""):
+            raise ServerActionError(f"{name} returned HTTP {response.status_code} without a flight payload")
+        rows = parse_flight(response.content)
+        root = rows.get("0")
+        if not isinstance(root, dict) or "a" not in root:
+            raise ServerActionError(f"{name} returned no action result (HTTP {response.status_code})")
+        return resolve_flight(root["a"], rows)
@@ -0,0 +1,73 @@
+"""
+Compare per-command latency of the WebDriver and CDP backends on the login page.
+
+    python backend_benchmark.py --repetitions 50 --headless
+"""
+import argparse
+import statistics
+import time
+
+import config
+from backends import BACKENDS, CDPBackend
+from results_store import percentile
+
+
+OPERATIONS = {
+    "evaluate": lambda b: b.evaluate("1 + 1"),
+    "title": lambda b: b.title(),
+    "wait_for_selector": lambda b: b.wait_for_selector("#email"),
+    "type": lambda b: b.type("#password", "x"),
+    "click": lambda b: b.click("#email"),
+}
+
+
+def measure(operation, backend, repetitions: int) -> list[float]:
+    samples = []
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        operation(backend)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def measure_pipelined(backend: CDPBackend, repetitions: int) -> list[float]:
+    """
+    Per-command latency when `repetitions` evaluations are sent as one pipelined batch.
+    """
+    commands = [("Runtime.evaluate", {"expression": "1 + 1", "returnByValue": True})] * repetitions
+    start = time.perf_counter()
+    backend.pipeline(commands)
+    return [(time.perf_counter() - start) * 1000 / repetitions]
+
+
+def run(repetitions: int, headless: bool) -> dict[str, dict[str, list[float]]]:
+    results = {}
+    for name, backend_cls in BACKENDS.items():
+        backend = backend_cls.launch(headless=headless)
+        try:
+            backend.get(f"{config.BASE_URL}/login")
+            backend.wait_for_selector("#email", 15)
+            results[name] = {op: measure(fn, backend, repetitions) for op, fn in OPERATIONS.items()}
+            if isinstance(backend, CDPBackend):
+                results[name]["evaluate (pipelined)"] = measure_pipelined(backend, repetitions)
+        finally:
+            backend.quit()
+    return results
+
+
+def print_report(results: dict[str, dict[str, list[float]]]):
+    print(f"{'operation':<24}{'backend':<12}{'median ms':>12}{'p95 ms':>12}")
+    operations = dict.fromkeys(op for per_backend in results.values() for op in per_backend)
+    for op in operations:
+        for name, per_backend in results.items():
+            if op in per_backend:
+                samples = per_backend[op]
+                print(f"{op:<24}{name:<12}{statistics.median(samples):>12.2f}{percentile(samples, 0.95):>12.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repetitions", type=int, default=30)
+    parser.add_argument("--headless", action="store_true")
+    args = parser.parse_args()
+    print_report(run(args.repetitions, args.headless))
@@ -0,0 +1,138 @@
+import asyncio
+import json
+
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from cdp import CDPBrowser, CDPPage
+from login import get_driver
+
+
+def xpath_count_js(xpath: str) -> str:
+    """
+    JavaScript expression counting the nodes matching an XPath, for use with `evaluate` and `wait_until`.
+    """
+    return f"document.evaluate({json.dumps(xpath)}, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null).snapshotLength"
+
+
+class WebDriverBackend:
+    """
+    The browser operations used by login and the test helpers, issued as WebDriver HTTP commands.
+    """
+
+    name = "webdriver"
+
+    def __init__(self, driver: webdriver.Edge | webdriver.Chrome):
+        self.driver = driver
+
+    @classmethod
+    def launch(cls, headless: bool = False) -> "WebDriverBackend":
+        return cls(get_driver(headless=headless))
+
+    def get(self, url: str):
+        self.driver.get(url)
+
+    def wait_for_selector(self, selector: str, timeout: float = 10):
+        try:
+            WebDriverWait(self.driver, timeout).until(EC.visibility_of_element_located((By.CSS_SELECTOR, selector)))
+        except TimeoutException:
+            raise TimeoutError(f"FAILED: selector {selector} not found within {timeout}s")
+
+    def wait_until(self, condition: str, timeout: float = 10):
+        try:
+            return WebDriverWait(self.driver, timeout).until(lambda d: d.execute_script(f"try {{ return ({condition}); }} catch (e) {{ return false; }}"))
+        except TimeoutException:
+            raise TimeoutError(f"FAILED: condition not met within {timeout}s: {condition}")
+
+    def wait_for_title(self, title: str, timeout: float = 10):
+        try:
+            WebDriverWait(self.driver, timeout).until(EC.title_is(title))
+        except TimeoutException:
+            raise TimeoutError(f"FAILED: title did not become '{title}' within {timeout}s")
+
+    def type(self, selector: str, text: str):
+        self.driver.find_element(By.CSS_SELECTOR, selector).send_keys(text)
+
+    def click(self, selector: str):
+        self.driver.find_element(By.CSS_SELECTOR, selector).click()
+
+    def evaluate(self, expression: str):
+        return self.driver.execute_script(f"return ({expression});")
+
+    def cdp(self, method: str, params: dict | None = None) -> dict:
+        return self.driver.execute_cdp_cmd(method, params or {})
+
+    def title(self) -> str:
+        return self.driver.title
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+
+
+class CDPBackend:
+    """
+    The same operations over one DevTools websocket. Each call blocks like its WebDriver counterpart;
+    use `pipeline` to send several raw commands in one round trip.
+    """
+
+    name = "cdp"
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, browser: CDPBrowser, page: CDPPage):
+        self._loop = loop
+        self.browser = browser
+        self.page = page
+
+    @classmethod
+    def launch(cls, headless: bool = False) -> "CDPBackend":
+        loop = asyncio.new_event_loop()
+        browser = loop.run_until_complete(CDPBrowser.launch(headless=headless))
+        page = loop.run_until_complete(browser.new_page())
+        return cls(loop, browser, page)
+
+    def run(self, coroutine):
+        return self._loop.run_until_complete(coroutine)
+
+    def get(self, url: str):
+        self.run(self.page.get(url))
+
+    def wait_for_selector(self, selector: str, timeout: float = 10):
+        self.run(self.page.wait_for_selector(selector, timeout))
+
+    def wait_until(self, condition: str, timeout: float = 10):
+        return self.run(self.page.wait_until(condition, timeout))
+
+    def wait_for_title(self, title: str, timeout: float = 10):
+        self.run(self.page.wait_for_title(title, timeout))
+
+    def type(self, selector: str, text: str):
+        self.run(self.page.type(selector, text))
+
+    def click(self, selector: str):
+        self.run(self.page.click(selector))
+
+    def evaluate(self, expression: str):
+        return self.run(self.page.evaluate(expression))
+
+    def cdp(self, method: str, params: dict | None = None) -> dict:
+        return self.run(self.page.send(method, params))
+
+    def title(self) -> str:
+        return self.run(self.page.title())
+
+    def pipeline(self, commands: list[tuple[str, dict | None]]) -> list[dict]:
+        return self.run(self.page.pipeline(commands))
+
+    def quit(self):
+        try:
+            self.run(self.browser.close())
+        finally:
+            self._loop.close()
+
+
+BACKENDS = {backend.name: backend for backend in (WebDriverBackend, CDPBackend)}
@@ -0,0 +1,103 @@
+import json
+import os
+import statistics
+
+from results_store import percentile
+
+
+BASELINES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".benchmarks")
+DEFAULT_WARMUP = 2
+# A step whose median is this much above the baseline median is reported as a regression.
+REGRESSION_TOLERANCE = 0.10
+# ...and at least this many ms slower, so sub-millisecond steps such as teardown do not flag on noise.
+REGRESSION_MIN_MS = 20
+# Tukey's fences: samples more than OUTLIER_FENCE interquartile ranges outside the quartiles are discarded.
+OUTLIER_FENCE = 1.5
+
+
+def iteration_steps(reports, routes: dict[str, list[dict]]) -> dict[str, float]:
+    """
+    The steps of one iteration in ms: the setup (browser launch and login), call and teardown phases, plus the
+    load time of every route the test opened. A route opened twice in one iteration counts once, by its mean.
+    Other recorded metrics (server actions, propagation, test measurements) have no load time and are not steps.
+    """
+    steps = {report.when: report.duration * 1000 for report in reports}
+    for route, samples in routes.items():
+        if "load" not in samples[0]:
+            continue
+        steps[f"load {route}"] = statistics.mean(sample["load"] for sample in samples)
+    return steps
+
+
+def split_outliers(samples: list[float]) -> tuple[list[float], list[float]]:
+    """
+    (kept, discarded) by Tukey's fences. Fewer than four samples have no meaningful quartiles and are all kept.
+    """
+    if len(samples) < 4:
+        return list(samples), []
+    q1, q3 = percentile(samples, 0.25), percentile(samples, 0.75)
+    low, high = q1 - OUTLIER_FENCE * (q3 - q1), q3 + OUTLIER_FENCE * (q3 - q1)
+    return [s for s in samples if low <= s <= high], [s for s in samples if not low <= s <= high]
+
+
+def summarize(samples: list[float]) -> dict:
+    kept, discarded = split_outliers(samples)
+    return {
+        "min": min(kept),
+        "median": statistics.median(kept),
+        "p95": percentile(kept, 0.95),
+        "stddev": statistics.stdev(kept) if len(kept) > 1 else 0.0,
+        "kept": len(kept),
+        "outliers": len(discarded),
+    }
+
+
+def summarize_all(samples: dict[str, dict[str, list[float]]]) -> dict[str, dict[str, dict]]:
+    """
+    Per test and step statistics from {test ID: {step: [ms per measured iteration]}}.
+    """
+    return {test: {step: summarize(values) for step, values in steps.items() if values} for test, steps in samples.items() if steps}
+
+
+def baseline_path(name: str) -> str:
+    return os.path.join(BASELINES_DIR, f"{name}.json")
+
+
+def save_baseline(name: str, summary: dict[str, dict[str, dict]]):
+    os.makedirs(BASELINES_DIR, exist_ok=True)
+    with open(baseline_path(name), "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+
+
+def load_baseline(name: str) -> dict[str, dict[str, dict]]:
+    with open(baseline_path(name), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def regressed(stats: dict, base: dict) -> bool:
+    return stats["median"] > base["median"] * (1 + REGRESSION_TOLERANCE) and stats["median"] - base["median"] >= REGRESSION_MIN_MS
+
+
+def report_lines(summary: dict[str, dict[str, dict]], baseline: dict[str, dict[str, dict]] | None = None) -> list[str]:
+    lines = [f"{'test / step':<58}{'min':>9}{'median':>9}{'p95':>9}{'stddev':>9}{'kept':>6}{'out':>5}" + ("  vs baseline" if baseline else "")]
+    for test, steps in summary.items():
+        lines.append(test)
+        for step, stats in steps.items():
+            line = (f"    {step:<54}{stats['min']:>9.0f}{stats['median']:>9.0f}{stats['p95']:>9.0f}"
+                    f"{stats['stddev']:>9.0f}{stats['kept']:>6}{stats['outliers']:>5}")
+            base = (baseline or {}).get(test, {}).get(step)
+            if base:
+                change = stats["median"] / base["median"] - 1 if base["median"] else 0.0
+                line += f"  {change:+.1%}" + ("  REGRESSION" if regressed(stats, base) else "")
+            lines.append(line)
+    return lines
+
+
+def regressions(summary: dict[str, dict[str, dict]], baseline: dict[str, dict[str, dict]]) -> list[str]:
+    found = []
+    for test, steps in summary.items():
+        for step, stats in steps.items():
+            base = baseline.get(test, {}).get(step)
+            if base and regressed(stats, base):
+                found.append(f"{test} {step}: median {base['median']:.0f} -> {stats['median']:.0f} ms")
+    return found
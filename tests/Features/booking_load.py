@@ -0,0 +1,177 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from api_client import AppSession, FormData
+from plan_check import run_sql
+from results_store import percentile
+
+
+LOGIN_WORKERS = 8
+# Statuses that hold a slot, as getAvailableSlots counts them.
+HOLDING_STATUSES = "('pending', 'confirmed')"
+BOOKING_ACTIONS = ("createAppointment", "getAvailableSlots")
+
+
+def patient_email(n: int) -> str:
+    """
+    Login of seeded patient n (local_stack.SEED_SQL); patient 1 is the account in config.py.
+    """
+    return config.PATIENT_EMAIL if n == 1 else f"patient{n}@seed.local"
+
+
+def open_sessions(count: int, first: int = 2, actions: tuple[str, ...] = BOOKING_ACTIONS) -> list[AppSession]:
+    """
+    Log in seeded patients first .. first + count - 1 over HTTP. The sessions share one table of action IDs,
+    resolved for `actions` before the others log in.
+    """
+    lead = AppSession(config.BASE_URL, config.SUPABASE_URL, config.SUPABASE_ANON_KEY, patient_email(first), config.UNIVERSAL_PASSWORD)
+    for name in actions:
+        lead.action_id(name)
+    with ThreadPoolExecutor(LOGIN_WORKERS) as pool:
+        rest = pool.map(
+            lambda n: AppSession(config.BASE_URL, config.SUPABASE_URL, config.SUPABASE_ANON_KEY, patient_email(n),
+                                 config.UNIVERSAL_PASSWORD, action_ids=lead.action_ids),
+            range(first + 1, first + count),
+        )
+        return [lead, *rest]
+
+
+def empty_sessions(db_url: str, count: int) -> list[tuple[str, str]]:
+    """
+    (doctor_id, date) of `count` active future sessions that hold no appointments yet, in a stable order.
+    """
+    rows = run_sql(db_url, f"""
+        select s.doctor_id, s.date from doctor_sessions s
+        where s.status = 'active' and s.date > current_date and not exists (
+            select 1 from appointments a where a.doctor_id = s.doctor_id and a.appointment_date = s.date
+        )
+        order by s.id limit {count};
+    """)
+    return [tuple(line.split("|")) for line in rows.splitlines()]
+
+
+def free_slots(session: AppSession, doctor_id: str, date: str) -> list[dict]:
+    return session.action("getAvailableSlots", doctor_id, date)["data"]
+
+
+def book(session: AppSession, doctor_id: str, date: str, slot: dict, marker: str) -> dict:
+    """
+    Book one slot the way the booking page does, and time the createAppointment call.
+    """
+    form = FormData(doctorId=doctor_id, appointmentDate=date, startTime=slot["startTime"], endTime=slot["endTime"], notes=marker)
+    attempt = {"patient_id": session.user_id, "doctor_id": doctor_id, "date": date, "start_time": slot["startTime"], "error": None}
+    start = time.monotonic()
+    try:
+        result = session.action("createAppointment", form)
+        attempt["error"] = result.get("error")
+    except Exception as e:
+        attempt["error"] = f"{type(e).__name__}: {e}"
+    attempt["latency_ms"] = (time.monotonic() - start) * 1000
+    return attempt
+
+
+def race(sessions: list[AppSession], doctor_id: str, date: str, slot: dict, marker: str) -> tuple[list[dict], float]:
+    """
+    Every session books the same slot at the same moment: all threads are released together by one barrier.
+    Returns the attempts and the elapsed seconds from release to the last response.
+    """
+    barrier = threading.Barrier(len(sessions) + 1)
+
+    def attempt(session: AppSession) -> dict:
+        barrier.wait()
+        return book(session, doctor_id, date, slot, marker)
+
+    with ThreadPoolExecutor(len(sessions)) as pool:
+        futures = [pool.submit(attempt, session) for session in sessions]
+        barrier.wait()
+        start = time.monotonic()
+        attempts = [future.result() for future in futures]
+    return attempts, time.monotonic() - start
+
+
+def sustained(sessions: list[AppSession], targets: list[tuple[str, str]], marker: str, duration: float) -> tuple[list[dict], float]:
+    """
+    Every session books as a patient does when a booking window opens: pick one of the target sessions, list its
+    free slots, book one of them, repeat. A session stops once it sees every target full, or after `duration`.
+    """
+    deadline = time.monotonic() + duration
+
+    def patient(session: AppSession) -> list[dict]:
+        rng = random.Random(session.user_id)
+        open_targets = list(targets)
+        attempts = []
+        while open_targets and time.monotonic() < deadline:
+            doctor_id, date = rng.choice(open_targets)
+            slots = free_slots(session, doctor_id, date)
+            if not slots:
+                open_targets.remove((doctor_id, date))
+                continue
+            attempts.append(book(session, doctor_id, date, rng.choice(slots), marker))
+        return attempts
+
+    start = time.monotonic()
+    with ThreadPoolExecutor(len(sessions)) as pool:
+        attempts = [attempt for attempts in pool.map(patient, sessions) for attempt in attempts]
+    return attempts, time.monotonic() - start
+
+
+def summarize(attempts: list[dict], elapsed: float) -> dict:
+    latencies = [attempt["latency_ms"] for attempt in attempts]
+    booked = sum(1 for attempt in attempts if not attempt["error"])
+    return {
+        "attempts": len(attempts),
+        "booked": booked,
+        "rejected": len(attempts) - booked,
+        "p50": percentile(latencies, 0.5),
+        "p95": percentile(latencies, 0.95),
+        "max": max(latencies),
+        "bookings_per_s": booked / elapsed if elapsed else 0.0,
+    }
+
+
+def integrity_violations(db_url: str, marker: str, attempts: list[dict]) -> list[str]:
+    """
+    Check the appointments table after a load: no slot held twice, no session beyond its slot capacity, every
+    booking linked to the session it falls in, and exactly one row per booking the app reported as made.
+    """
+    violations = []
+    for line in run_sql(db_url, f"""
+        select doctor_id, appointment_date, start_time, count(*) from appointments
+        where status in {HOLDING_STATUSES} group by 1, 2, 3 having count(*) > 1;
+    """).splitlines():
+        doctor_id, date, start_time, count = line.split("|")
+        violations.append(f"slot {date} {start_time} of doctor {doctor_id} booked {count} times")
+    for line in run_sql(db_url, f"""
+        select s.id, s.date, count(a.id), floor(extract(epoch from s.end_time - s.start_time) / 60 / s.slot_duration_minutes)
+        from doctor_sessions s
+        join appointments a on a.doctor_id = s.doctor_id and a.appointment_date = s.date and a.status in {HOLDING_STATUSES}
+        where s.status = 'active'
+        group by s.id having count(a.id) > floor(extract(epoch from s.end_time - s.start_time) / 60 / s.slot_duration_minutes);
+    """).splitlines():
+        session_id, date, count, capacity = line.split("|")
+        violations.append(f"session {session_id} on {date} holds {count} appointments for {capacity} slots")
+    for line in run_sql(db_url, f"""
+        select a.id from appointments a left join doctor_sessions s on s.id = a.session_id
+        where a.notes = '{marker}' and (s.id is null or s.doctor_id <> a.doctor_id or s.date <> a.appointment_date
+                                        or a.start_time < s.start_time or a.end_time > s.end_time);
+    """).splitlines():
+        violations.append(f"appointment {line} is not linked to the session it was booked in")
+
+    rows = run_sql(db_url, f"""
+        select patient_id, doctor_id, appointment_date, start_time from appointments where notes = '{marker}';
+    """).splitlines()
+    booked = [f"{a['patient_id']}|{a['doctor_id']}|{a['date']}|{a['start_time']}" for a in attempts if not a["error"]]
+    orphans = len(set(rows) - set(booked)) + len(rows) - len(set(rows))
+    lost = len(set(booked) - set(rows))
+    if orphans:
+        violations.append(f"{orphans} appointment row(s) without a successful booking response")
+    if lost:
+        violations.append(f"{lost} successful booking response(s) without an appointment row")
+    return violations
+
+
+def clean_up(db_url: str, marker_prefix: str):
+    run_sql(db_url, f"delete from appointments where notes like '{marker_prefix}%';")
@@ -0,0 +1,193 @@
+"""
+Load every route the suite visits twice, cold (empty cache) then warm, and report transfer weight and cache behavior.
+
+    python cache_report.py                   # report and compare against the stored baseline
+    python cache_report.py --save-baseline   # report and store it as the new baseline
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import time
+
+import config
+from backends import CDPBackend
+from cdp import CDPPage
+from login import login_browser
+from tabs import ROLE_EMAILS
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache_baseline.json")
+# (role, test module, path constant) for every page the feature tests open.
+SUITE_ROUTES = [
+    ("patient", "test_doctor-filtering", "BOOK_APPOINTMENT_PATH"),
+    ("patient", "test_timeline", "TIMELINE_PATH"),
+    ("patient", "test_profile-management", "PROFILE_PATH"),
+    ("patient", "test_personalized-treatment", "PATIENT_PATH"),
+    ("doctor", "test_doctor-notes", "PATIENT_PATH"),
+    ("doctor", "test_profile-management", "PROFILE_PATH"),
+    ("admin", "test_personalized-treatment", "ADMIN_TREATMENT_PATH"),
+]
+STATIC_CHUNK_MARKER = "/_next/static/"
+STORAGE_MARKER = "/storage/v1/object/"
+# Strings that only appear in a bundle when the dependency is shipped to the browser.
+DEPENDENCY_MARKERS = {
+    "stripe": "api.stripe.com",
+    "nodemailer": "nodemailer",
+    "supabase-service-role": "service_role",
+}
+LINKED_STORAGE_HEADERS_JS = """
+Promise.all(Array.from(document.querySelectorAll("a[href*='%s']")).slice(0, 5).map(a =>
+    fetch(a.href, {method: 'HEAD'}).then(r => r.headers.get('cache-control') || '-').catch(() => 'unreachable')
+))
+""" % STORAGE_MARKER
+NETWORK_IDLE = 1.0
+LOAD_TIMEOUT = 30
+JS_GROWTH_THRESHOLD = 0.05
+
+
+def suite_routes() -> list[tuple[str, str]]:
+    return [(role, getattr(importlib.import_module(module), constant)) for role, module, constant in SUITE_ROUTES]
+
+
+async def load_and_record(page: CDPPage, url: str, inspect_scripts: bool) -> dict:
+    """
+    Navigate once and summarize every response until the network has been idle for NETWORK_IDLE seconds.
+    """
+    requests: dict[str, dict] = {}
+    last_activity = [time.monotonic()]
+
+    def on_event(method: str, params: dict, session_id: str | None):
+        if session_id != page.session_id or "requestId" not in params:
+            return
+        last_activity[0] = time.monotonic()
+        entry = requests.setdefault(params["requestId"], {"id": params["requestId"], "bytes": 0, "from_cache": False, "status": None, "type": None})
+        if method == "Network.requestServedFromCache":
+            entry["from_cache"] = True
+        elif method == "Network.responseReceived":
+            response = params["response"]
+            entry.update(
+                url=response["url"],
+                type=params.get("type"),
+                status=response["status"],
+                cache_control=next((v for k, v in response["headers"].items() if k.lower() == "cache-control"), None),
+            )
+            entry["from_cache"] |= bool(response.get("fromDiskCache") or response.get("fromPrefetchCache"))
+        elif method == "Network.loadingFinished":
+            entry["bytes"] = params["encodedDataLength"]
+
+    unsubscribe = page.connection.subscribe(on_event)
+    try:
+        await page.get(url, LOAD_TIMEOUT)
+        deadline = time.monotonic() + LOAD_TIMEOUT
+        while time.monotonic() - last_activity[0] < NETWORK_IDLE and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+    finally:
+        unsubscribe()
+
+    responses = [entry for entry in requests.values() if entry["status"] is not None]
+    scripts = [entry for entry in responses if entry["type"] == "Script"]
+    markers = []
+    if inspect_scripts and scripts:
+        bodies = await asyncio.gather(
+            *(page.send("Network.getResponseBody", {"requestId": entry["id"]}) for entry in scripts),
+            return_exceptions=True,
+        )
+        text = "".join(body.get("body", "") for body in bodies if isinstance(body, dict))
+        markers = sorted(name for name, marker in DEPENDENCY_MARKERS.items() if marker in text)
+
+    storage_cache_control = {e["cache_control"] or "-" for e in responses if STORAGE_MARKER in e["url"]}
+    if inspect_scripts:
+        # Timeline attachments are only linked, not loaded, so ask for their headers directly.
+        storage_cache_control.update(await page.evaluate(LINKED_STORAGE_HEADERS_JS, await_promise=True) or [])
+
+    return {
+        "requests": len(responses),
+        "transferred_bytes": sum(entry["bytes"] for entry in responses),
+        "js_bytes": sum(entry["bytes"] for entry in scripts),
+        "cached": sum(1 for entry in responses if entry["from_cache"]),
+        "revalidated": sum(1 for entry in responses if entry["status"] == 304),
+        "downloaded": sum(1 for entry in responses if not entry["from_cache"] and entry["status"] != 304),
+        "static_chunk_cache_control": sorted({e["cache_control"] or "-" for e in responses if STATIC_CHUNK_MARKER in e["url"]}),
+        "storage_cache_control": sorted(storage_cache_control),
+        "dependency_markers": markers,
+    }
+
+
+async def measure_route(page: CDPPage, url: str) -> dict:
+    await page.pipeline([("Network.enable", None), ("Network.setCacheDisabled", {"cacheDisabled": False})])
+    await page.send("Network.clearBrowserCache")
+    cold = await load_and_record(page, url, inspect_scripts=True)
+    warm = await load_and_record(page, url, inspect_scripts=False)
+    return {"cold": cold, "warm": warm}
+
+
+def run(headless: bool) -> dict[str, dict]:
+    results = {}
+    by_role: dict[str, list[str]] = {}
+    for role, path in suite_routes():
+        by_role.setdefault(role, []).append(path)
+    for role, paths in by_role.items():
+        backend = CDPBackend.launch(headless=headless)
+        try:
+            login_browser(backend, config.BASE_URL, getattr(config, ROLE_EMAILS[role]), config.UNIVERSAL_PASSWORD)
+            for path in paths:
+                results[f"{role} {path}"] = backend.run(measure_route(backend.page, f"{config.BASE_URL}{path}"))
+        finally:
+            backend.quit()
+    return results
+
+
+def compare(results: dict[str, dict], baseline: dict[str, dict]) -> list[str]:
+    """
+    Regressions against the baseline: cold JS weight growth past JS_GROWTH_THRESHOLD and newly shipped dependencies.
+    """
+    problems = []
+    for route, result in results.items():
+        cold = result["cold"]
+        base = baseline.get(route, {}).get("cold")
+        if not base:
+            continue
+        if base["js_bytes"] and cold["js_bytes"] > base["js_bytes"] * (1 + JS_GROWTH_THRESHOLD):
+            problems.append(f"{route}: cold JS grew {base['js_bytes'] / 1024:.0f} KB -> {cold['js_bytes'] / 1024:.0f} KB")
+        for marker in set(cold["dependency_markers"]) - set(base["dependency_markers"]):
+            problems.append(f"{route}: client bundle now contains {marker}")
+    return problems
+
+
+def print_report(results: dict[str, dict]):
+    print(f"{'route':<46}{'load':<6}{'KB':>8}{'JS KB':>8}{'cached':>8}{'304':>6}{'fetched':>9}")
+    for route, result in results.items():
+        for load in ("cold", "warm"):
+            r = result[load]
+            print(
+                f"{route:<46}{load:<6}{r['transferred_bytes'] / 1024:>8.0f}{r['js_bytes'] / 1024:>8.0f}"
+                f"{r['cached']:>8}{r['revalidated']:>6}{r['downloaded']:>9}"
+            )
+        cold = result["cold"]
+        print(f"    _next/static cache-control: {', '.join(cold['static_chunk_cache_control']) or '-'}")
+        print(f"    storage cache-control: {', '.join(cold['storage_cache_control']) or '-'}")
+        if cold["dependency_markers"]:
+            print(f"    server-side dependencies in client JS: {', '.join(cold['dependency_markers'])}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--headless", action="store_true")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    results = run(args.headless)
+    print_report(results)
+    problems = []
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            problems = compare(results, json.load(f))
+        print("\n".join(["", "Regressions against baseline:"] + problems) if problems else "\nNo regressions against baseline.")
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    # Regressions fail the run, so the report can gate transfer weight in CI.
+    raise SystemExit(1 if problems else 0)
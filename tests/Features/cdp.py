@@ -0,0 +1,308 @@
+import asyncio
+import itertools
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+
+import websockets
+
+
+BROWSER_CANDIDATES = [
+    "msedge",
+    "microsoft-edge",
+    "google-chrome",
+    "chromium",
+    "chromium-browser",
+    r"C:\Program Files (x86)\Microsoft\Edge\Application\msedge.exe",
+    r"C:\Program Files\BraveSoftware\Brave-Browser\Application\brave.exe",
+]
+POLL_INTERVAL = 0.05
+
+# Resolves once the condition holds, polling inside the page so waiting costs a single round trip.
+WAIT_UNTIL_JS = """
+new Promise((resolve, reject) => {
+    const deadline = Date.now() + %(timeout_ms)d;
+    const check = () => {
+        let value = false;
+        try { value = (%(condition)s); } catch (e) {}
+        if (value) return resolve(value);
+        if (Date.now() > deadline) return reject(new Error("Timed out waiting for condition"));
+        setTimeout(check, 50);
+    };
+    check();
+})
+"""
+
+VISIBLE_SELECTOR_JS = "(el => !!el && el.getClientRects().length > 0)(document.querySelector(%s))"
+
+ELEMENT_CENTER_JS = """
+(() => {
+    const el = document.querySelector(%(selector)s);
+    if (!el) return null;
+    el.scrollIntoView({block: 'center'});
+    const rect = el.getBoundingClientRect();
+    return {x: rect.left + rect.width / 2, y: rect.top + rect.height / 2};
+})()
+"""
+
+
+class CDPError(Exception):
+    pass
+
+
+def find_browser_binary() -> str:
+    """
+    Return a Chromium-based browser binary, preferring CDP_BROWSER from the environment.
+    """
+    for candidate in [os.environ.get("CDP_BROWSER")] + BROWSER_CANDIDATES:
+        if not candidate:
+            continue
+        path = shutil.which(candidate) or (candidate if os.path.exists(candidate) else None)
+        if path:
+            return path
+    raise FileNotFoundError("No Chromium-based browser found, set CDP_BROWSER to its binary path")
+
+
+def _fail_on_error(task: asyncio.Task, future: asyncio.Future):
+    if not task.cancelled() and task.exception() and not future.done():
+        future.set_exception(task.exception())
+
+
+class CDPConnection:
+    """
+    One websocket to the browser. Commands are matched to responses by id, so any number can be in flight at once.
+    """
+
+    def __init__(self, ws):
+        self._ws = ws
+        self._ids = itertools.count(1)
+        self._pending: dict[int, asyncio.Future] = {}
+        self._listeners: list[tuple[str, str | None, asyncio.Future]] = []
+        self._subscribers: list = []
+        self._reader = asyncio.ensure_future(self._read())
+
+    @classmethod
+    async def connect(cls, url: str) -> "CDPConnection":
+        return cls(await websockets.connect(url, max_size=None))
+
+    async def _read(self):
+        try:
+            async for message in self._ws:
+                self._dispatch(json.loads(message))
+        finally:
+            for future in list(self._pending.values()) + [listener[2] for listener in self._listeners]:
+                if not future.done():
+                    future.set_exception(CDPError("DevTools connection closed"))
+
+    def _dispatch(self, data: dict):
+        if "id" in data:
+            future = self._pending.pop(data["id"], None)
+            if future and not future.done():
+                if "error" in data:
+                    future.set_exception(CDPError(data["error"].get("message", str(data["error"]))))
+                else:
+                    future.set_result(data.get("result", {}))
+            return
+        for callback in list(self._subscribers):
+            callback(data["method"], data.get("params", {}), data.get("sessionId"))
+        for listener in list(self._listeners):
+            method, session_id, future = listener
+            if method == data.get("method") and session_id in (None, data.get("sessionId")) and not future.done():
+                future.set_result(data.get("params", {}))
+                self._listeners.remove(listener)
+
+    def send(self, method: str, params: dict | None = None, session_id: str | None = None) -> asyncio.Future:
+        """
+        Send a command and return a future for its result without waiting for it.
+        """
+        command_id = next(self._ids)
+        message = {"id": command_id, "method": method, "params": params or {}}
+        if session_id:
+            message["sessionId"] = session_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[command_id] = future
+        sent = asyncio.ensure_future(self._ws.send(json.dumps(message)))
+        sent.add_done_callback(lambda task: _fail_on_error(task, future))
+        return future
+
+    def wait_for_event(self, method: str, session_id: str | None = None) -> asyncio.Future:
+        """
+        Return a future for the next occurrence of an event. Register it before sending the command that triggers it.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._listeners.append((method, session_id, future))
+        return future
+
+    def subscribe(self, callback):
+        """
+        Call `callback(method, params, session_id)` for every event until the returned function is called.
+        """
+        self._subscribers.append(callback)
+        return lambda: self._subscribers.remove(callback)
+
+    async def close(self):
+        self._reader.cancel()
+        await self._ws.close()
+
+
+class CDPPage:
+    """
+    A tab attached over a flattened session on the shared browser connection.
+    """
+
+    def __init__(self, connection: CDPConnection, target_id: str, session_id: str):
+        self.connection = connection
+        self.target_id = target_id
+        self.session_id = session_id
+
+    def send(self, method: str, params: dict | None = None) -> asyncio.Future:
+        return self.connection.send(method, params, self.session_id)
+
+    async def pipeline(self, commands: list[tuple[str, dict | None]]) -> list[dict]:
+        """
+        Send several commands back to back and wait for all results, paying one round trip instead of len(commands).
+        """
+        return await asyncio.gather(*(self.send(method, params) for method, params in commands))
+
+    async def get(self, url: str, timeout: float = 30):
+        loaded = self.connection.wait_for_event("Page.loadEventFired", self.session_id)
+        result = await self.send("Page.navigate", {"url": url})
+        if result.get("errorText"):
+            raise CDPError(f"Navigation to {url} failed: {result['errorText']}")
+        await asyncio.wait_for(loaded, timeout)
+
+    async def evaluate(self, expression: str, await_promise: bool = False):
+        result = await self.send(
+            "Runtime.evaluate",
+            {"expression": expression, "returnByValue": True, "awaitPromise": await_promise},
+        )
+        if "exceptionDetails" in result:
+            details = result["exceptionDetails"]
+            raise CDPError(details.get("exception", {}).get("description") or details.get("text", "evaluation failed"))
+        return result.get("result", {}).get("value")
+
+    async def wait_until(self, condition: str, timeout: float = 10):
+        """
+        Wait until a JavaScript expression is truthy and return its value.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"FAILED: condition not met within {timeout}s: {condition}")
+            script = WAIT_UNTIL_JS % {"condition": condition, "timeout_ms": remaining * 1000}
+            try:
+                return await self.evaluate(script, await_promise=True)
+            except CDPError as e:
+                if "Timed out waiting for condition" in str(e):
+                    raise TimeoutError(f"FAILED: condition not met within {timeout}s: {condition}")
+                # A navigation destroys the execution context mid-wait; retry in the new document.
+                await asyncio.sleep(POLL_INTERVAL)
+
+    async def wait_for_selector(self, selector: str, timeout: float = 10):
+        try:
+            await self.wait_until(VISIBLE_SELECTOR_JS % json.dumps(selector), timeout)
+        except TimeoutError:
+            raise TimeoutError(f"FAILED: selector {selector} not found within {timeout}s")
+
+    async def wait_for_title(self, title: str, timeout: float = 10):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                if await self.evaluate("document.title") == title:
+                    return
+            except CDPError:
+                pass
+            await asyncio.sleep(POLL_INTERVAL)
+        raise TimeoutError(f"FAILED: title did not become '{title}' within {timeout}s")
+
+    async def type(self, selector: str, text: str):
+        focused = await self.evaluate(f"(() => {{ const el = document.querySelector({json.dumps(selector)}); if (el) el.focus(); return !!el; }})()")
+        if not focused:
+            raise CDPError(f"No element matches {selector}")
+        await self.send("Input.insertText", {"text": text})
+
+    async def click(self, selector: str):
+        center = await self.evaluate(ELEMENT_CENTER_JS % {"selector": json.dumps(selector)})
+        if not center:
+            raise CDPError(f"No element matches {selector}")
+        event = {"x": center["x"], "y": center["y"], "button": "left", "clickCount": 1}
+        await self.pipeline([
+            ("Input.dispatchMouseEvent", {**event, "type": "mousePressed"}),
+            ("Input.dispatchMouseEvent", {**event, "type": "mouseReleased"}),
+        ])
+
+    async def title(self) -> str:
+        return await self.evaluate("document.title")
+
+    async def close(self):
+        await self.connection.send("Target.closeTarget", {"targetId": self.target_id})
+
+
+class CDPBrowser:
+    """
+    A browser process driven over its DevTools websocket, with no WebDriver in between.
+    """
+
+    def __init__(self, process: subprocess.Popen, profile_dir: str, connection: CDPConnection):
+        self.process = process
+        self.profile_dir = profile_dir
+        self.connection = connection
+
+    @classmethod
+    async def launch(cls, headless: bool = False, timeout: float = 30) -> "CDPBrowser":
+        profile_dir = tempfile.mkdtemp(prefix="medifollow-cdp-")
+        args = [
+            find_browser_binary(),
+            "--remote-debugging-port=0",
+            f"--user-data-dir={profile_dir}",
+            "--no-first-run",
+            "--no-default-browser-check",
+            # Tabs in the background must keep their timers running for concurrent tab runs.
+            "--disable-background-timer-throttling",
+            "--disable-backgrounding-occluded-windows",
+            "--disable-renderer-backgrounding",
+        ]
+        if headless:
+            args.append("--headless=new")
+        process = subprocess.Popen(args + ["about:blank"], stderr=subprocess.PIPE, text=True)
+
+        loop = asyncio.get_running_loop()
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            line = await loop.run_in_executor(None, process.stderr.readline)
+            if line.startswith("DevTools listening on "):
+                url = line.removeprefix("DevTools listening on ").strip()
+                # Keep draining stderr so a chatty browser never blocks on a full pipe.
+                threading.Thread(target=process.stderr.read, daemon=True).start()
+                return cls(process, profile_dir, await CDPConnection.connect(url))
+            if not line and process.poll() is not None:
+                break
+        process.kill()
+        raise CDPError("Browser did not expose a DevTools websocket")
+
+    async def new_page(self, url: str = "about:blank") -> CDPPage:
+        target = await self.connection.send("Target.createTarget", {"url": "about:blank"})
+        attached = await self.connection.send("Target.attachToTarget", {"targetId": target["targetId"], "flatten": True})
+        page = CDPPage(self.connection, target["targetId"], attached["sessionId"])
+        await page.pipeline([
+            ("Page.enable", None),
+            ("Runtime.enable", None),
+            ("Emulation.setFocusEmulationEnabled", {"enabled": True}),
+        ])
+        if url != "about:blank":
+            await page.get(url)
+        return page
+
+    async def close(self):
+        try:
+            await asyncio.wait_for(self.connection.send("Browser.close"), 5)
+        except Exception:
+            self.process.kill()
+        await self.connection.close()
+        self.process.wait()
+        shutil.rmtree(self.profile_dir, ignore_errors=True)
@@ -1,5 +1,26 @@
-BASE_URL = "https://medi-follow.vercel.app"
+import os
+
+# Named targets for --target; a URL works too, e.g. a Vercel preview deployment of a PR.
+TARGETS = {
+    "prod": "https://medi-follow.vercel.app",
+    "preview": os.environ.get("MEDIFOLLOW_PREVIEW_URL", ""),
+    "local": "http://localhost:3100",  # where `local_stack.py up --app` serves the app
+}
+# Set by `local_stack.py env` to run against a local stack instead of production.
+BASE_URL = os.environ.get("MEDIFOLLOW_BASE_URL", TARGETS["prod"])
 ADMIN_EMAIL = "admin@test.com"
 DOCTOR_EMAIL = "hinoseb173@alexida.com"
 PATIENT_EMAIL = "stefanshabbir@gmail.com"
 UNIVERSAL_PASSWORD = "123456789"
+# Same variables as the Next.js app; needed by the API tier, which talks to Supabase without a browser.
+SUPABASE_URL = os.environ.get("NEXT_PUBLIC_SUPABASE_URL", "")
+SUPABASE_ANON_KEY = os.environ.get("NEXT_PUBLIC_SUPABASE_ANON_KEY", "")
+# The deployment those two belong to; --target switches BASE_URL, and conftest switches them with it.
+DEFAULT_BASE_URL = BASE_URL
+
+
+def resolve_target(target: str) -> str:
+    url = TARGETS.get(target, target)
+    if not url.startswith(("http://", "https://")):
+        raise ValueError(f"Unknown target {target!r}: use one of {', '.join(TARGETS)} or a URL (preview needs MEDIFOLLOW_PREVIEW_URL)")
+    return url.rstrip("/")
@@ -1,16 +1,356 @@
+import os
+import subprocess
+
 import config
 import pytest
+from _pytest.runner import runtestprotocol
+
+import action_timing
+import benchmark
+import impact
+import local_stack
+import middleware_timing
+import native_input
+import propagation
+import results_store
+import sharding
+import tabs
+import throttling
+import wait_profiler
+from api_client import AppSession
+from backends import BACKENDS, WebDriverBackend
+from login import get_driver, login, login_browser
+
+
+_tests: dict[str, dict] = {}
+_page_metrics: dict[str, dict[str, list[dict]]] = {}
+_wait_monitor = throttling.WaitMonitor()
+_wait_profiler = wait_profiler.WaitProfiler()
+_benchmark_samples: dict[str, dict[str, list[float]]] = {}
+_propagation: list[dict] = []
+_recorded: list[tuple[str, str, dict]] = []
+_actions = action_timing.ActionAttribution()
+_auth_calls = middleware_timing.AuthCallCounter()
+
+
+def pytest_addoption(parser):
+    parser.addoption("--shard", default=None, help="Run only shard i of n (e.g. 1/3), balanced by stored test durations.")
+    parser.addoption("--store-durations", action="store_true", default=False, help="Record per-test durations for shard balancing.")
+    parser.addoption("--durations-path", default=sharding.DURATIONS_PATH, help="Path of the stored test duration history.")
+    parser.addoption("--tabs", type=int, default=0, help="Run read_only tests concurrently as up to N tabs of one logged-in browser per role.")
+    parser.addoption("--emulate", default=None, choices=sorted(throttling.PROFILES), help="Network/CPU emulation profile; 'none' records the unthrottled baseline.")
+    parser.addoption("--backend", default="webdriver", choices=sorted(BACKENDS), help="Backend for the `browser` fixtures.")
+    parser.addoption("--target", default=None, help="Deployment to test: prod, preview, local or a URL. Defaults to config.BASE_URL.")
+    parser.addoption("--results-db", default=results_store.STORE_PATH, help="SQLite store every run appends its results and page metrics to.")
+    parser.addoption("--reseed-local", action="store_true", default=False, help="Let volume benchmarks reseed the local stack (local_stack.py) with their own data; its data is replaced.")
+    parser.addoption("--input", default=native_input.MODE, choices=native_input.MODES, help="How form fields are filled: per-key send_keys, one CDP insertText, or React value setter.")
+    parser.addoption("--attribute-actions", action="store_true", default=False, help="Time every server action the pages call and attribute it to the route and phase that made it.")
+    parser.addoption("--count-auth-calls", action="store_true", default=False, help="Count the Supabase Auth calls the app server makes per page load (local stack only).")
+    parser.addoption("--profile-waits", action="store_true", default=False, help="Attribute each test's time to sleeps, waits, WebDriver commands and page loads.")
+    parser.addoption("--benchmark", type=int, default=0, help="Run only benchmark tests, each N measured times after the warm-up, and report per-step statistics.")
+    parser.addoption("--warmup", type=int, default=benchmark.DEFAULT_WARMUP, help="Unmeasured iterations before the --benchmark repetitions.")
+    parser.addoption("--benchmark-save", default=None, help="Save the benchmark statistics as a named baseline.")
+    parser.addoption("--benchmark-compare", default=None, help="Compare the benchmark statistics with a named baseline; regressions fail the run.")
+    parser.addoption("--impacted-by", default=None, help="Run only the tests the changes since this git revision can affect (impact.py); unmapped files run everything.")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "shard_group(name): keep dependent tests together on one shard.")
+    config.addinivalue_line("markers", "read_only: test only reads data and may share a logged-in browser with other tests.")
+    config.addinivalue_line("markers", "api: browserless test against server actions and Supabase; run this tier alone with -m api.")
+    config.addinivalue_line("markers", "benchmark: idempotent flow that --benchmark may repeat many times.")
+    config._shard_summary = None
+    native_input.MODE = config.getoption("--input")
+    config._benchmark_summary = None
+    config._benchmark_baseline = None
+    config._impact = None
+
+
+def _target_supabase(base_url: str) -> tuple[str, str]:
+    """
+    Supabase URL and anon key of the project the app at base_url uses. NEXT_PUBLIC_SUPABASE_* belong to the default
+    deployment and the local stack reports its own; for any other target they are unknown and the API tier skips.
+    """
+    if base_url == config.DEFAULT_BASE_URL:
+        return config.SUPABASE_URL, config.SUPABASE_ANON_KEY
+    if base_url == local_stack.app_url():
+        try:
+            env = local_stack.stack_env()
+        except (local_stack.StackError, OSError):
+            # No supabase CLI or no running stack here.
+            return "", ""
+        return env["API_URL"], env["ANON_KEY"]
+    return "", ""
+
+
+def pytest_sessionstart(session):
+    target = session.config.getoption("--target")
+    if target:
+        try:
+            config.BASE_URL = config.resolve_target(target)
+        except ValueError as e:
+            raise pytest.UsageError(str(e))
+        config.SUPABASE_URL, config.SUPABASE_ANON_KEY = _target_supabase(config.BASE_URL)
+    options = session.config.getoption
+    if options("--benchmark") and options("--tabs"):
+        raise pytest.UsageError("--benchmark times tests one at a time; it cannot be combined with --tabs")
+    if options("--tabs") and (options("--profile-waits") or options("--count-auth-calls")):
+        raise pytest.UsageError("--profile-waits and --count-auth-calls attribute to one running test; they cannot be combined with --tabs")
+    if (options("--benchmark-save") or options("--benchmark-compare")) and not options("--benchmark"):
+        raise pytest.UsageError("--benchmark-save and --benchmark-compare need --benchmark N")
+    if options("--count-auth-calls"):
+        if config.BASE_URL != local_stack.app_url():
+            raise pytest.UsageError(f"--count-auth-calls reads the local stack's gateway log; run against {local_stack.app_url()} (--target local)")
+        if config.SUPABASE_URL and config.SUPABASE_ANON_KEY:
+            _auth_calls.calibrate(AppSession(config.BASE_URL, config.SUPABASE_URL, config.SUPABASE_ANON_KEY,
+                                             config.PATIENT_EMAIL, config.UNIVERSAL_PASSWORD))
+    if options("--benchmark-compare") and not os.path.exists(benchmark.baseline_path(options("--benchmark-compare"))):
+        raise pytest.UsageError(f"no benchmark baseline at {benchmark.baseline_path(options('--benchmark-compare'))}")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--impacted-by"):
+        try:
+            changed = impact.changed_files(config.getoption("--impacted-by"))
+        except subprocess.CalledProcessError as e:
+            raise pytest.UsageError(f"--impacted-by: {e.stderr.strip()}")
+        covered = results_store.coverage(results_store.connect(config.getoption("--results-db")))
+        config._impact = impact.select(changed, covered)
+        config.hook.pytest_deselected(items=[item for item in items if not config._impact.selects(item.nodeid)])
+        items[:] = [item for item in items if config._impact.selects(item.nodeid)]
+    if config.getoption("--benchmark"):
+        config.hook.pytest_deselected(items=[item for item in items if not item.get_closest_marker("benchmark")])
+        items[:] = [item for item in items if item.get_closest_marker("benchmark")]
+    if not config.getoption("--shard"):
+        return
+    try:
+        index, count = sharding.parse_shard(config.getoption("--shard"))
+    except ValueError as e:
+        raise pytest.UsageError(str(e))
+
+    groups: dict[str, list[str]] = {}
+    for item in items:
+        groups.setdefault(sharding.group_key(item), []).append(item.nodeid)
+
+    estimates = sharding.estimate_durations([item.nodeid for item in items], sharding.load_durations(config.getoption("--durations-path")))
+    shards = sharding.plan_shards(groups, estimates, count)
+    selected = set(shards[index - 1])
+
+    # Deselect rather than reorder so chained tests keep their module order.
+    config.hook.pytest_deselected(items=[item for item in items if item.nodeid not in selected])
+    items[:] = [item for item in items if item.nodeid in selected]
+
+    loads = sharding.shard_loads(shards, estimates)
+    config._shard_summary = (index, count, loads)
+
+
+def pytest_runtestloop(session):
+    workers = session.config.getoption("--tabs")
+    if not workers or session.config.option.collectonly or session.testsfailed:
+        return None
+
+    # Read-only tests run first as tabs; everything else, and readers of a group an earlier test writes to, keep the
+    # normal one-browser-per-test protocol in their place.
+    tab_items = tabs.ahead_of_writers(session.items)
+    if not tab_items:
+        return None
+    tabs.run_in_tabs(tab_items, workers, setup=lambda item, tab: _instrument(item, tab, tab), teardown=_collect_actions)
+
+    others = [item for item in session.items if item not in tab_items]
+    for i, item in enumerate(others):
+        nextitem = others[i + 1] if i + 1 < len(others) else None
+        item.config.hook.pytest_runtest_protocol(item=item, nextitem=nextitem)
+        if session.shouldfail:
+            raise session.Failed(session.shouldfail)
+        if session.shouldstop:
+            raise session.Interrupted(session.shouldstop)
+    return True
+
+
+def pytest_runtest_protocol(item, nextitem):
+    repetitions = item.config.getoption("--benchmark")
+    if not repetitions:
+        return None
+    warmup = item.config.getoption("--warmup")
+    item.ihook.pytest_runtest_logstart(nodeid=item.nodeid, location=item.location)
+    samples = _benchmark_samples.setdefault(item.nodeid, {})
+    measured_routes: dict[str, list[dict]] = {}
+    for iteration in range(warmup + repetitions):
+        last = iteration == warmup + repetitions - 1
+        # Every iteration is a full setup/call/teardown, so the browser launch and login are measured as the setup step.
+        reports = runtestprotocol(item, log=False, nextitem=nextitem)
+        routes = _page_metrics.pop(item.nodeid, {})
+        if any(report.failed or report.skipped for report in reports):
+            last = True
+        elif iteration >= warmup:
+            for step, ms in benchmark.iteration_steps(reports, routes).items():
+                samples.setdefault(step, []).append(ms)
+            for route, route_samples in routes.items():
+                measured_routes.setdefault(route, []).extend(route_samples)
+        if last:
+            # Only the final (or failing) iteration is reported, so each test still counts once.
+            for report in reports:
+                item.ihook.pytest_runtest_logreport(report=report)
+            break
+    _page_metrics[item.nodeid] = measured_routes
+    item.ihook.pytest_runtest_logfinish(nodeid=item.nodeid, location=item.location)
+    return True
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    if item.config.getoption("--emulate") and (report.when == "call" or (report.when == "setup" and report.failed)):
+        _wait_monitor.finish(item.nodeid, report.failed)
+
+
+def pytest_runtest_logreport(report):
+    test = _tests.setdefault(report.nodeid, {"outcome": "passed", "duration": 0.0, "steps": {}})
+    # Setup and teardown count too: the login fixture is a large share of each test's cost.
+    test["duration"] += report.duration
+    test["steps"][report.when] = report.duration
+    if report.failed:
+        test["outcome"] = "failed" if report.when == "call" else "error"
+    elif report.skipped and test["outcome"] == "passed":
+        test["outcome"] = "skipped"
+
+
+def _route_timings() -> dict[str, list[dict]]:
+    timings: dict[str, list[dict]] = {}
+    for routes in _page_metrics.values():
+        for route, samples in routes.items():
+            timings.setdefault(route, []).extend(samples)
+    return timings
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if config._benchmark_summary:
+        terminalreporter.section(f"benchmark: ms over {config.getoption('--benchmark')} runs after {config.getoption('--warmup')} warm-up, "
+                                 f"outliers beyond {benchmark.OUTLIER_FENCE} IQR dropped")
+        for line in benchmark.report_lines(config._benchmark_summary, config._benchmark_baseline):
+            terminalreporter.write_line(line)
+    profile = config.getoption("--emulate")
+    if profile and _page_metrics:
+        terminalreporter.section(f"route timings under {profile}")
+        baseline = throttling.load_timings(throttling.BASELINE_PROFILE) if profile != throttling.BASELINE_PROFILE else {}
+        for line in throttling.compare_routes(profile, _route_timings(), baseline):
+            terminalreporter.write_line(line)
+    if profile and _wait_monitor.flags:
+        terminalreporter.section(f"tests limited by hard-coded waits under {profile}")
+        for nodeid, flags in _wait_monitor.flags.items():
+            terminalreporter.write_line(f"{nodeid}: {'; '.join(flags)}")
+    if _wait_profiler.tests:
+        terminalreporter.section("where the suite's time went")
+        for line in _wait_profiler.report_lines({nodeid: test["duration"] for nodeid, test in _tests.items()}):
+            terminalreporter.write_line(line)
+    if _recorded:
+        terminalreporter.section("recorded metrics")
+        for nodeid, name, metrics in _recorded:
+            values = ", ".join(f"{metric}={value:.0f}" if isinstance(value, float) else f"{metric}={value}" for metric, value in metrics.items())
+            terminalreporter.write_line(f"{nodeid} {name}: {values}")
+    if _actions.calls:
+        terminalreporter.section("server actions by page (ms, median server ms, kB and client ms per call)")
+        for line in _actions.report_lines():
+            terminalreporter.write_line(line)
+    if _auth_calls.tests:
+        terminalreporter.section("server-side auth calls per page load (middleware updateSession and server components)")
+        for line in _auth_calls.report_lines():
+            terminalreporter.write_line(line)
+    if _propagation:
+        terminalreporter.section("cross-role propagation")
+        for result in _propagation:
+            terminalreporter.write_line(propagation.describe(result))
+    if config._impact:
+        terminalreporter.section(f"tests impacted by changes since {config.getoption('--impacted-by')}")
+        for line in config._impact.describe():
+            terminalreporter.write_line(line)
+    if config._shard_summary:
+        index, count, loads = config._shard_summary
+        mean = sum(loads) / count
+        terminalreporter.write_line(
+            f"shard {index}/{count}: estimated {loads[index - 1]:.1f}s "
+            f"(mean {mean:.1f}s, slowest {max(loads):.1f}s, slowest/mean {max(loads) / mean if mean else 1:.2f})"
+        )
+
+
+def pytest_sessionfinish(session):
+    options = session.config.getoption
+    if _benchmark_samples:
+        summary = benchmark.summarize_all(_benchmark_samples)
+        session.config._benchmark_summary = summary
+        if options("--benchmark-compare"):
+            baseline = benchmark.load_baseline(options("--benchmark-compare"))
+            session.config._benchmark_baseline = baseline
+            if benchmark.regressions(summary, baseline):
+                session.exitstatus = pytest.ExitCode.TESTS_FAILED
+        if options("--benchmark-save"):
+            benchmark.save_baseline(options("--benchmark-save"), summary)
+    if options("--emulate") and _page_metrics:
+        throttling.save_timings(options("--emulate"), _route_timings())
+    if options("--store-durations") and _tests:
+        sharding.store_durations({nodeid: test["duration"] for nodeid, test in _tests.items()}, options("--durations-path"))
+    if _tests and not session.config.option.collectonly:
+        results_store.record_run(
+            options("--results-db"), config.BASE_URL, _tests, _page_metrics,
+            profile=options("--emulate"), backend=options("--backend"), shard=options("--shard"), action_calls=_actions.calls,
+        )
+
+
+def _instrument(node, target, backend):
+    """
+    Apply the --emulate profile, if any, and record every page load of the test for the results store, with the
+    server actions each page calls under --attribute-actions.
+    """
+    profile = node.config.getoption("--emulate")
+    if profile:
+        throttling.apply_profile(backend.cdp, profile)
+    timings = _page_metrics.setdefault(node.nodeid, {})
+    throttling.record_navigations(target, backend.evaluate, timings)
+    if node.config.getoption("--attribute-actions"):
+        _actions.install(target, backend, node.nodeid, timings)
+
+
+def _collect_actions(node, backend):
+    """
+    Collect the server actions of the page a browser is still on, before it quits.
+    """
+    if node.config.getoption("--attribute-actions"):
+        _actions.collect(backend.evaluate, node.nodeid, _page_metrics.setdefault(node.nodeid, {}))
+
+
+@pytest.fixture(autouse=True)
+def _watch_waits(request, monkeypatch):
+    if request.config.getoption("--emulate"):
+        _wait_monitor.install(monkeypatch)
+        _wait_monitor.current = request.node.nodeid
+    if request.config.getoption("--profile-waits"):
+        _wait_profiler.install(monkeypatch, request.module)
+        _wait_profiler.current = request.node.nodeid
+    yield
+    _wait_profiler.current = None
+
 
-from login import get_driver, login
+@pytest.fixture(autouse=True)
+def _count_auth_calls(request):
+    # Autouse fixtures are set up first and torn down last, so the count covers the browser's login and teardown too.
+    if not request.config.getoption("--count-auth-calls"):
+        yield
+        return
+    _auth_calls.start(request.node.nodeid)
+    yield
+    _auth_calls.finish(request.node.nodeid, _page_metrics.get(request.node.nodeid, {}))
 
 
 @pytest.fixture(scope="function")
-def driver():
+def driver(request):
     """
     Create and yield a webdriver instance. Always quit at teardown.
     """
     drv = get_driver(headless=False)  # set True for CI/headless runs
+    _instrument(request.node, drv, WebDriverBackend(drv))
     yield drv
+    _collect_actions(request.node, WebDriverBackend(drv))
     try:
         drv.quit()
     except Exception:
@@ -39,3 +379,129 @@ def admin_login(driver):
     """
     login(driver, config.BASE_URL, config.ADMIN_EMAIL, config.UNIVERSAL_PASSWORD)
     yield driver
+
+
+@pytest.fixture(scope="function")
+def browser(request):
+    """
+    Create and yield a browser backend selected with --backend (webdriver or cdp). Always quit at teardown.
+    """
+    backend = BACKENDS[request.config.getoption("--backend")].launch(headless=False)
+    _instrument(request.node, backend, backend)
+    yield backend
+    _collect_actions(request.node, backend)
+    backend.quit()
+
+@pytest.fixture(scope="function")
+def patient_browser(browser):
+    """
+    Log in as the patient through the selected backend and yield it.
+    """
+    login_browser(browser, config.BASE_URL, config.PATIENT_EMAIL, config.UNIVERSAL_PASSWORD)
+    yield browser
+
+@pytest.fixture(scope="function")
+def doctor_browser(browser):
+    """
+    Log in as the doctor through the selected backend and yield it.
+    """
+    login_browser(browser, config.BASE_URL, config.DOCTOR_EMAIL, config.UNIVERSAL_PASSWORD)
+    yield browser
+
+@pytest.fixture(scope="function")
+def admin_browser(browser):
+    """
+    Log in as the admin through the selected backend and yield it.
+    """
+    login_browser(browser, config.BASE_URL, config.ADMIN_EMAIL, config.UNIVERSAL_PASSWORD)
+    yield browser
+
+
+@pytest.fixture(scope="function")
+def cross_role(request):
+    """
+    Yield a CrossRoleScenario whose roles each get their own logged-in driver. All drivers quit at teardown.
+    """
+    drivers = []
+
+    def open_driver(role: str):
+        drv = get_driver(headless=False)
+        drivers.append(drv)
+        _instrument(request.node, drv, WebDriverBackend(drv))
+        login(drv, config.BASE_URL, getattr(config, tabs.ROLE_EMAILS[role]), config.UNIVERSAL_PASSWORD)
+        return drv
+
+    scenario = propagation.CrossRoleScenario(open_driver)
+    yield scenario
+    for result in scenario.results:
+        _propagation.append(result)
+        if result["visible_s"] is not None:
+            metrics = {"write": result["write_s"] * 1000, "visible": result["visible_s"] * 1000}
+            _page_metrics.setdefault(request.node.nodeid, {}).setdefault(f"propagation {result['name']}", []).append(metrics)
+    for drv in drivers:
+        _collect_actions(request.node, WebDriverBackend(drv))
+        try:
+            drv.quit()
+        except Exception:
+            pass
+
+
+@pytest.fixture(scope="function")
+def record_metrics(request):
+    """
+    Yield record(name, **metrics): keeps measurements a test takes itself in the results store, next to its page loads.
+    """
+    def record(name: str, **metrics):
+        _page_metrics.setdefault(request.node.nodeid, {}).setdefault(name, []).append(metrics)
+        _recorded.append((request.node.nodeid, name, metrics))
+
+    yield record
+
+
+@pytest.fixture(scope="session")
+def local_volume(request):
+    """
+    Yield seed(scale), which replaces the local stack's data with a volume from local_stack.SCALES unless it already
+    holds it. Skips unless the run targets the local stack and --reseed-local allows replacing its data.
+    """
+    if not request.config.getoption("--reseed-local"):
+        pytest.skip("volume benchmarks reseed the local stack; pass --reseed-local to allow it")
+    if config.BASE_URL != local_stack.app_url():
+        pytest.skip(f"volume benchmarks need the local stack at {local_stack.app_url()} (--target local)")
+    db_url = local_stack.stack_env()["DB_URL"]
+    current = {"scale": None}
+
+    def seed(scale: str):
+        if current["scale"] != scale:
+            local_stack.seed(db_url, scale)
+            current["scale"] = scale
+
+    yield seed
+
+
+def _api_session(email: str) -> AppSession:
+    if not (config.SUPABASE_URL and config.SUPABASE_ANON_KEY):
+        pytest.skip(f"API tier needs the Supabase URL and anon key of {config.BASE_URL}: NEXT_PUBLIC_SUPABASE_URL and "
+                    f"NEXT_PUBLIC_SUPABASE_ANON_KEY apply to {config.DEFAULT_BASE_URL} only, or the local stack")
+    return AppSession(config.BASE_URL, config.SUPABASE_URL, config.SUPABASE_ANON_KEY, email, config.UNIVERSAL_PASSWORD)
+
+@pytest.fixture(scope="session")
+def patient_api():
+    """
+    Log in as the patient over HTTP, once per session, and yield the API session.
+    """
+    yield _api_session(config.PATIENT_EMAIL)
+
+@pytest.fixture(scope="session")
+def doctor_api():
+    """
+    Log in as the doctor over HTTP, once per session, and yield the API session.
+    """
+    yield _api_session(config.DOCTOR_EMAIL)
+
+@pytest.fixture(scope="session")
+def admin_api():
+    """
+    Log in as the admin over HTTP, once per session, and yield the API session.
+    """
+    yield _api_session(config.ADMIN_EMAIL)
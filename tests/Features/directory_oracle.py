@@ -0,0 +1,330 @@
+"""
+Verify the booking directory's filters in bulk: generate combinations of name search, clinic, specialization, fee
+range and availability, send each to the getDoctors server action and compare the doctors returned with the set an
+oracle computes from the local stack's seed. A sample of the combinations the booking page can express is also
+applied through the UI and checked against the same oracle.
+
+    python local_stack.py seed --scale medium
+    python directory_oracle.py --scale medium --combinations 5000 --ui-sample 20
+
+--scale must name the volume the stack was seeded with (or pass --reseed). Exits non-zero on any mismatch.
+"""
+import argparse
+import hashlib
+import importlib
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+import config
+import local_stack
+from api_client import AppSession
+from login import get_driver, login
+from native_input import press_key, replace_text
+from results_store import percentile
+
+
+COMBINATIONS = 2000
+UI_SAMPLE = 10
+WORKERS = 8
+SHOWN_MISMATCHES = 20
+UI_WAIT = 15
+# The booking page debounces the search box by 300 ms and the fee slider by 500 ms.
+UI_SETTLE = 0.8
+# The booking page's fee slider: 0 to 1,000,000 cents in steps of 10,000; its maximum means "no limit".
+SLIDER_MAX = 1000000
+SLIDER_STEP = 10000
+# Options of the booking page's specialization select; Psychiatry has no seeded doctors.
+UI_SPECIALIZATIONS = local_stack.SPECIALIZATIONS + ["Psychiatry"]
+FIXED_SEARCHES = ["", "Dr Seb", "sebastian", "PERERA", "Dr Doctor 1", "doctor 2", "1", "99", "zzz", "' OR 1=1 --",
+                  "%", "_", "*", "Dr%Doctor", "Doctor_1", "50%", "\\", "Dr\\ Doctor"]
+
+DISPLAYED_NAMES_JS = """
+return Array.from(document.querySelectorAll(arguments[0]))
+    .map(card => card.querySelector("div[class*='tracking-tight']"))
+    .filter(title => title)
+    .map(title => title.textContent.trim());
+"""
+
+
+def seed_id(kind: str, n: int) -> str:
+    """
+    The ID SEED_SQL gives row n of a kind: md5('kind:n')::uuid.
+    """
+    return str(uuid.UUID(hashlib.md5(f"{kind}:{n}".encode()).hexdigest()))
+
+
+def seeded_directory(scale: str) -> tuple[list[dict], list[dict]]:
+    """
+    Organisations and doctors exactly as local_stack.SEED_SQL creates them for the scale.
+    """
+    volume = local_stack.SCALES[scale]
+    names = local_stack.ORGANISATION_NAMES
+    organisations = [
+        {"id": seed_id("organisation", n), "name": names[n - 1] if n <= len(names) else f"Clinic {n}"}
+        for n in range(1, volume["organisations"] + 1)
+    ]
+    specializations = local_stack.SPECIALIZATIONS
+    doctors = [
+        {
+            "id": seed_id("doctor", n),
+            "organisation_id": seed_id("organisation", (n - 1) % volume["organisations"] + 1),
+            "full_name": {1: "Dr Sebastian Hino", 2: "Dr Sebastian Perera"}.get(n, f"Dr Doctor {n}"),
+            "fee_cents": 1000 + (n * 737) % 20000,
+            "specialization": specializations[(n - 1) % len(specializations)],
+            "available": n % 4 != 0,
+        }
+        for n in range(1, volume["doctors"] + 1)
+    ]
+    return organisations, doctors
+
+
+def ilike_pattern(search: str) -> re.Pattern:
+    """
+    The ILIKE pattern '%search%' that getDoctors builds, as a regex. PostgREST reads * as %; backslash escapes.
+    """
+    pattern, i = "", 0
+    text = f"%{search}%"
+    while i < len(text):
+        char = text[i]
+        if char == "\\" and i + 1 < len(text):
+            pattern += re.escape(text[i + 1])
+            i += 1
+        elif char in "%*":
+            pattern += ".*"
+        elif char == "_":
+            pattern += "."
+        else:
+            pattern += re.escape(char)
+        i += 1
+    return re.compile(pattern, re.IGNORECASE | re.DOTALL)
+
+
+def expected_ids(doctors: list[dict], options: dict) -> set[str]:
+    """
+    The oracle: the doctors getDoctors should return for the options.
+    """
+    search = options.get("search")
+    pattern = ilike_pattern(search) if search else None
+    return {
+        doctor["id"] for doctor in doctors
+        if (not pattern or pattern.fullmatch(doctor["full_name"]))
+        and (not options.get("organisationId") or doctor["organisation_id"] == options["organisationId"])
+        and (options.get("specialization") in (None, "all") or doctor["specialization"] == options["specialization"])
+        and (options.get("minFee") is None or doctor["fee_cents"] >= options["minFee"])
+        and (options.get("maxFee") is None or doctor["fee_cents"] <= options["maxFee"])
+        and (not options.get("availableOnly") or doctor["available"])
+    }
+
+
+def generate(organisations: list[dict], doctors: list[dict], count: int, rng: random.Random) -> list[dict]:
+    """
+    Random filter combinations, biased towards the edges: fees equal to or one off a doctor's fee, inverted fee
+    ranges, wildcards and SQL in the search, a clinic that does not exist, a specialization nobody has.
+    """
+    fees = [doctor["fee_cents"] for doctor in doctors]
+    searches = FIXED_SEARCHES + [
+        name[start:start + rng.randint(1, 8)].swapcase() if rng.random() < 0.3 else name[start:start + rng.randint(1, 8)]
+        for name in (rng.choice(doctors)["full_name"] for _ in range(50))
+        for start in [rng.randrange(len(name))]
+    ]
+    clinics = [organisation["id"] for organisation in organisations] + [str(uuid.UUID(int=rng.getrandbits(128)))]
+
+    def fee():
+        roll = rng.random()
+        if roll < 0.3:
+            return None
+        if roll < 0.7:
+            return rng.choice(fees) + rng.choice([-1, 0, 0, 1])
+        return rng.randint(0, 22000)
+
+    combinations = []
+    for _ in range(count):
+        options = {
+            "search": rng.choice(searches) if rng.random() < 0.7 else None,
+            "organisationId": rng.choice(clinics) if rng.random() < 0.5 else None,
+            "specialization": rng.choice(UI_SPECIALIZATIONS + ["all"]) if rng.random() < 0.4 else None,
+            "minFee": fee(),
+            "maxFee": fee(),
+            "availableOnly": rng.choice([None, False, True]),
+        }
+        combinations.append({key: value for key, value in options.items() if value is not None})
+    return combinations
+
+
+def check_result(doctors_by_id: dict[str, dict], options: dict, result: dict) -> dict | None:
+    """
+    A mismatch record, or None when the result is exactly the oracle's set with the seeded field values.
+    """
+    if "error" in result:
+        return {"options": options, "error": result["error"]}
+    returned = {doctor["id"]: doctor for doctor in result["data"]}
+    expected = expected_ids(list(doctors_by_id.values()), options)
+    wrong_fields = [
+        doctor["full_name"] for doctor_id, doctor in returned.items()
+        if doctor_id in doctors_by_id and any(doctor[key] != doctors_by_id[doctor_id][key] for key in ("organisation_id", "full_name", "fee_cents", "specialization"))
+    ]
+    if set(returned) == expected and not wrong_fields:
+        return None
+
+    def name(doctor_id: str) -> str:
+        return (doctors_by_id.get(doctor_id) or returned[doctor_id])["full_name"]
+
+    return {
+        "options": options,
+        "missing": sorted(name(doctor_id) for doctor_id in expected - set(returned)),
+        "unexpected": sorted(name(doctor_id) for doctor_id in set(returned) - expected),
+        "wrong_fields": wrong_fields,
+    }
+
+
+def verify_api(doctors: list[dict], combinations: list[dict], workers: int) -> tuple[list[dict], list[float], float]:
+    """
+    Send every combination to getDoctors from `workers` patient sessions at once.
+    Returns the mismatches, per-call latencies in ms and the wall time in seconds.
+    """
+    doctors_by_id = {doctor["id"]: doctor for doctor in doctors}
+    local = threading.local()
+
+    def run(options: dict) -> tuple[dict | None, float]:
+        if not hasattr(local, "session"):
+            local.session = AppSession(config.BASE_URL, config.SUPABASE_URL, config.SUPABASE_ANON_KEY,
+                                       config.PATIENT_EMAIL, config.UNIVERSAL_PASSWORD)
+        start = time.monotonic()
+        result = local.session.action("getDoctors", options)
+        return check_result(doctors_by_id, options, result), (time.monotonic() - start) * 1000
+
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        outcomes = list(pool.map(run, combinations))
+    return [mismatch for mismatch, _ in outcomes if mismatch], [ms for _, ms in outcomes], time.monotonic() - start
+
+
+def ui_options(options: dict, rng: random.Random) -> dict:
+    """
+    Turn a combination into one the booking page can express: it always sends minFee 0, sets maxFee only in slider
+    steps and offers a fixed specialization list. Search, clinic and availability are kept.
+    """
+    options = {key: value for key, value in options.items() if key not in ("minFee", "maxFee")}
+    if rng.random() < 0.5:
+        # Seeded fees are below 21,000 cents, so only the first few slider steps tell doctors apart.
+        options["maxFee"] = rng.randrange(4) * SLIDER_STEP
+    return options
+
+
+def select_option(driver, label: str, option_text: str):
+    wait = WebDriverWait(driver, UI_WAIT)
+    wait.until(EC.element_to_be_clickable((By.XPATH, f"//label[normalize-space()='{label}']/following-sibling::button[@role='combobox']"))).click()
+    wait.until(EC.element_to_be_clickable((By.XPATH, f"//*[@role='option' and normalize-space()='{option_text}']"))).click()
+
+
+def apply_in_ui(driver, options: dict, organisations: list[dict]):
+    booking = importlib.import_module("test_doctor-filtering")
+    driver.get(f"{config.BASE_URL}{booking.BOOK_APPOINTMENT_PATH}")
+    search_box = WebDriverWait(driver, UI_WAIT).until(EC.element_to_be_clickable((By.CSS_SELECTOR, booking.SEARCH_SELECTOR)))
+    if options.get("search"):
+        replace_text(search_box, options["search"])
+    if options.get("specialization") not in (None, "all"):
+        select_option(driver, "Specialization", options["specialization"])
+    if options.get("organisationId"):
+        names = {organisation["id"]: organisation["name"] for organisation in organisations}
+        if options["organisationId"] not in names:
+            return False
+        select_option(driver, "Medical Center", names[options["organisationId"]])
+    if options.get("maxFee") is not None:
+        slider = driver.find_element(By.CSS_SELECTOR, 'span[role="slider"]')
+        driver.execute_script("arguments[0].focus();", slider)
+        press_key(driver, Keys.LEFT, (SLIDER_MAX - options["maxFee"]) // SLIDER_STEP)
+    if options.get("availableOnly"):
+        driver.find_element(By.ID, "available").click()
+    return True
+
+
+def verify_ui(organisations: list[dict], doctors: list[dict], combinations: list[dict]) -> list[dict]:
+    booking = importlib.import_module("test_doctor-filtering")
+    names = {doctor["id"]: doctor["full_name"] for doctor in doctors}
+    mismatches = []
+    driver = get_driver(headless=True)
+    try:
+        login(driver, config.BASE_URL, config.PATIENT_EMAIL, config.UNIVERSAL_PASSWORD)
+        for options in combinations:
+            if not apply_in_ui(driver, options, organisations):
+                continue
+            expected = sorted(names[doctor_id] for doctor_id in expected_ids(doctors, {**options, "minFee": 0}))
+            time.sleep(UI_SETTLE)
+            displayed: list[str] = []
+
+            def settled(drv) -> bool:
+                if drv.find_elements(By.CSS_SELECTOR, ".animate-spin"):
+                    return False
+                displayed[:] = sorted(drv.execute_script(DISPLAYED_NAMES_JS, booking.DOCTOR_CARDS_SELECTOR))
+                return displayed == expected
+
+            try:
+                WebDriverWait(driver, UI_WAIT).until(settled)
+            except TimeoutException:
+                mismatches.append({"options": options, "ui": True, "missing": sorted(set(expected) - set(displayed)),
+                                   "unexpected": sorted(set(displayed) - set(expected))})
+    finally:
+        driver.quit()
+    return mismatches
+
+
+def describe(mismatch: dict) -> str:
+    where = "UI" if mismatch.get("ui") else "API"
+    if "error" in mismatch:
+        return f"{where} {json.dumps(mismatch['options'])}: error {mismatch['error']}"
+    parts = [f"{key} {mismatch[key][:5]}{'...' if len(mismatch[key]) > 5 else ''}" for key in ("missing", "unexpected", "wrong_fields") if mismatch.get(key)]
+    return f"{where} {json.dumps(mismatch['options'])}: " + "; ".join(parts)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", default="small", choices=sorted(local_stack.SCALES), help="Volume the local stack is seeded with.")
+    parser.add_argument("--reseed", action="store_true", help="Seed the stack with --scale first.")
+    parser.add_argument("--target", default="local", help="Deployment serving the seeded stack.")
+    parser.add_argument("--combinations", type=int, default=COMBINATIONS)
+    parser.add_argument("--ui-sample", type=int, default=UI_SAMPLE, help="Combinations also checked through the booking page.")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="Concurrent API sessions.")
+    parser.add_argument("--random-seed", type=int, default=0)
+    parser.add_argument("--report", default=None, help="Write every mismatch to this JSON file.")
+    args = parser.parse_args()
+
+    config.BASE_URL = config.resolve_target(args.target)
+    if args.reseed:
+        local_stack.seed(local_stack.stack_env()["DB_URL"], args.scale)
+    rng = random.Random(args.random_seed)
+    organisations, doctors = seeded_directory(args.scale)
+    combinations = generate(organisations, doctors, args.combinations, rng)
+
+    mismatches, latencies, wall = verify_api(doctors, combinations, args.workers)
+    print(f"API: {len(combinations)} combinations against {len(doctors)} seeded doctors in {wall:.1f}s "
+          f"({len(combinations) / wall:.0f}/s with {args.workers} sessions), "
+          f"latency p50 {percentile(latencies, 0.5):.0f} ms, p95 {percentile(latencies, 0.95):.0f} ms, "
+          f"{len(mismatches)} mismatch(es)")
+
+    if args.ui_sample:
+        sample = [ui_options(options, rng) for options in rng.sample(combinations, min(args.ui_sample, len(combinations)))]
+        start = time.monotonic()
+        ui_mismatches = verify_ui(organisations, doctors, sample)
+        print(f"UI: {len(sample)} combinations in {time.monotonic() - start:.1f}s, {len(ui_mismatches)} mismatch(es)")
+        mismatches += ui_mismatches
+
+    for mismatch in mismatches[:SHOWN_MISMATCHES]:
+        print("  " + describe(mismatch))
+    if len(mismatches) > SHOWN_MISMATCHES:
+        print(f"  ... and {len(mismatches) - SHOWN_MISMATCHES} more")
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(mismatches, f, indent=2)
+    raise SystemExit(1 if mismatches else 0)
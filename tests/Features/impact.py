@@ -0,0 +1,390 @@
+"""
+Select the tests a change can affect, from the files it touches.
+
+    python impact.py origin/main                     # impacted tests of the changes since origin/main, and why
+    python -m pytest --impacted-by origin/main       # run only those
+
+App files are traced through their imports to the pages that use them, so a change maps to app routes and to the
+server actions it can reach. SQL files map to the tables and functions they define, and from there to the app files
+that query them. Routes and actions map to tests through the paths each test module names (PROFILE_PATH,
+BOOK_APPOINTMENT_PATH, ...), the actions it calls over HTTP, and the routes and actions each test loaded in
+earlier runs (results_store.coverage). Anything that cannot be mapped selects the whole suite.
+"""
+import argparse
+import ast
+import fnmatch
+import functools
+import os
+import re
+import subprocess
+from dataclasses import dataclass, field
+
+import results_store
+from throttling import route_of
+
+
+FEATURES_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(os.path.dirname(FEATURES_DIR))
+SOURCE_DIRS = ["app", "components", "hooks", "lib", "utils"]
+SOURCE_SUFFIXES = (".ts", ".tsx", ".js", ".jsx")
+# Root files Next.js runs for every request or the whole app; whatever they import reaches every test.
+ENTRY_FILES = ["middleware.*", "instrumentation*", "next.config.*"]
+SQL_DIRS = ["database", "supabase"]
+# Files Next.js turns into routes; the others in this list wrap every page below their directory.
+PAGE_FILES = {"page", "route"}
+WRAPPER_FILES = {"layout", "template", "loading", "error", "not-found"}
+# Changes here cannot affect a test run.
+IGNORED = ["*.md", "*.txt", "tests/test-cases/*"]
+# conftest.py and config.py reach every test, and with them every helper conftest imports.
+GLOBAL_MODULES = ["conftest", "config"]
+# Every browser test signs in through this module first, so the routes it loads are global too.
+LOGIN_MODULE = "login"
+IMPORT_PATTERN = re.compile(r"""(?:\bfrom\s*|\bimport\s*\(\s*|^\s*import\s+)['"]([^'"]+)['"]""", re.M)
+USE_SERVER_PATTERN = re.compile(r"""^\s*['"]use server['"]""", re.M)
+EXPORT_PATTERN = re.compile(r"^export\s+(?:async\s+)?(?:function\s+|const\s+)(\w+)", re.M)
+QUERY_PATTERN = re.compile(r"""\.(?:from|rpc)\(\s*['"](\w+)['"]""")
+SQL_OBJECT_PATTERN = re.compile(
+    r"""(?:\btable\s+(?:if\s+(?:not\s+)?exists\s+)?|\bfunction\s+|\bon\s+|\binto\s+|\bupdate\s+)(?:public\.)?"?(\w+)"?""",
+    re.I,
+)
+ROUTE_LITERAL_PATTERN = re.compile(r"(?:\[param\])*(/[\w\-.]+(?:/[\w\-.\[\]]*)*)")
+# Placeholders of str.format templates such as public_load.PUBLIC_PATH = "/public/{id}".
+FORMAT_FIELD_PATTERN = re.compile(r"\{\w*\}")
+
+
+@dataclass
+class Impact:
+    """
+    Tests selected for a change. `full_run` maps the files that select everything to the reason; `modules` and
+    `tests` map selected test modules and node IDs to the reasons they were selected.
+    """
+    full_run: dict[str, str] = field(default_factory=dict)
+    modules: dict[str, set[str]] = field(default_factory=dict)
+    tests: dict[str, set[str]] = field(default_factory=dict)
+
+    def selects(self, nodeid: str) -> bool:
+        return bool(self.full_run) or nodeid.split("::")[0] in self.modules or nodeid.split("[")[0] in self.tests
+
+    def describe(self) -> list[str]:
+        if self.full_run:
+            return [f"full run: {path} {reason}" for path, reason in self.full_run.items()]
+        lines = [f"{module}: {', '.join(sorted(reasons))}" for module, reasons in sorted(self.modules.items())]
+        lines += [f"{nodeid}: {', '.join(sorted(reasons))}" for nodeid, reasons in sorted(self.tests.items())]
+        return lines or ["no impacted tests"]
+
+
+def changed_files(ref: str) -> list[str]:
+    """
+    Repository paths that differ from `ref`, including uncommitted and untracked files.
+    """
+    def git(*args: str) -> list[str]:
+        return subprocess.run(["git", *args], cwd=REPO_ROOT, capture_output=True, text=True, check=True).stdout.splitlines()
+
+    return sorted(set(git("diff", "--name-only", ref)) | set(git("ls-files", "--others", "--exclude-standard")))
+
+
+@functools.cache
+def _read(path: str) -> str:
+    with open(os.path.join(REPO_ROOT, path), encoding="utf-8", errors="replace") as f:
+        return f.read()
+
+
+def _entry(path: str) -> bool:
+    return "/" not in path and any(fnmatch.fnmatch(path, pattern) for pattern in ENTRY_FILES)
+
+
+def source_files() -> list[str]:
+    files = [name for name in os.listdir(REPO_ROOT) if _entry(name) and os.path.isfile(os.path.join(REPO_ROOT, name))]
+    for top in SOURCE_DIRS:
+        for directory, _, names in os.walk(os.path.join(REPO_ROOT, top)):
+            files += [os.path.relpath(os.path.join(directory, name), REPO_ROOT).replace(os.sep, "/")
+                      for name in names if name.endswith(SOURCE_SUFFIXES)]
+    return files
+
+
+def _resolve(spec: str, importer: str, files: set[str]) -> str | None:
+    if spec.startswith("@/"):
+        base = spec[2:]
+    elif spec.startswith("."):
+        base = os.path.normpath(os.path.join(os.path.dirname(importer), spec)).replace(os.sep, "/")
+    else:
+        return None
+    candidates = [base] + [base + suffix for suffix in SOURCE_SUFFIXES] + [f"{base}/index{suffix}" for suffix in SOURCE_SUFFIXES]
+    return next((candidate for candidate in candidates if candidate in files), None)
+
+
+def importers(files: list[str]) -> dict[str, set[str]]:
+    """
+    For every app source file, the source files that import it.
+    """
+    known = set(files)
+    graph: dict[str, set[str]] = {}
+    for path in files:
+        for spec in IMPORT_PATTERN.findall(_read(path)):
+            target = _resolve(spec, path, known)
+            if target:
+                graph.setdefault(target, set()).add(path)
+    return graph
+
+
+def page_route(path: str) -> str:
+    """
+    Route of a file under app/, e.g. app/(dashboard)/profile/page.tsx to /profile; route groups and slots are dropped.
+    """
+    segments = path.split("/")[1:-1]
+    return "/" + "/".join(s for s in segments if not (s.startswith("(") and s.endswith(")")) and not s.startswith("@"))
+
+
+def _stem(path: str) -> str:
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def reachable_routes(path: str, graph: dict[str, set[str]], files: list[str]) -> tuple[set[str], set[str], set[str]]:
+    """
+    App routes whose pages import `path`, directly or through other files, the server actions those files export,
+    and the ENTRY_FILES among them.
+    """
+    seen, pending = {path}, [path]
+    while pending:
+        for importer in graph.get(pending.pop(), ()):
+            if importer not in seen:
+                seen.add(importer)
+                pending.append(importer)
+
+    pages = [f for f in files if f.startswith("app/") and _stem(f) in PAGE_FILES]
+    routes, actions = set(), set()
+    for reached in seen:
+        if reached.startswith("app/") and _stem(reached) in PAGE_FILES:
+            routes.add(page_route(reached))
+        elif reached.startswith("app/") and _stem(reached) in WRAPPER_FILES:
+            directory = os.path.dirname(reached) + "/"
+            routes |= {page_route(page) for page in pages if page.startswith(directory)}
+        source = _read(reached)
+        if USE_SERVER_PATTERN.search(source):
+            actions |= set(EXPORT_PATTERN.findall(source))
+    return routes, actions, {reached for reached in seen if _entry(reached)}
+
+
+def sql_objects(path: str) -> set[str]:
+    """
+    Tables and functions a SQL file creates, alters or writes.
+    """
+    return {name.lower() for name in SQL_OBJECT_PATTERN.findall(_read(path))} - {"public", "if", "table", "function"}
+
+
+def routes_match(tested: str, route: str) -> bool:
+    """
+    Whether a route a test names matches an app route; dynamic segments, [id] on either side, match any segment.
+    """
+    left, right = tested.rstrip("/").split("/"), route.rstrip("/").split("/")
+    if right and right[-1].startswith("[..."):
+        right, left = right[:-1], left[:len(right) - 1]
+    return len(left) == len(right) and all(a == b or a.startswith("[") or b.startswith("[") for a, b in zip(left, right))
+
+
+def _route_literal(node: ast.AST) -> str | None:
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        text = node.value
+    elif isinstance(node, ast.JoinedStr):
+        text = "".join(part.value if isinstance(part, ast.Constant) else "[param]" for part in node.values)
+    else:
+        return None
+    match = ROUTE_LITERAL_PATTERN.fullmatch(FORMAT_FIELD_PATTERN.sub("[param]", text.split("?")[0]))
+    return route_of(match.group(1)) if match else None
+
+
+@dataclass
+class ModuleRefs:
+    """
+    What a module of the suite refers to: route literals, string literals (action names among them), the suite
+    modules it imports, and the names it uses from them, through `importlib.import_module` aliases, plain imports
+    or `from` imports.
+    """
+    routes: set[str] = field(default_factory=set)
+    strings: set[str] = field(default_factory=set)
+    imports: set[str] = field(default_factory=set)
+    constants: dict[str, str] = field(default_factory=dict)
+    attributes: set[tuple[str, str]] = field(default_factory=set)
+
+
+def module_refs(path: str, local: set[str]) -> ModuleRefs:
+    refs = ModuleRefs()
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    aliases: dict[str, str] = {}
+    # Tables keyed by action name, such as api_client.ACTION_PAGES, list actions without calling them; docstrings
+    # only mention them.
+    keys = {id(key) for node in ast.walk(tree) if isinstance(node, ast.Dict) for key in node.keys}
+    keys |= {id(node.value) for node in ast.walk(tree) if isinstance(node, ast.Expr)}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            refs.imports |= {alias.name for alias in node.names if alias.name in local}
+            aliases.update({alias.asname or alias.name: alias.name for alias in node.names if alias.name in local})
+        elif isinstance(node, ast.ImportFrom) and node.module in local:
+            refs.imports.add(node.module)
+            refs.attributes |= {(node.module, alias.name) for alias in node.names}
+        elif isinstance(node, ast.Assign) and isinstance(node.value, ast.Call) and getattr(node.value.func, "attr", None) == "import_module":
+            module = node.value.args[0].value if node.value.args and isinstance(node.value.args[0], ast.Constant) else None
+            if module in local:
+                refs.imports.add(module)
+                aliases.update({target.id: module for target in node.targets if isinstance(target, ast.Name)})
+        elif isinstance(node, ast.Constant) and isinstance(node.value, str) and id(node) not in keys:
+            refs.strings.add(node.value)
+        route = _route_literal(node)
+        if route:
+            refs.routes.add(route)
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            route = _route_literal(node.value)
+            if route:
+                refs.constants[node.targets[0].id] = route
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name) and node.value.id in aliases:
+            refs.attributes.add((aliases[node.value.id], node.attr))
+    return refs
+
+
+def suite_refs() -> dict[str, ModuleRefs]:
+    """
+    References of every module of the suite. A module also names the routes of the other modules' constants it
+    uses, and the strings of the helpers it imports, which is how API tests name the actions they call.
+    """
+    names = {_stem(name) for name in os.listdir(FEATURES_DIR) if name.endswith(".py")}
+    refs = {name: module_refs(os.path.join(FEATURES_DIR, f"{name}.py"), names) for name in names}
+    for name, module in refs.items():
+        module.routes |= {refs[other].constants[attr] for other, attr in module.attributes if attr in refs[other].constants}
+
+    def helpers(name: str, seen: set[str]) -> set[str]:
+        for imported in refs[name].imports - seen:
+            if not imported.startswith("test_"):
+                seen.add(imported)
+                helpers(imported, seen)
+        return seen
+
+    for name, module in refs.items():
+        for helper in helpers(name, set()):
+            module.strings |= refs[helper].strings
+    return refs
+
+
+def dependents(module: str, refs: dict[str, ModuleRefs]) -> set[str]:
+    """
+    Modules of the suite that import `module`, directly or through other modules.
+    """
+    found, pending = {module}, [module]
+    while pending:
+        current = pending.pop()
+        for name, module_ref in refs.items():
+            if current in module_ref.imports and name not in found:
+                found.add(name)
+                pending.append(name)
+    return found
+
+
+def imported(module: str, refs: dict[str, ModuleRefs]) -> set[str]:
+    """
+    `module` and the modules of the suite it imports, directly or through other modules.
+    """
+    found, pending = {module}, [module]
+    while pending:
+        for name in refs[pending.pop()].imports - found:
+            found.add(name)
+            pending.append(name)
+    return found
+
+
+def select(changed: list[str], covered: dict[str, set[str]] | None = None) -> Impact:
+    """
+    Map changed repository paths to the test modules and tests they can affect.
+    """
+    impact = Impact()
+    refs = suite_refs()
+    global_modules = set().union(*(imported(m, refs) for m in GLOBAL_MODULES if m in refs))
+    global_routes = refs[LOGIN_MODULE].routes
+    files = source_files()
+    graph = importers(files)
+    queried = set().union(*(QUERY_PATTERN.findall(_read(f)) for f in files))
+    tests_dir = os.path.relpath(FEATURES_DIR, REPO_ROOT).replace(os.sep, "/") + "/"
+
+    def add(module: str, reason: str):
+        impact.modules.setdefault(f"{module}.py", set()).add(reason)
+
+    for path in changed:
+        if any(fnmatch.fnmatch(path, pattern) for pattern in IGNORED):
+            continue
+        if path.startswith(tests_dir) and path.endswith(".py") and "/" not in path[len(tests_dir):]:
+            module = _stem(path)
+            if module in global_modules:
+                impact.full_run[path] = "is shared by every test"
+            elif module in refs:
+                for dependent in dependents(module, refs):
+                    if dependent.startswith("test_"):
+                        add(dependent, path)
+            # A deleted module of the suite leaves nothing to run; its importers fail at collection anyway.
+            continue
+
+        if path in files:
+            sources = [path]
+        elif path.endswith(".sql") and path.split("/")[0] in SQL_DIRS and os.path.exists(os.path.join(REPO_ROOT, path)):
+            objects = sql_objects(path) & queried
+            if not objects:
+                impact.full_run[path] = "changes no table or function the app queries"
+                continue
+            sources = [f for f in files if objects & set(QUERY_PATTERN.findall(_read(f)))]
+            # Volume benchmarks and API tests also read and write these tables directly.
+            for name, module in refs.items():
+                words = {word for string in module.strings for word in re.findall(r"\w+", string)}
+                if name.startswith("test_") and objects & words:
+                    add(name, f"{path} via {', '.join(sorted(objects & words))}")
+        else:
+            impact.full_run[path] = "is not mapped to tests"
+            continue
+
+        routes, actions, entries = set(), set(), set()
+        for source in sources:
+            reached_routes, reached_actions, reached_entries = reachable_routes(source, graph, files)
+            routes |= reached_routes
+            actions |= reached_actions
+            entries |= reached_entries
+        if entries:
+            impact.full_run[path] = f"runs on every request through {', '.join(sorted(entries))}"
+            continue
+        if any(routes_match(tested, route) for tested in global_routes for route in routes):
+            impact.full_run[path] = "reaches the sign-in page every test uses"
+            continue
+
+        matched = False
+        for name, module in refs.items():
+            if not name.startswith("test_"):
+                continue
+            hits = {route for route in routes if any(routes_match(tested, route) for tested in module.routes)}
+            hits |= {f"action {action}" for action in actions & module.strings}
+            if hits:
+                add(name, f"{path} via {', '.join(sorted(hits))}")
+                matched = True
+        for nodeid, items in (covered or {}).items():
+            hits = {item for item in items if item.startswith("action ") and item[7:] in actions}
+            hits |= {item for item in items if not item.startswith("action ") and any(routes_match(item, route) for route in routes)}
+            if hits:
+                impact.tests.setdefault(nodeid.split("[")[0], set()).add(f"{path} via {', '.join(sorted(hits))} in earlier runs")
+                matched = True
+        if not matched and not any(path in reason for reasons in impact.modules.values() for reason in reasons):
+            # Nothing maps it to a test, which is not the same as no test depending on it.
+            impact.full_run[path] = "reaches no tested route or action"
+    return impact
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("ref", help="Git revision to diff against, e.g. origin/main.")
+    parser.add_argument("--store", default=results_store.STORE_PATH)
+    parser.add_argument("--last", type=int, default=results_store.DEFAULT_LAST_RUNS, help="Runs of recorded coverage to use.")
+    args = parser.parse_args()
+
+    covered = results_store.coverage(results_store.connect(args.store), args.last) if os.path.exists(args.store) else {}
+    try:
+        changed = changed_files(args.ref)
+    except subprocess.CalledProcessError as e:
+        raise SystemExit(e.stderr.strip())
+    for line in select(changed, covered).describe():
+        print(line)
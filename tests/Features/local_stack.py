@@ -0,0 +1,517 @@
+"""
+Build a local Supabase stack (Postgres, auth, PostgREST, storage) from the repo's SQL files, seed it with a
+deterministic data volume, and optionally serve a production build of the app on top of it.
+
+    python local_stack.py up --scale medium --app   # start the stack, apply the schema, seed, build and start the app
+    eval "$(python local_stack.py env)"             # point config.BASE_URL and the API tier at the local stack
+    python local_stack.py seed --scale large        # replace the data with another volume
+    python local_stack.py down
+
+Needs Docker, the Supabase CLI, psql and, for --app, Node.js.
+"""
+import argparse
+import glob
+import os
+import re
+import signal
+import subprocess
+import time
+
+import requests
+
+import config
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+STACK_DIR = os.path.join(REPO_ROOT, "tests", ".local_stack")
+APP_PID_PATH = os.path.join(STACK_DIR, "app.pid")
+APP_LOG_PATH = os.path.join(STACK_DIR, "app.log")
+APP_PORT = int(config.TARGETS["local"].rsplit(":", 1)[1])
+APP_START_TIMEOUT = 120
+CRON_SECRET = "local"
+# The booking concurrency tests log in dozens of seeded patients at once; the CLI's default allows 30 per 5 minutes.
+AUTH_SIGN_IN_LIMIT = 1000
+# PostgREST returns at most max_rows rows per request, 1000 by default, which would cut the booking and note history
+# volumes short; this is above the largest one (100k archived versions).
+API_MAX_ROWS = 200000
+# Containers the harness never talks to.
+EXCLUDED_SERVICES = "studio,imgproxy,edge-runtime,logflare,vector,realtime,postgres-meta,supavisor"
+
+# The database/ files have no sortable names, so their order is spelled out; globs expand in name order.
+# supabase_schema.sql is a later snapshot of the base tables, so the older files that also create those tables
+# only contribute their indexes, policies and triggers.
+SCHEMA_FILES = [
+    "database/supabase_schema.sql",
+    "database/supabase_appointments_schema.sql",
+    "database/supabase_doctor_schedules.sql",
+    "database/appointment_requests_schema.sql",
+    "database/supabase_followup_migration.sql",
+    "database/supabase_reminder_migration.sql",
+    "database/add_consultation_fields.sql",
+    "database/treatment_plan_schema.sql",
+    "database/migrations/*.sql",
+    "database/fix_schema_relationships.sql",
+    "database/fix_appointment_requests_rls.sql",
+    "supabase/migrations/*.sql",
+    # After session_based_appointments, whose doctor_sessions (with organisation_id) is the one the app uses.
+    "database/add_sessions.sql",
+    "database/fix_medical_records_tables.sql",
+    "database/fix_appointment_id_type.sql",
+]
+# Re-creating an object that an earlier file already created is expected with the overlapping files above.
+TOLERATED_SQLSTATES = {
+    "42P07": "duplicate table or index",
+    "42710": "duplicate object",
+    "42701": "duplicate column",
+    "42723": "duplicate function",
+}
+SQL_ERROR_PATTERN = re.compile(r"ERROR:\s+([0-9A-Z]{5}):\s*(.*)")
+
+# Objects the repo's SQL assumes already exist: supabase_schema.sql references organisations before creating it,
+# and no file creates medical_records (later migrations only alter it).
+PRELUDE_SQL = """
+create table if not exists public.organisations (
+  id uuid not null default gen_random_uuid (),
+  name text not null,
+  created_at timestamp with time zone not null default now(),
+  constraint organisations_pkey primary key (id)
+);
+
+create table if not exists public.medical_records (
+  id uuid not null default gen_random_uuid (),
+  patient_id uuid not null references auth.users (id) on delete cascade,
+  doctor_id uuid not null references auth.users (id) on delete cascade,
+  file_url text not null,
+  file_name text not null,
+  description text null,
+  created_at timestamp with time zone not null default now(),
+  constraint medical_records_pkey primary key (id)
+);
+"""
+# Policies and buckets that exist in the hosted project but not in the repo; medical_records has RLS enabled by
+# fix_medical_records_tables.sql and would otherwise be unreadable.
+POSTLUDE_SQL = """
+create policy "Doctors can manage their records" on public.medical_records for all to authenticated
+  using (auth.uid() = doctor_id) with check (auth.uid() = doctor_id);
+create policy "Doctors can view patient records" on public.medical_records for select to authenticated
+  using (exists (select 1 from public.profiles where id = auth.uid() and role = 'doctor'));
+create policy "Patients can view their records" on public.medical_records for select to authenticated
+  using (auth.uid() = patient_id);
+
+insert into storage.buckets (id, name, public) values ('medical-records', 'medical-records', false)
+on conflict (id) do nothing;
+"""
+
+SCALES = {
+    "small": {"organisations": 3, "doctors": 20, "patients": 100, "session_days": 14, "appointments_per_patient": 3,
+              "plan_every": 5, "notes_per_patient": 2, "versions_per_note": 3},
+    "medium": {"organisations": 10, "doctors": 200, "patients": 2000, "session_days": 30, "appointments_per_patient": 5,
+               "plan_every": 5, "notes_per_patient": 3, "versions_per_note": 5},
+    "large": {"organisations": 50, "doctors": 1000, "patients": 20000, "session_days": 60, "appointments_per_patient": 10,
+              "plan_every": 3, "notes_per_patient": 5, "versions_per_note": 10},
+}
+# One organisation whose two doctors have both seen every patient, so the doctor's and the admin's patient lists
+# each hold the whole volume.
+PATIENT_LIST_SIZES = {"list-100": 100, "list-1k": 1000, "list-10k": 10000, "list-50k": 50000}
+SCALES.update({
+    name: {"organisations": 1, "doctors": 2, "patients": patients, "session_days": 7, "appointments_per_patient": 2,
+           "plan_every": 10, "notes_per_patient": 1, "versions_per_note": 1}
+    for name, patients in PATIENT_LIST_SIZES.items()
+})
+# Growing clinic networks for the booking page: 50 doctors per clinic, each with a full weekly schedule as
+# scripts/seed-schedules.js creates, and ten patients per doctor with booked appointments.
+BOOKING_VOLUMES = {"booking-100": 100, "booking-1k": 1000, "booking-5k": 5000}
+SCALES.update({
+    name: {"organisations": max(1, doctors // 50), "doctors": doctors, "patients": doctors * 10, "session_days": 14,
+           "appointments_per_patient": 5, "plan_every": 10, "notes_per_patient": 1, "versions_per_note": 1,
+           "schedule_days": 7}
+    for name, doctors in BOOKING_VOLUMES.items()
+})
+# Chronic-care protocols: every template has 10, 100 or 500 workflow steps and every patient an active plan on one
+# of them, so treatment_plan_appointments holds patients x steps rows.
+TEMPLATE_VOLUMES = {"steps-10": 10, "steps-100": 100, "steps-500": 500}
+SCALES.update({
+    name: {"organisations": 3, "doctors": 20, "patients": 1000, "session_days": 14, "appointments_per_patient": 3,
+           "plan_every": 1, "notes_per_patient": 1, "versions_per_note": 1, "template_steps": steps}
+    for name, steps in TEMPLATE_VOLUMES.items()
+})
+# Long-term patients: patient 1's open draft with doctor 1 carries 10, 1k or 100k archived versions.
+NOTE_HISTORY_VOLUMES = {"history-10": 10, "history-1k": 1000, "history-100k": 100000}
+SCALES.update({
+    name: {"organisations": 3, "doctors": 20, "patients": 100, "session_days": 14, "appointments_per_patient": 3,
+           "plan_every": 5, "notes_per_patient": 1, "versions_per_note": 1, "history_versions": versions}
+    for name, versions in NOTE_HISTORY_VOLUMES.items()
+})
+# Years of profile edits: audit_logs pre-grown to 1M or 5M PROFILE_UPDATE entries spread over all patients.
+AUDIT_VOLUMES = {"audit-empty": 0, "audit-1m": 1000000, "audit-5m": 5000000}
+SCALES.update({
+    name: {"organisations": 3, "doctors": 20, "patients": 200, "session_days": 14, "appointments_per_patient": 3,
+           "plan_every": 5, "notes_per_patient": 1, "versions_per_note": 1, "audit_rows": rows}
+    for name, rows in AUDIT_VOLUMES.items()
+})
+# Weekdays only unless a scale sets schedule_days = 7; five-step templates unless it sets template_steps; no extra
+# history or audit entries unless it sets history_versions or audit_rows.
+DEFAULT_SCHEDULE_DAYS = 5
+DEFAULT_TEMPLATE_STEPS = 5
+DEFAULT_HISTORY_VERSIONS = 0
+DEFAULT_AUDIT_ROWS = 0
+ORGANISATION_NAMES = ["MedClinic", "HealthClinic"]
+SPECIALIZATIONS = ["General Practice", "Cardiology", "Dermatology", "Pediatrics", "Neurology", "Orthopedics"]
+SLOTS_PER_DAY = 12
+
+# Every ID is md5(kind:n), so the same scale always produces the same rows. Doctor 1, patient 1 and the admin are
+# the accounts in config.py; doctors 1 and 2 are both "Dr Seb..." so the name-search tests find one per clinic.
+SEED_SQL = """
+begin;
+truncate auth.users, public.profiles, public.organisations, public.diagnoses cascade;
+
+create temporary table seed_users on commit drop as
+select md5('doctor:' || n)::uuid as id, 'doctor' as role, n,
+       case when n = 1 then %(doctor_email)s else 'doctor' || n || '@seed.local' end as email
+from generate_series(1, %(doctors)s) n
+union all
+select md5('patient:' || n)::uuid, 'patient', n,
+       case when n = 1 then %(patient_email)s else 'patient' || n || '@seed.local' end
+from generate_series(1, %(patients)s) n
+union all
+select md5('admin:1')::uuid, 'admin', 1, %(admin_email)s;
+
+with password as (select extensions.crypt(%(password)s, extensions.gen_salt('bf')) as hash)
+insert into auth.users (instance_id, id, aud, role, email, encrypted_password, email_confirmed_at,
+                        raw_app_meta_data, raw_user_meta_data, created_at, updated_at,
+                        confirmation_token, recovery_token, email_change_token_new, email_change)
+select '00000000-0000-0000-0000-000000000000', u.id, 'authenticated', 'authenticated', u.email, password.hash, now(),
+       '{"provider": "email", "providers": ["email"]}', '{}', now(), now(), '', '', '', ''
+from seed_users u, password;
+
+insert into auth.identities (id, provider_id, user_id, identity_data, provider, last_sign_in_at, created_at, updated_at)
+select u.id, u.id::text, u.id, jsonb_build_object('sub', u.id::text, 'email', u.email, 'email_verified', true),
+       'email', now(), now(), now()
+from seed_users u;
+
+insert into public.organisations (id, name)
+select md5('organisation:' || n)::uuid, coalesce((%(organisation_names)s::text[])[n], 'Clinic ' || n)
+from generate_series(1, %(organisations)s) n;
+
+insert into public.profiles (id, role, organisation_id, full_name, fee_cents, specialization, phone)
+select u.id, u.role,
+       case u.role
+         when 'doctor' then md5('organisation:' || ((u.n - 1) %% %(organisations)s + 1))::uuid
+         when 'admin' then md5('organisation:1')::uuid
+       end,
+       case
+         when u.role = 'doctor' and u.n = 1 then 'Dr Sebastian Hino'
+         when u.role = 'doctor' and u.n = 2 then 'Dr Sebastian Perera'
+         when u.role = 'doctor' then 'Dr Doctor ' || u.n
+         when u.role = 'admin' then 'Clinic Admin'
+         else 'Patient ' || u.n
+       end,
+       case when u.role = 'doctor' then 1000 + (u.n * 737) %% 20000 else 0 end,
+       case when u.role = 'doctor' then (%(specializations)s::text[])[(u.n - 1) %% %(specialization_count)s + 1] end,
+       '+9477' || lpad((1000000 + u.n)::text, 7, '0')
+from seed_users u;
+
+-- One doctor in four has no available weekday, so availableOnly filters something out.
+insert into public.doctor_schedules (doctor_id, day_of_week, is_available)
+select md5('doctor:' || n)::uuid, day %% 7, n %% 4 <> 0
+from generate_series(1, %(doctors)s) n, generate_series(1, %(schedule_days)s) day;
+
+insert into public.doctor_sessions (id, doctor_id, organisation_id, date, start_time, end_time, slot_duration_minutes, label)
+select md5('session:' || n || ':' || day)::uuid, md5('doctor:' || n)::uuid,
+       md5('organisation:' || ((n - 1) %% %(organisations)s + 1))::uuid,
+       current_date + day, '09:00', '12:00', 15, 'Morning'
+from generate_series(1, %(doctors)s) n, generate_series(1, %(session_days)s) day;
+
+-- Appointment a belongs to patient a / per_patient + 1 and takes slot a / doctors of doctor a %% doctors,
+-- alternating between future and past days, so no two appointments collide.
+insert into public.appointments (id, patient_id, doctor_id, organisation_id, appointment_date, start_time, end_time,
+                                 status, payment_status, previous_appointment_id, session_id)
+select md5('appointment:' || a)::uuid,
+       md5('patient:' || (a / %(appointments_per_patient)s + 1))::uuid,
+       md5('doctor:' || (a %% %(doctors)s + 1))::uuid,
+       md5('organisation:' || ((a %% %(doctors)s) %% %(organisations)s + 1))::uuid,
+       slot.date, slot.start_time, slot.start_time + interval '15 minutes',
+       case when slot.date > current_date then 'confirmed' else 'completed' end,
+       case when slot.date > current_date then 'pending' else 'paid' end,
+       case when a %% %(appointments_per_patient)s > 0 and (a / %(appointments_per_patient)s) %% 3 = 0
+            then md5('appointment:' || (a - 1))::uuid end,
+       case when slot.date > current_date and slot.date - current_date <= %(session_days)s
+            then md5('session:' || (a %% %(doctors)s + 1) || ':' || (slot.date - current_date))::uuid end
+from generate_series(0, %(patients)s * %(appointments_per_patient)s - 1) a,
+     lateral (
+       select case when (a / %(doctors)s / %(slots_per_day)s) %% 2 = 0
+                   then current_date + (a / %(doctors)s / %(slots_per_day)s) / 2 + 1
+                   else current_date - (a / %(doctors)s / %(slots_per_day)s + 1) / 2 end as date,
+              time '09:00' + ((a / %(doctors)s) %% %(slots_per_day)s) * interval '15 minutes' as start_time
+     ) slot;
+
+insert into public.diagnoses (id, name, description)
+select md5('diagnosis:' || n)::uuid, 'Diagnosis ' || n, 'Seeded diagnosis ' || n
+from generate_series(1, 10) n;
+
+insert into public.treatment_templates (id, diagnosis_id, name, description)
+select md5('template:' || n)::uuid, md5('diagnosis:' || ((n - 1) %% 10 + 1))::uuid, 'Template ' || n, 'Seeded template ' || n
+from generate_series(1, 20) n;
+
+insert into public.treatment_template_steps (id, template_id, step_order, title, appointment_type, suggested_time_gap)
+select md5('step:' || n || ':' || step)::uuid, md5('template:' || n)::uuid, step, 'Step ' || step,
+       case when step = 1 then 'consultation' else 'checkup' end, (step * 14) * interval '1 day'
+from generate_series(1, 20) n, generate_series(1, %(template_steps)s) step;
+
+insert into public.patient_treatment_plans (id, patient_id, doctor_id, diagnosis_id, template_id)
+select md5('plan:' || p)::uuid, md5('patient:' || p)::uuid,
+       md5('doctor:' || (((p - 1) * %(appointments_per_patient)s) %% %(doctors)s + 1))::uuid,
+       md5('diagnosis:' || ((p - 1) %% 20 %% 10 + 1))::uuid, md5('template:' || ((p - 1) %% 20 + 1))::uuid
+from generate_series(1, %(patients)s) p
+where (p - 1) %% %(plan_every)s = 0;
+
+insert into public.treatment_plan_appointments (plan_id, step_id, status)
+select md5('plan:' || p)::uuid, md5('step:' || ((p - 1) %% 20 + 1) || ':' || step)::uuid,
+       case when step = 1 then 'completed' else 'pending' end
+from generate_series(1, %(patients)s) p, generate_series(1, %(template_steps)s) step
+where (p - 1) %% %(plan_every)s = 0;
+
+-- The last note of each patient is a draft; earlier ones are finalized.
+insert into public.medical_records (id, patient_id, doctor_id, content, status, created_at, updated_at)
+select md5('record:' || p || ':' || k)::uuid, md5('patient:' || p)::uuid,
+       md5('doctor:' || (((p - 1) * %(appointments_per_patient)s) %% %(doctors)s + 1))::uuid,
+       '<p>Clinical note ' || k || ' for patient ' || p || '.</p>',
+       case when k = %(notes_per_patient)s then 'draft' else 'finalized' end,
+       now() - (%(notes_per_patient)s - k) * interval '7 days', now() - (%(notes_per_patient)s - k) * interval '7 days'
+from generate_series(1, %(patients)s) p, generate_series(1, %(notes_per_patient)s) k;
+
+insert into public.medical_record_versions (medical_record_id, content, created_by, created_at)
+select r.id, '<p>Revision ' || v || '.</p>', r.doctor_id, r.created_at + v * interval '1 hour'
+from public.medical_records r, generate_series(1, %(versions_per_note)s) v;
+
+insert into public.medical_record_versions (medical_record_id, content, created_by, created_at)
+select md5('record:1:' || %(notes_per_patient)s)::uuid, '<p>Archived revision ' || v || '.</p>', md5('doctor:1')::uuid,
+       now() - (%(history_versions)s - v) * interval '1 minute'
+from generate_series(1, %(history_versions)s) v;
+
+insert into public.audit_logs (user_id, action, details, created_at)
+select md5('patient:' || (e %% %(patients)s + 1))::uuid, 'PROFILE_UPDATE',
+       jsonb_build_object('bio', jsonb_build_object('old', 'Entry ' || (e - 1), 'new', 'Entry ' || e)),
+       now() - (%(audit_rows)s - e) * interval '1 minute'
+from generate_series(1, %(audit_rows)s) e;
+
+commit;
+analyze;
+"""
+
+
+class StackError(Exception):
+    pass
+
+
+def _literal(value) -> str:
+    if isinstance(value, (list, tuple)):
+        return "array[" + ", ".join(_literal(item) for item in value) + "]"
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def schema_files() -> list[str]:
+    """
+    Every .sql file in application order. Fails on files missing from SCHEMA_FILES, so new ones get placed deliberately.
+    """
+    ordered = []
+    for pattern in SCHEMA_FILES:
+        matches = sorted(glob.glob(os.path.join(REPO_ROOT, pattern)))
+        if not matches and "*" not in pattern:
+            raise StackError(f"{pattern} is listed in SCHEMA_FILES but does not exist")
+        ordered.extend(path for path in matches if path not in ordered)
+    on_disk = {
+        path for folder in ("database", "database/migrations", "supabase/migrations")
+        for path in glob.glob(os.path.join(REPO_ROOT, folder, "*.sql"))
+    }
+    unplaced = sorted(os.path.relpath(path, REPO_ROOT) for path in on_disk - set(ordered))
+    if unplaced:
+        raise StackError(f"Add these files to SCHEMA_FILES in the right place: {', '.join(unplaced)}")
+    return ordered
+
+
+def supabase(*args: str, capture: bool = False) -> str:
+    result = subprocess.run(
+        ["supabase", *args, "--workdir", STACK_DIR],
+        stdin=subprocess.DEVNULL, capture_output=capture, text=True,
+    )
+    if result.returncode != 0:
+        raise StackError(f"supabase {' '.join(args)} failed{': ' + result.stderr if capture else ''}")
+    return result.stdout if capture else ""
+
+
+def stack_env() -> dict[str, str]:
+    """
+    Connection details of the running stack: API_URL, DB_URL, ANON_KEY, SERVICE_ROLE_KEY, ...
+    """
+    env = {}
+    for line in supabase("status", "-o", "env", capture=True).splitlines():
+        key, sep, value = line.partition("=")
+        if sep:
+            env[key.strip()] = value.strip().strip('"')
+    return env
+
+
+def psql(db_url: str, sql: str | None = None, path: str | None = None, stop_on_error: bool = False) -> list[tuple[str, str]]:
+    """
+    Run SQL text or a file statement by statement and return the (sqlstate, message) of every failed statement.
+    Failed statements are skipped unless stop_on_error, which aborts at the first one and rolls back its transaction.
+    """
+    command = ["psql", db_url, "-X", "-q", "-v", "VERBOSITY=verbose", "-f", path or "-"]
+    command += ["-v", "ON_ERROR_STOP=1"] if stop_on_error else ["-v", "ON_ERROR_ROLLBACK=on"]
+    result = subprocess.run(command, input=sql, capture_output=True, text=True)
+    errors = SQL_ERROR_PATTERN.findall(result.stderr)
+    # A refused connection, bad password or FATAL error fails psql without any statement error to report.
+    if result.returncode != 0 and not errors:
+        raise StackError(result.stderr.strip() or f"psql exited with {result.returncode}")
+    return errors
+
+
+def apply_schema(db_url: str):
+    steps = [("prelude", PRELUDE_SQL, None)]
+    steps += [(os.path.relpath(path, REPO_ROOT), None, path) for path in schema_files()]
+    steps += [("postlude", POSTLUDE_SQL, None)]
+    for name, sql, path in steps:
+        errors = psql(db_url, sql=sql, path=path)
+        fatal = [f"{code}: {message}" for code, message in errors if code not in TOLERATED_SQLSTATES]
+        if fatal:
+            raise StackError(f"{name} failed:\n  " + "\n  ".join(fatal))
+        skipped = f" ({len(errors)} existing objects skipped)" if errors else ""
+        print(f"applied {name}{skipped}")
+
+
+def seed(db_url: str, scale: str):
+    volumes = SCALES[scale]
+    params = {
+        "schedule_days": DEFAULT_SCHEDULE_DAYS,
+        "template_steps": DEFAULT_TEMPLATE_STEPS,
+        "history_versions": DEFAULT_HISTORY_VERSIONS,
+        "audit_rows": DEFAULT_AUDIT_ROWS,
+        **volumes,
+        "doctor_email": _literal(config.DOCTOR_EMAIL),
+        "patient_email": _literal(config.PATIENT_EMAIL),
+        "admin_email": _literal(config.ADMIN_EMAIL),
+        "password": _literal(config.UNIVERSAL_PASSWORD),
+        "organisation_names": _literal(ORGANISATION_NAMES),
+        "specializations": _literal(SPECIALIZATIONS),
+        "specialization_count": len(SPECIALIZATIONS),
+        "slots_per_day": SLOTS_PER_DAY,
+    }
+    start = time.monotonic()
+    errors = psql(db_url, sql=SEED_SQL % params, stop_on_error=True)
+    if errors:
+        raise StackError("seeding failed:\n  " + "\n  ".join(f"{code}: {message}" for code, message in errors))
+    print(f"seeded {scale} volume in {time.monotonic() - start:.1f}s: " + ", ".join(f"{k}={v}" for k, v in volumes.items()))
+
+
+def app_url() -> str:
+    return config.TARGETS["local"]
+
+
+def start_app(env: dict[str, str]):
+    """
+    Build and start the app against the local stack. A production build, since dev-mode timings are meaningless.
+    """
+    app_env = {
+        **os.environ,
+        "NEXT_PUBLIC_SUPABASE_URL": env["API_URL"],
+        "NEXT_PUBLIC_SUPABASE_ANON_KEY": env["ANON_KEY"],
+        "SUPABASE_SERVICE_ROLE_KEY": env["SERVICE_ROLE_KEY"],
+        "NEXT_PUBLIC_SITE_URL": app_url(),
+        "CRON_SECRET": CRON_SECRET,
+    }
+    subprocess.run(["npm", "run", "build"], cwd=REPO_ROOT, env=app_env, check=True)
+    with open(APP_LOG_PATH, "w", encoding="utf-8") as log:
+        process = subprocess.Popen(
+            ["npm", "run", "start", "--", "--port", str(APP_PORT)],
+            cwd=REPO_ROOT, env=app_env, stdout=log, stderr=subprocess.STDOUT, start_new_session=True,
+        )
+    with open(APP_PID_PATH, "w", encoding="utf-8") as f:
+        f.write(str(process.pid))
+
+    deadline = time.monotonic() + APP_START_TIMEOUT
+    while time.monotonic() < deadline:
+        try:
+            requests.get(f"{app_url()}/login", timeout=5)
+            print(f"app running at {app_url()} (log: {APP_LOG_PATH})")
+            return
+        except requests.ConnectionError:
+            time.sleep(1)
+    raise StackError(f"app did not start within {APP_START_TIMEOUT}s, see {APP_LOG_PATH}")
+
+
+def stop_app():
+    if not os.path.exists(APP_PID_PATH):
+        return
+    with open(APP_PID_PATH, encoding="utf-8") as f:
+        pid = int(f.read())
+    try:
+        os.killpg(pid, signal.SIGTERM)
+    except ProcessLookupError:
+        pass
+    os.remove(APP_PID_PATH)
+
+
+def raise_sign_in_limit(config_path: str):
+    with open(config_path, encoding="utf-8") as f:
+        text = f.read()
+    with open(config_path, "w", encoding="utf-8") as f:
+        f.write(re.sub(r"(?m)^sign_in_sign_ups = \d+", f"sign_in_sign_ups = {AUTH_SIGN_IN_LIMIT}", text))
+
+
+def raise_row_limit(config_path: str):
+    with open(config_path, encoding="utf-8") as f:
+        text = f.read()
+    with open(config_path, "w", encoding="utf-8") as f:
+        f.write(re.sub(r"(?m)^max_rows = \d+", f"max_rows = {API_MAX_ROWS}", text))
+
+
+def up(scale: str, with_app: bool):
+    os.makedirs(STACK_DIR, exist_ok=True)
+    if not os.path.exists(os.path.join(STACK_DIR, "supabase", "config.toml")):
+        supabase("init")
+    raise_sign_in_limit(os.path.join(STACK_DIR, "supabase", "config.toml"))
+    raise_row_limit(os.path.join(STACK_DIR, "supabase", "config.toml"))
+    # A separate workdir keeps `supabase start` from applying supabase/migrations on its own, out of order.
+    supabase("start", "-x", EXCLUDED_SERVICES)
+    env = stack_env()
+    apply_schema(env["DB_URL"])
+    seed(env["DB_URL"], scale)
+    if with_app:
+        stop_app()
+        start_app(env)
+
+
+def down():
+    stop_app()
+    supabase("stop", "--no-backup")
+
+
+def print_env():
+    env = stack_env()
+    base_url = app_url() if os.path.exists(APP_PID_PATH) else config.BASE_URL
+    print(f"export MEDIFOLLOW_BASE_URL={base_url}")
+    print(f"export NEXT_PUBLIC_SUPABASE_URL={env['API_URL']}")
+    print(f"export NEXT_PUBLIC_SUPABASE_ANON_KEY={env['ANON_KEY']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    up_parser = commands.add_parser("up", help="Start the stack, apply the schema and seed it.")
+    up_parser.add_argument("--scale", default="small", choices=sorted(SCALES))
+    up_parser.add_argument("--app", action="store_true", help="Also build and start the app on port %d." % APP_PORT)
+    seed_parser = commands.add_parser("seed", help="Replace all data with a seeded volume.")
+    seed_parser.add_argument("--scale", default="small", choices=sorted(SCALES))
+    commands.add_parser("env", help="Print exports that point the harness at the stack.")
+    commands.add_parser("down", help="Stop the app and the stack, discarding its data.")
+    args = parser.parse_args()
+
+    if args.command == "up":
+        up(args.scale, args.app)
+    elif args.command == "seed":
+        seed(stack_env()["DB_URL"], args.scale)
+    elif args.command == "env":
+        print_env()
+    else:
+        down()
@@ -39,4 +39,21 @@ def login(driver, base_url:str, email:str, password:str, timeout:int = 10) -> we
     driver.find_element(By.CSS_SELECTOR, 'button[type="submit"]').click()
 
     WebDriverWait(driver, timeout).until(EC.title_is("MediFollow - Healthcare Management Platform"))
-    return driver
\ No newline at end of file
+    return driver
+
+
+def login_browser(browser, base_url:str, email:str, password:str, timeout:int = 10):
+    """
+    Perform the same login through a backend from backends.py (WebDriver or CDP).
+    """
+    browser.get(f"{base_url}/login")
+
+    browser.wait_for_selector("#email", timeout)
+    browser.type("#email", email)
+    browser.wait_for_selector("#password", timeout)
+    browser.type("#password", password)
+
+    browser.click('button[type="submit"]')
+
+    browser.wait_for_title("MediFollow - Healthcare Management Platform", timeout)
+    return browser
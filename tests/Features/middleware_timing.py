@@ -0,0 +1,120 @@
+import os
+import re
+import statistics
+import subprocess
+import time
+import tomllib
+
+import requests
+
+import local_stack
+from api_client import AppSession
+
+
+# The local stack's API gateway logs every call to Supabase Auth: from the app server, from browsers, and from this
+# suite's own python-requests sessions.
+AUTH_CALL_PATTERN = re.compile(r'"(?:GET|POST|PUT) /auth/v1/(\w+)[^"]*" \d{3} .*"([^"]*)"\s*$')
+# User agents of Node's fetch (undici), which supabase-js uses in middleware and server components.
+SERVER_AGENTS = ("node", "undici")
+COOKIE_STATES = ("valid", "expired", "absent")
+CALIBRATION_CALLS = 5
+TOP_TESTS = 10
+
+
+def kong_container() -> str:
+    with open(os.path.join(local_stack.STACK_DIR, "supabase", "config.toml"), "rb") as f:
+        return f"supabase_kong_{tomllib.load(f)['project_id']}"
+
+
+def server_auth_calls(since: float, until: float) -> dict[str, int]:
+    """
+    Calls the app server made to Supabase Auth between two Unix times, by endpoint (user, token, ...).
+    Only Node's user agent counts, so browsers and the suite's own API sessions are left out.
+    """
+    log = subprocess.run(["docker", "logs", "--since", f"{since:.3f}", "--until", f"{until:.3f}", kong_container()],
+                         capture_output=True, text=True)
+    calls: dict[str, int] = {}
+    for line in (log.stdout + log.stderr).splitlines():
+        match = AUTH_CALL_PATTERN.search(line)
+        if match and match.group(2).split("/")[0].lower() in SERVER_AGENTS:
+            calls[match.group(1)] = calls.get(match.group(1), 0) + 1
+    return calls
+
+
+def timed_get(http: requests.Session, url: str, **kwargs) -> tuple[float, requests.Response]:
+    """
+    GET without following redirects and return the ms until the response headers arrived, i.e. the TTFB.
+    """
+    response = http.get(url, allow_redirects=False, stream=True, **kwargs)
+    response.close()
+    return response.elapsed.total_seconds() * 1000, response
+
+
+def middleware_calls_ms(session: AppSession) -> dict[str, float]:
+    """
+    Time the two calls updateSession makes for a signed-in user, made directly with the same token: auth.getUser()
+    and the profile role lookup. Their sum is what middleware adds to a request before the page starts rendering.
+    """
+    headers = {"apikey": session.anon_key, "Authorization": f"Bearer {session.auth['access_token']}"}
+    calls = {
+        "get_user": (f"{session.supabase_url}/auth/v1/user", {}),
+        "role_lookup": (f"{session.supabase_url}/rest/v1/profiles", {"select": "role", "id": f"eq.{session.user_id}"}),
+    }
+    timings = {}
+    for name, (url, params) in calls.items():
+        samples = []
+        for _ in range(CALIBRATION_CALLS):
+            elapsed, response = timed_get(session.http, url, params=params, headers=headers)
+            response.raise_for_status()
+            samples.append(elapsed)
+        timings[name] = statistics.median(samples)
+    return timings
+
+
+class AuthCallCounter:
+    """
+    Counts the Supabase Auth calls the app server makes while each test runs, against the pages the test loaded.
+    With the time of one getUser round trip it estimates how much of the tests' TTFB goes to those calls.
+    """
+
+    def __init__(self):
+        self.tests: dict[str, dict] = {}
+        self.auth_ms: float | None = None
+        self._started: dict[str, float] = {}
+
+    def calibrate(self, session: AppSession):
+        self.auth_ms = middleware_calls_ms(session)["get_user"]
+
+    def start(self, nodeid: str):
+        self._started[nodeid] = time.time()
+
+    def finish(self, nodeid: str, routes: dict[str, list[dict]]):
+        """
+        `routes` are the test's Navigation Timing samples by route, as conftest records them.
+        """
+        # Let the gateway flush its log lines for the last requests.
+        time.sleep(0.5)
+        calls = server_auth_calls(self._started.pop(nodeid), time.time())
+        loads = [sample for route, samples in routes.items() if route.startswith("/") for sample in samples if "ttfb" in sample]
+        self.tests[nodeid] = {"calls": calls, "loads": len(loads), "ttfb": sum(sample["ttfb"] for sample in loads)}
+
+    def report_lines(self) -> list[str]:
+        calls = sum(sum(test["calls"].values()) for test in self.tests.values())
+        loads = sum(test["loads"] for test in self.tests.values())
+        ttfb = sum(test["ttfb"] for test in self.tests.values())
+        endpoints: dict[str, int] = {}
+        for test in self.tests.values():
+            for endpoint, count in test["calls"].items():
+                endpoints[endpoint] = endpoints.get(endpoint, 0) + count
+        lines = [f"{calls} server-side auth calls ({', '.join(f'{e} {n}' for e, n in sorted(endpoints.items()))}) "
+                 f"for {loads} page loads: {calls / loads if loads else 0:.1f} per load"]
+        if self.auth_ms is not None and ttfb:
+            lines.append(f"at {self.auth_ms:.0f} ms per getUser round trip, about {calls * self.auth_ms / ttfb:.0%} "
+                         f"of the {ttfb / 1000:.1f} s total TTFB")
+        lines += ["", f"{'':<60}{'calls':>6}{'loads':>6}{'per load':>9}"]
+        busiest = sorted(self.tests, key=lambda n: sum(self.tests[n]["calls"].values()), reverse=True)[:TOP_TESTS]
+        for nodeid in busiest:
+            test = self.tests[nodeid]
+            count = sum(test["calls"].values())
+            lines.append(f"{nodeid:<60}{count:>6}{test['loads']:>6}{count / test['loads'] if test['loads'] else 0:>9.1f}")
+        return lines
@@ -0,0 +1,55 @@
+from selenium.webdriver.common.action_chains import ActionChains
+from selenium.webdriver.common.keys import Keys
+
+
+# How replace_text writes a field; --input picks it for the whole run.
+#   keys:   clear() and send_keys(), one key event per character, as a user types.
+#   insert: select the content and replace it with one CDP Input.insertText, so the app sees a single input event.
+#   react:  set the value through the native setter and dispatch input/change, as React's own tests do.
+MODES = ("keys", "insert", "react")
+MODE = "insert"
+
+SELECT_CONTENT_JS = """
+const el = arguments[0];
+el.focus();
+if (typeof el.select === 'function') el.select();
+else document.getSelection().selectAllChildren(el);
+"""
+# React tracks the last value it rendered; assigning through the prototype's setter keeps that tracker stale, so the
+# following input event reaches the component's onChange like a real edit.
+REACT_SET_VALUE_JS = """
+const el = arguments[0];
+const prototype = el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+Object.getOwnPropertyDescriptor(prototype, 'value').set.call(el, arguments[1]);
+el.dispatchEvent(new Event('input', {bubbles: true}));
+el.dispatchEvent(new Event('change', {bubbles: true}));
+"""
+
+
+def press_key(driver, key: str, times: int = 1):
+    """
+    Press a key `times` times on the focused element as one W3C Actions batch, i.e. one WebDriver round trip.
+    """
+    actions = ActionChains(driver)
+    for _ in range(times):
+        actions.send_keys(key)
+    actions.perform()
+
+
+def replace_text(element, text: str, mode: str | None = None):
+    """
+    Replace the value of an input or textarea with `text`, firing the app's input handlers.
+    """
+    mode = mode or MODE
+    driver = element.parent
+    if mode == "keys" or (mode == "insert" and not hasattr(driver, "execute_cdp_cmd")):
+        element.clear()
+        element.send_keys(text)
+    elif mode == "react":
+        driver.execute_script(REACT_SET_VALUE_JS, element, text)
+    else:
+        driver.execute_script(SELECT_CONTENT_JS, element)
+        if text:
+            driver.execute_cdp_cmd("Input.insertText", {"text": text})
+        else:
+            press_key(driver, Keys.DELETE)
@@ -0,0 +1,266 @@
+"""
+Capture the SQL the app sends to Postgres while tests run against the local stack, replay the hot queries with
+EXPLAIN (ANALYZE, BUFFERS) and flag sequential scans, large sorts and plan changes.
+
+    python plan_check.py capture -- -m api          # run pytest (arguments after --) with statement logging on
+    python plan_check.py check                      # replay the captured queries, compare against the baseline
+    python plan_check.py check --save-baseline      # ... and store the plans as the new baseline
+
+Run `local_stack.py up --app` first; plans are only meaningful on a seeded database.
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+import tomllib
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+
+import requests
+
+import local_stack
+
+
+CAPTURE_PATH = os.path.join(local_stack.STACK_DIR, "captured_queries.json")
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".query_plans.json")
+# Statement logging and reading server logs need a superuser; the local stack's has the same password as postgres.
+SUPERUSER = "supabase_admin"
+LOG_PREFIX = "%m [%p] "
+ENABLE_LOGGING_SQL = f"""
+alter system set log_min_duration_statement = 0;
+alter system set log_parameter_max_length = -1;
+alter system set log_line_prefix = '{LOG_PREFIX}';
+select pg_reload_conf();
+"""
+DISABLE_LOGGING_SQL = """
+alter system reset log_min_duration_statement;
+alter system reset log_parameter_max_length;
+alter system reset log_line_prefix;
+select pg_reload_conf();
+"""
+LOG_ENTRY_PATTERN = re.compile(r"^(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d\.\d+ \w+) \[(\d+)\] (\w+):\s+(.*)$")
+STATEMENT_PATTERN = re.compile(r"duration: [\d.]+ ms\s+(?:execute [^:]*|statement): (.*)", re.DOTALL)
+PARAMETER_PATTERN = re.compile(r"\$(\d+) = ('(?:[^']|'')*'|NULL)")
+PLACEHOLDER_PATTERN = re.compile(r"\$(\d+)\b")
+# PostgREST runs set_config(role, request.jwt.claims, ...) before each query; replaying it keeps RLS in the plan.
+CONTEXT_MARKER = "set_config("
+
+# Hot paths in match order; a query belongs to the first whose pattern it matches, others are not checked.
+HOT_QUERIES = [
+    ("reminder cron", re.compile(r'reminder_sent_at"?\s+IS\s+NULL', re.IGNORECASE)),
+    ("sessions lookup", re.compile(r'"public"\."doctor_sessions"')),
+    ("booking directory", re.compile(r'"public"\."doctor_schedules"|"public"\."organisations"|"public"\."profiles".*"role"\s*=', re.DOTALL)),
+    ("timeline fetch", re.compile(r'"public"\."(appointments|medical_records|medical_record_versions)"')),
+]
+SEQ_SCAN_MIN_ROWS = 1000
+LARGE_SORT_KB = 1024
+
+
+def superuser_url(db_url: str) -> str:
+    parsed = urlparse(db_url)
+    return parsed._replace(netloc=parsed.netloc.replace(f"{parsed.username}:", f"{SUPERUSER}:", 1)).geturl()
+
+
+def run_sql(db_url: str, sql: str) -> str:
+    result = subprocess.run(["psql", db_url, "-X", "-q", "-At", "-v", "ON_ERROR_STOP=1", "-f", "-"], input=sql, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise local_stack.StackError(result.stderr.strip())
+    return result.stdout
+
+
+def db_container() -> str:
+    with open(os.path.join(local_stack.STACK_DIR, "supabase", "config.toml"), "rb") as f:
+        return f"supabase_db_{tomllib.load(f)['project_id']}"
+
+
+def read_server_log(admin_url: str, since: float) -> str:
+    """
+    Server log written since `since`: from the log files when the logging collector is on, otherwise the container's stderr.
+    """
+    if run_sql(admin_url, "show logging_collector;").strip() != "on":
+        result = subprocess.run(["docker", "logs", "--since", str(int(since)), db_container()], capture_output=True, text=True)
+        return result.stdout + result.stderr
+    names = run_sql(admin_url, f"select name from pg_ls_logdir() where modification >= to_timestamp({since}) order by modification;").split()
+    return "".join(run_sql(admin_url, f"select pg_read_file(current_setting('log_directory') || '/{name}');") for name in names)
+
+
+def parse_log(text: str, since: float) -> list[tuple[str, str, str]]:
+    """
+    (pid, severity, message) for every log entry at or after `since`, with continuation lines folded in.
+    """
+    entries = []
+    for line in text.splitlines():
+        match = LOG_ENTRY_PATTERN.match(line)
+        if match:
+            stamp, pid, severity, message = match.groups()
+            entries.append([stamp, pid, severity, message])
+        elif entries:
+            entries[-1][3] += "\n" + line
+    return [
+        (pid, severity, message) for stamp, pid, severity, message in entries
+        # The stack logs in UTC.
+        if datetime.strptime(stamp[:-4], "%Y-%m-%d %H:%M:%S.%f").replace(tzinfo=timezone.utc).timestamp() >= since - 1
+    ]
+
+
+def hot_path(sql: str) -> str | None:
+    return next((name for name, pattern in HOT_QUERIES if pattern.search(sql)), None)
+
+
+def fingerprint(sql: str) -> str:
+    return hashlib.md5(" ".join(sql.split()).encode()).hexdigest()[:10]
+
+
+def extract_queries(entries: list[tuple[str, str, str]]) -> dict[str, dict]:
+    """
+    Hot queries by fingerprint, each with the parameters and PostgREST context of its first execution.
+    """
+    queries: dict[str, dict] = {}
+    context: dict[str, dict] = {}
+    pending: dict[str, dict] = {}
+    for pid, severity, message in entries:
+        if severity == "LOG":
+            match = STATEMENT_PATTERN.match(message)
+            pending[pid] = {"sql": match.group(1).strip(), "params": {}} if match else None
+            if pending[pid] and CONTEXT_MARKER in pending[pid]["sql"]:
+                context[pid] = pending[pid]
+            elif pending[pid]:
+                path = hot_path(pending[pid]["sql"])
+                key = fingerprint(pending[pid]["sql"])
+                if path and key not in queries:
+                    queries[key] = {"path": path, "query": pending[pid], "context": context.get(pid)}
+        elif severity == "DETAIL" and pending.get(pid) and message.lower().startswith("parameters:"):
+            pending[pid]["params"] = dict(PARAMETER_PATTERN.findall(message))
+    return queries
+
+
+def bind(statement: dict) -> str:
+    params = statement["params"]
+    return PLACEHOLDER_PATTERN.sub(lambda m: params.get(m.group(1), m.group(0)), statement["sql"]).rstrip(";")
+
+
+def capture(pytest_args: list[str]):
+    env = local_stack.stack_env()
+    admin_url = superuser_url(env["DB_URL"])
+    test_env = {
+        **os.environ,
+        "MEDIFOLLOW_BASE_URL": local_stack.app_url(),
+        "NEXT_PUBLIC_SUPABASE_URL": env["API_URL"],
+        "NEXT_PUBLIC_SUPABASE_ANON_KEY": env["ANON_KEY"],
+    }
+    since = time.time()
+    run_sql(admin_url, ENABLE_LOGGING_SQL)
+    try:
+        subprocess.run([sys.executable, "-m", "pytest", *pytest_args], cwd=os.path.dirname(os.path.abspath(__file__)), env=test_env)
+        # No test reaches the reminder cron, so call it directly.
+        requests.get(f"{local_stack.app_url()}/api/cron/send-reminders", headers={"Authorization": f"Bearer {local_stack.CRON_SECRET}"}, timeout=60)
+    finally:
+        run_sql(admin_url, DISABLE_LOGGING_SQL)
+
+    queries = extract_queries(parse_log(read_server_log(admin_url, since), since))
+    with open(CAPTURE_PATH, "w", encoding="utf-8") as f:
+        json.dump(queries, f, indent=2)
+    counts: dict[str, int] = {}
+    for query in queries.values():
+        counts[query["path"]] = counts.get(query["path"], 0) + 1
+    missing = [name for name, _ in HOT_QUERIES if name not in counts]
+    print(f"captured {len(queries)} distinct hot queries: " + ", ".join(f"{name}={count}" for name, count in counts.items()))
+    if missing:
+        print(f"no queries captured for: {', '.join(missing)}")
+
+
+def explain(admin_url: str, entry: dict) -> dict:
+    """
+    Replay one query with its PostgREST context inside a rolled-back transaction, so writes leave no trace.
+    """
+    script = "begin;\n"
+    if entry["context"]:
+        script += f"\\o /dev/null\n{bind(entry['context'])};\n\\o\n"
+    script += f"explain (analyze, buffers, format json) {bind(entry['query'])};\nrollback;\n"
+    return json.loads(run_sql(admin_url, script))[0]
+
+
+def walk(node: dict):
+    yield node
+    for child in node.get("Plans", []):
+        yield from walk(child)
+
+
+def describe(node: dict) -> str:
+    text = node["Node Type"]
+    if node.get("Index Name"):
+        text += f" using {node['Index Name']}"
+    if node.get("Relation Name"):
+        text += f" on {node['Relation Name']}"
+    return text
+
+
+def plan_shape(node: dict) -> str:
+    children = ", ".join(plan_shape(child) for child in node.get("Plans", []))
+    return describe(node) + (f" ({children})" if children else "")
+
+
+def plan_findings(plan: dict) -> list[str]:
+    findings = []
+    for node in walk(plan["Plan"]):
+        loops = node.get("Actual Loops", 1)
+        if node["Node Type"] == "Seq Scan":
+            read = (node.get("Actual Rows", 0) + node.get("Rows Removed by Filter", 0)) * loops
+            if read >= SEQ_SCAN_MIN_ROWS:
+                findings.append(f"seq scan on {node['Relation Name']} read {read} rows, kept {node.get('Actual Rows', 0) * loops}")
+        if node["Node Type"] == "Sort":
+            space = node.get("Sort Space Used", 0)
+            if node.get("Sort Space Type") == "Disk" or space >= LARGE_SORT_KB:
+                findings.append(f"sort of {node.get('Actual Rows', 0)} rows used {space} KB ({node.get('Sort Space Type', '?').lower()})")
+    return findings
+
+
+def check(baseline_path: str, save_baseline: bool) -> int:
+    with open(CAPTURE_PATH, encoding="utf-8") as f:
+        queries = json.load(f)
+    baseline = {}
+    if os.path.exists(baseline_path):
+        with open(baseline_path, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    admin_url = superuser_url(local_stack.stack_env()["DB_URL"])
+    results, problems = {}, 0
+    print(f"{'hot path':<20}{'query':<12}{'exec ms':>9}{'buffers hit':>13}{'read':>8}")
+    for key, entry in sorted(queries.items(), key=lambda item: item[1]["path"]):
+        plan = explain(admin_url, entry)
+        top = plan["Plan"]
+        results[key] = {"path": entry["path"], "sql": entry["query"]["sql"], "shape": plan_shape(top), "execution_ms": plan["Execution Time"]}
+        print(f"{entry['path']:<20}{key:<12}{plan['Execution Time']:>9.2f}{top.get('Shared Hit Blocks', 0):>13}{top.get('Shared Read Blocks', 0):>8}")
+        flags = plan_findings(plan)
+        previous = baseline.get(key)
+        if previous and previous["shape"] != results[key]["shape"]:
+            flags.append(f"plan changed:\n        was {previous['shape']}\n        now {results[key]['shape']}")
+        for flag in flags:
+            print(f"    {flag}")
+        problems += len(flags)
+
+    if save_baseline:
+        with open(baseline_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    print(f"\n{problems} problem(s) in {len(results)} queries" if problems else f"\nNo problems in {len(results)} queries.")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    capture_parser = commands.add_parser("capture", help="Run pytest against the local stack and capture its hot queries.")
+    capture_parser.add_argument("pytest_args", nargs=argparse.REMAINDER)
+    check_parser = commands.add_parser("check", help="Replay captured queries with EXPLAIN and flag problems.")
+    check_parser.add_argument("--baseline", default=BASELINE_PATH)
+    check_parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    if args.command == "capture":
+        capture(args.pytest_args[1:] if args.pytest_args[:1] == ["--"] else args.pytest_args)
+    else:
+        sys.exit(check(args.baseline, args.save_baseline))
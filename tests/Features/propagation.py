@@ -0,0 +1,78 @@
+import time
+from typing import Callable
+
+
+POLL_INTERVAL = 0.5
+PROPAGATION_TIMEOUT = 60
+# How long the reader's already-open page is watched for a live update before it is reloaded.
+OPEN_PAGE_WINDOW = 3
+
+
+class CrossRoleScenario:
+    """
+    Sessions of several roles at once: a write made as one role, timed until another role can see it.
+
+    `open_driver(role)` returns a new driver logged in as that role. Each measurement is kept in `results`.
+    """
+
+    def __init__(self, open_driver: Callable[[str], object]):
+        self._open_driver = open_driver
+        self._drivers: dict[str, object] = {}
+        self.results: list[dict] = []
+
+    def role(self, name: str):
+        if name not in self._drivers:
+            self._drivers[name] = self._open_driver(name)
+        return self._drivers[name]
+
+    def measure(self, name: str, write: Callable[[], None], reader_role: str, url: str, visible: Callable[[object], bool],
+                timeout: float = PROPAGATION_TIMEOUT) -> dict:
+        """
+        Open `url` as the reader, run `write`, then reload the reader's page until `visible(reader)` holds.
+
+        The write has committed once `write` returns, so the first reload after it should already show the change.
+        A change that only shows up on a later reload was served stale, e.g. by a Next.js route or data cache or a
+        CDN, and is flagged.
+        """
+        reader = self.role(reader_role)
+        reader.get(url)
+        result = {"name": name, "visible_before": visible(reader), "open_page_updated": False, "stale_reloads": 0,
+                  "write_s": None, "visible_s": None}
+        if result["visible_before"]:
+            self.results.append(result)
+            return result
+
+        start = time.monotonic()
+        write()
+        written = time.monotonic()
+        result["write_s"] = written - start
+
+        # Without a reload: only live updates (subscriptions, polling, revalidation on focus) can show the change.
+        while time.monotonic() - written < OPEN_PAGE_WINDOW:
+            if visible(reader):
+                result["open_page_updated"] = True
+                result["visible_s"] = time.monotonic() - written
+                break
+            time.sleep(POLL_INTERVAL)
+
+        while result["visible_s"] is None and time.monotonic() - written < timeout:
+            reader.get(url)
+            if visible(reader):
+                result["visible_s"] = time.monotonic() - written
+            else:
+                result["stale_reloads"] += 1
+                time.sleep(POLL_INTERVAL)
+        self.results.append(result)
+        return result
+
+
+def describe(result: dict) -> str:
+    if result["visible_before"]:
+        return f"{result['name']}: already visible before the write, not measured"
+    if result["visible_s"] is None:
+        return f"{result['name']}: write took {result['write_s']:.1f}s, never visible to the reader"
+    how = "live on the open page" if result["open_page_updated"] else f"after {result['stale_reloads'] + 1} reload(s)"
+    text = f"{result['name']}: write took {result['write_s']:.1f}s, visible {result['visible_s']:.1f}s later, {how}"
+    if result["stale_reloads"]:
+        text += f"; STALE: {result['stale_reloads']} reload(s) after the write still served old data"
+    return text
@@ -0,0 +1,169 @@
+import asyncio
+import random
+import ssl
+import time
+from urllib.parse import urlparse
+
+from plan_check import run_sql, superuser_url
+from results_store import percentile
+
+
+PUBLIC_PATH = "/public/{id}"
+# Response headers that tell whether a hit was cached, and by whom: Next.js (x-nextjs-cache, ISR), a CDN in front of
+# it (x-vercel-cache, age), or the browser (cache-control, etag).
+CACHE_HEADERS = ("cache-control", "x-nextjs-cache", "x-nextjs-prerender", "x-vercel-cache", "age", "etag", "vary")
+CACHED_VALUES = {"HIT", "STALE", "PRERENDER"}
+REQUEST_TIMEOUT = 30
+# pg_stat_statements is only fully readable by a superuser; PostgREST sends the page's profile lookup as a select
+# from "public"."profiles".
+PROFILE_READS_SQL = """
+select coalesce(sum(calls), 0) from extensions.pg_stat_statements
+where query like '%FROM "public"."profiles"%' and query not like '%pg_stat_statements%';
+"""
+
+
+class Connection:
+    """
+    One keep-alive HTTP/1.1 connection, reopened when the server closes it. Only what the public page needs:
+    GET, Content-Length and chunked bodies, no compression.
+    """
+
+    def __init__(self, base_url: str):
+        url = urlparse(base_url)
+        self.host = url.hostname
+        self.port = url.port or (443 if url.scheme == "https" else 80)
+        self.ssl = ssl.create_default_context() if url.scheme == "https" else None
+        self.host_header = url.netloc
+        self.reader: asyncio.StreamReader | None = None
+        self.writer: asyncio.StreamWriter | None = None
+
+    async def get(self, path: str) -> tuple[int, dict[str, str], bytes]:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+        self.writer.write(
+            f"GET {path} HTTP/1.1\r\nHost: {self.host_header}\r\nUser-Agent: medifollow-public-load\r\n"
+            f"Accept: text/html\r\nAccept-Encoding: identity\r\nConnection: keep-alive\r\n\r\n".encode()
+        )
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        headers = {}
+        while (line := await self.reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            body = b""
+            while size := int((await self.reader.readline()).split(b";")[0], 16):
+                body += await self.reader.readexactly(size)
+                await self.reader.readline()
+            while await self.reader.readline() not in (b"\r\n", b""):
+                pass
+        elif "content-length" in headers:
+            body = await self.reader.readexactly(int(headers["content-length"]))
+        else:
+            body = await self.reader.read()
+            headers["connection"] = "close"
+        if headers.get("connection", "").lower() == "close":
+            await self.close()
+        return status, headers, body
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+
+def share_paths(public_ids: list[str], other_ids: list[str], hot: int, hits: int, hot_share: float, unknown_share: float,
+                seed: int = 0) -> list[str]:
+    """
+    Paths of a share burst: `hot_share` of the hits go to the first `hot` public profiles, as a link posted in a
+    patient group would, `unknown_share` to IDs that do not exist, and the rest spread over every profile.
+    """
+    rng = random.Random(seed)
+    spread = public_ids + other_ids
+    paths = []
+    for n in range(hits):
+        draw = rng.random()
+        if draw < hot_share:
+            profile_id = rng.choice(public_ids[:hot])
+        elif draw < hot_share + unknown_share:
+            profile_id = f"00000000-0000-4000-8000-{n:012d}"
+        else:
+            profile_id = spread[n % len(spread)]
+        paths.append(PUBLIC_PATH.format(id=profile_id))
+    return paths
+
+
+async def _load(base_url: str, paths: list[str], concurrency: int) -> tuple[list[dict], float]:
+    queue: asyncio.Queue[str] = asyncio.Queue()
+    for path in paths:
+        queue.put_nowait(path)
+    hits: list[dict] = []
+
+    async def client():
+        connection = Connection(base_url)
+        while not queue.empty():
+            path = queue.get_nowait()
+            hit = {"path": path, "status": 0, "bytes": 0, "cache": {}, "body": "", "error": None}
+            start = time.monotonic()
+            try:
+                status, headers, body = await asyncio.wait_for(connection.get(path), REQUEST_TIMEOUT)
+                hit.update(status=status, bytes=len(body), body=body.decode("utf-8", "replace"),
+                           cache={name: headers[name] for name in CACHE_HEADERS if name in headers})
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, IndexError) as e:
+                hit["error"] = f"{type(e).__name__}: {e}"
+                await connection.close()
+            hit["latency_ms"] = (time.monotonic() - start) * 1000
+            hits.append(hit)
+        await connection.close()
+
+    start = time.monotonic()
+    await asyncio.gather(*(client() for _ in range(min(concurrency, len(paths)))))
+    return hits, time.monotonic() - start
+
+
+def load(base_url: str, paths: list[str], concurrency: int) -> tuple[list[dict], float]:
+    """
+    Request every path anonymously from `concurrency` concurrent keep-alive connections. Returns the hits and the
+    elapsed seconds.
+    """
+    return asyncio.run(_load(base_url, paths, concurrency))
+
+
+def from_cache(hit: dict) -> bool:
+    cache = hit["cache"]
+    return (cache.get("x-nextjs-cache", "").upper() in CACHED_VALUES or cache.get("x-vercel-cache", "").upper() in CACHED_VALUES
+            or int(cache.get("age", "0") or 0) > 0)
+
+
+def shared_cacheable(cache_control: str) -> bool:
+    """
+    Whether a Cache-Control value lets a CDN or Next.js serve the response to other visitors.
+    """
+    directives = {d.strip().split("=")[0].lower() for d in cache_control.split(",")}
+    return not directives & {"private", "no-store", "no-cache"} and bool(directives & {"public", "s-maxage", "max-age"})
+
+
+def summarize(hits: list[dict], elapsed: float) -> dict:
+    latencies = [hit["latency_ms"] for hit in hits]
+    return {
+        "hits": len(hits),
+        "errors": sum(1 for hit in hits if hit["error"] or hit["status"] >= 500),
+        "not_found": sum(1 for hit in hits if hit["status"] == 404),
+        "from_cache": sum(1 for hit in hits if from_cache(hit)),
+        "p50": percentile(latencies, 0.5),
+        "p95": percentile(latencies, 0.95),
+        "p99": percentile(latencies, 0.99),
+        "max": max(latencies),
+        "hits_per_s": len(hits) / elapsed if elapsed else 0.0,
+        "kb_per_hit": sum(hit["bytes"] for hit in hits) / len(hits) / 1024,
+        "shared_cacheable": sum(1 for hit in hits if shared_cacheable(hit["cache"].get("cache-control", ""))),
+    }
+
+
+def profile_reads(db_url: str) -> int:
+    """
+    Profile lookups PostgREST has run so far; the difference across a load is how many hits reached Supabase.
+    """
+    return int(run_sql(superuser_url(db_url), PROFILE_READS_SQL))
@@ -0,0 +1,324 @@
+"""
+Every pytest run appends its outcomes, durations, step timings and page metrics to a local SQLite store.
+
+    python results_store.py query --route /timeline --metric load --last 50   # p50/p95 of a route metric
+    python results_store.py query --test test_timeline.py::test_TL001         # p50/p95 of a test's duration
+    python results_store.py changes                                           # first commit where each series shifted
+    python results_store.py report                                            # static HTML trends per route and test
+"""
+import argparse
+import html
+import math
+import os
+import sqlite3
+import statistics
+import subprocess
+from datetime import datetime, timezone
+
+
+TESTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STORE_PATH = os.path.join(TESTS_DIR, ".results.sqlite")
+REPORT_PATH = os.path.join(TESTS_DIR, ".results_report.html")
+SCHEMA_SQL = """
+create table if not exists runs (
+    id integer primary key autoincrement,
+    started_at text not null,
+    git_commit text,
+    git_dirty integer not null default 0,
+    target_url text not null,
+    profile text,
+    backend text,
+    shard text
+);
+create table if not exists results (
+    run_id integer not null references runs (id),
+    test_id text not null,
+    outcome text not null,
+    duration real not null,
+    primary key (run_id, test_id)
+);
+create table if not exists step_timings (
+    run_id integer not null references runs (id),
+    test_id text not null,
+    step text not null,
+    seconds real not null
+);
+create table if not exists page_metrics (
+    run_id integer not null references runs (id),
+    test_id text not null,
+    route text not null,
+    metric text not null,
+    value real not null
+);
+create table if not exists action_calls (
+    run_id integer not null references runs (id),
+    test_id text not null,
+    route text not null,
+    action text not null,
+    total real not null
+);
+create index if not exists results_test_idx on results (test_id, run_id);
+create index if not exists page_metrics_route_idx on page_metrics (route, metric, run_id);
+"""
+DEFAULT_LAST_RUNS = 50
+# Binary segmentation: a split is a change point when both sides have MIN_SEGMENT runs, their two-sample t statistic
+# reaches CHANGE_THRESHOLD and the means differ by at least MIN_SHIFT.
+MIN_SEGMENT = 5
+CHANGE_THRESHOLD = 4.0
+MIN_SHIFT = 0.1
+
+
+def connect(path: str = STORE_PATH) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA_SQL)
+    return conn
+
+
+def git_revision() -> tuple[str | None, bool]:
+    """
+    HEAD commit and whether the working tree has uncommitted changes; (None, False) outside a git checkout.
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=TESTS_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+    dirty = subprocess.run(["git", "diff", "--quiet", "HEAD"], cwd=TESTS_DIR).returncode != 0
+    return commit, dirty
+
+
+def record_run(
+    path: str,
+    target_url: str,
+    tests: dict[str, dict],
+    page_metrics: dict[str, dict[str, list[dict]]],
+    profile: str | None = None,
+    backend: str | None = None,
+    shard: str | None = None,
+    action_calls: list[dict] = (),
+) -> int:
+    """
+    Store one run. `tests` maps test ID to {"outcome", "duration", "steps": {step: seconds}};
+    `page_metrics` maps test ID to the Navigation Timing samples of each route it loaded;
+    `action_calls` are the server-action calls of an --attribute-actions run (action_timing.py).
+    """
+    commit, dirty = git_revision()
+    with connect(path) as conn:
+        run_id = conn.execute(
+            "insert into runs (started_at, git_commit, git_dirty, target_url, profile, backend, shard) values (?, ?, ?, ?, ?, ?, ?)",
+            (datetime.now(timezone.utc).isoformat(timespec="seconds"), commit, int(dirty), target_url, profile, backend, shard),
+        ).lastrowid
+        conn.executemany(
+            "insert into results (run_id, test_id, outcome, duration) values (?, ?, ?, ?)",
+            [(run_id, test_id, test["outcome"], test["duration"]) for test_id, test in tests.items()],
+        )
+        conn.executemany(
+            "insert into step_timings (run_id, test_id, step, seconds) values (?, ?, ?, ?)",
+            [(run_id, test_id, step, seconds) for test_id, test in tests.items() for step, seconds in test["steps"].items()],
+        )
+        conn.executemany(
+            "insert into page_metrics (run_id, test_id, route, metric, value) values (?, ?, ?, ?, ?)",
+            [
+                (run_id, test_id, route, metric, value)
+                for test_id, routes in page_metrics.items()
+                for route, samples in routes.items()
+                for sample in samples
+                for metric, value in sample.items()
+                if value is not None
+            ],
+        )
+        conn.executemany(
+            "insert into action_calls (run_id, test_id, route, action, total) values (?, ?, ?, ?, ?)",
+            [(run_id, call["nodeid"], call["route"], call["name"], call["total"]) for call in action_calls if call["nodeid"]],
+        )
+    return run_id
+
+
+def route_series(conn: sqlite3.Connection, route: str, metric: str, last: int = DEFAULT_LAST_RUNS) -> list[tuple[int, str, list[float]]]:
+    """
+    (run ID, commit, samples) for the last `last` runs that loaded the route, oldest first.
+    """
+    rows = conn.execute(
+        """
+        select m.run_id, coalesce(r.git_commit, '?'), m.value from page_metrics m join runs r on r.id = m.run_id
+        where m.route = ? and m.metric = ? and m.run_id in (
+            select distinct run_id from page_metrics where route = ? and metric = ? order by run_id desc limit ?
+        )
+        order by m.run_id
+        """,
+        (route, metric, route, metric, last),
+    ).fetchall()
+    return _group(rows)
+
+
+def test_series(conn: sqlite3.Connection, test_id: str, last: int = DEFAULT_LAST_RUNS) -> list[tuple[int, str, list[float]]]:
+    """
+    (run ID, commit, [duration]) for the last `last` runs in which the test passed, oldest first.
+    """
+    rows = conn.execute(
+        """
+        select * from (
+            select s.run_id, coalesce(r.git_commit, '?'), s.duration from results s join runs r on r.id = s.run_id
+            where s.test_id = ? and s.outcome = 'passed' order by s.run_id desc limit ?
+        ) order by 1
+        """,
+        (test_id, last),
+    ).fetchall()
+    return _group(rows)
+
+
+def coverage(conn: sqlite3.Connection, last: int = DEFAULT_LAST_RUNS) -> dict[str, set[str]]:
+    """
+    Routes each test loaded and server actions its pages called, named "action <name>", over the last `last` runs.
+    """
+    covered: dict[str, set[str]] = {}
+    rows = conn.execute(
+        """
+        select test_id, route from page_metrics where run_id > (select coalesce(max(id), 0) from runs) - ?
+        union select test_id, 'action ' || action from action_calls where run_id > (select coalesce(max(id), 0) from runs) - ?
+        """,
+        (last, last),
+    )
+    for test_id, item in rows:
+        covered.setdefault(test_id, set()).add(item)
+    return covered
+
+
+def _group(rows: list[tuple[int, str, float]]) -> list[tuple[int, str, list[float]]]:
+    series: list[tuple[int, str, list[float]]] = []
+    for run_id, commit, value in rows:
+        if not series or series[-1][0] != run_id:
+            series.append((run_id, commit, []))
+        series[-1][2].append(value)
+    return series
+
+
+def percentile(values: list[float], share: float) -> float:
+    ordered = sorted(values)
+    rank = share * (len(ordered) - 1)
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def change_points(values: list[float], offset: int = 0) -> list[int]:
+    """
+    Indexes where the level of `values` shifts, found by recursive binary segmentation.
+    """
+    n = len(values)
+    best, best_index = 0.0, None
+    for k in range(MIN_SEGMENT, n - MIN_SEGMENT + 1):
+        left, right = values[:k], values[k:]
+        mean_left, mean_right = statistics.fmean(left), statistics.fmean(right)
+        spread = math.sqrt((statistics.pvariance(left) * len(left) + statistics.pvariance(right) * len(right)) / n)
+        shift = abs(mean_right - mean_left)
+        score = shift / spread * math.sqrt(len(left) * len(right) / n) if spread else (math.inf if shift else 0.0)
+        if score > best and shift >= MIN_SHIFT * max(abs(mean_left), 1e-9):
+            best, best_index = score, k
+    if best_index is None or best < CHANGE_THRESHOLD:
+        return []
+    return change_points(values[:best_index], offset) + [offset + best_index] + change_points(values[best_index:], offset + best_index)
+
+
+def describe_changes(series: list[tuple[int, str, list[float]]]) -> list[str]:
+    medians = [statistics.median(samples) for _, _, samples in series]
+    lines = []
+    for index in change_points(medians):
+        before = statistics.median(medians[max(0, index - MIN_SEGMENT):index])
+        after = statistics.median(medians[index:index + MIN_SEGMENT])
+        run_id, commit, _ = series[index]
+        change = f" ({after / before - 1:+.0%})" if before else ""
+        lines.append(f"{before:.4g} -> {after:.4g}{change}, first at {commit[:10]} (run {run_id})")
+    return lines
+
+
+def all_routes(conn: sqlite3.Connection, metric: str) -> list[str]:
+    return [row[0] for row in conn.execute("select distinct route from page_metrics where metric = ? order by route", (metric,))]
+
+
+def all_tests(conn: sqlite3.Connection) -> list[str]:
+    return [row[0] for row in conn.execute("select distinct test_id from results order by test_id")]
+
+
+def _sparkline(medians: list[float], changes: list[int], width: int = 320, height: int = 60) -> str:
+    if len(medians) < 2:
+        return ""
+    top, bottom = max(medians), min(medians)
+    span = (top - bottom) or 1.0
+    points = [(i * width / (len(medians) - 1), height - 4 - (value - bottom) / span * (height - 8)) for i, value in enumerate(medians)]
+    marks = "".join(f'<line x1="{points[i][0]:.1f}" y1="0" x2="{points[i][0]:.1f}" y2="{height}" class="change"/>' for i in changes)
+    line = " ".join(f"{x:.1f},{y:.1f}" for x, y in points)
+    return f'<svg width="{width}" height="{height}">{marks}<polyline points="{line}"/></svg>'
+
+
+def _report_rows(series_by_name: dict[str, list[tuple[int, str, list[float]]]], unit: str) -> str:
+    rows = []
+    for name, series in series_by_name.items():
+        if not series:
+            continue
+        samples = [value for _, _, values in series for value in values]
+        medians = [statistics.median(values) for _, _, values in series]
+        changes = change_points(medians)
+        change_text = "<br>".join(html.escape(line) for line in describe_changes(series)) or "-"
+        rows.append(
+            f"<tr><td>{html.escape(name)}</td><td>{len(series)}</td><td>{percentile(samples, 0.5):.0f} {unit}</td>"
+            f"<td>{percentile(samples, 0.95):.0f} {unit}</td><td>{_sparkline(medians, changes)}</td><td>{change_text}</td></tr>"
+        )
+    header = "<tr><th>name</th><th>runs</th><th>p50</th><th>p95</th><th>trend (median per run)</th><th>shifts</th></tr>"
+    return f"<table>{header}{''.join(rows)}</table>"
+
+
+def write_report(conn: sqlite3.Connection, path: str, metric: str = "load", last: int = DEFAULT_LAST_RUNS):
+    routes = {route: route_series(conn, route, metric, last) for route in all_routes(conn, metric)}
+    # Durations in ms so both tables read the same way.
+    tests = {test: [(r, c, [v * 1000 for v in values]) for r, c, values in test_series(conn, test, last)] for test in all_tests(conn)}
+    runs, = conn.execute("select count(*) from runs").fetchone()
+    document = f"""<!doctype html>
+<html><head><meta charset="utf-8"><title>Test results trends</title><style>
+body {{ font-family: sans-serif; margin: 2em; }} table {{ border-collapse: collapse; margin-bottom: 2em; }}
+td, th {{ border-bottom: 1px solid #ddd; padding: 4px 10px; text-align: left; vertical-align: middle; }}
+polyline {{ fill: none; stroke: #2563eb; stroke-width: 1.5; }} .change {{ stroke: #dc2626; stroke-dasharray: 3 2; }}
+</style></head><body>
+<h1>Test results trends</h1><p>{runs} runs stored; last {last} runs shown. Red lines mark detected shifts.</p>
+<h2>Page {html.escape(metric)} per route</h2>{_report_rows(routes, "ms")}
+<h2>Duration per test</h2>{_report_rows(tests, "ms")}
+</body></html>"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(document)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--store", default=STORE_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+    query_parser = commands.add_parser("query", help="Percentiles of one route metric or test duration.")
+    target = query_parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--route")
+    target.add_argument("--test")
+    query_parser.add_argument("--metric", default="load", help="Navigation Timing metric: ttfb, dom_content_loaded or load.")
+    query_parser.add_argument("--last", type=int, default=DEFAULT_LAST_RUNS)
+    changes_parser = commands.add_parser("changes", help="Name the first commit where each series shifted.")
+    changes_parser.add_argument("--metric", default="load")
+    changes_parser.add_argument("--last", type=int, default=1000)
+    report_parser = commands.add_parser("report", help="Write a static HTML report.")
+    report_parser.add_argument("--out", default=REPORT_PATH)
+    report_parser.add_argument("--metric", default="load")
+    report_parser.add_argument("--last", type=int, default=DEFAULT_LAST_RUNS)
+    args = parser.parse_args()
+
+    conn = connect(args.store)
+    if args.command == "query":
+        series = route_series(conn, args.route, args.metric, args.last) if args.route else test_series(conn, args.test, args.last)
+        samples = [value for _, _, values in series for value in values]
+        if not samples:
+            raise SystemExit("No samples stored for that selection.")
+        print(f"{len(series)} runs, {len(samples)} samples: min {min(samples):.3f}  p50 {percentile(samples, 0.5):.3f}  "
+              f"p95 {percentile(samples, 0.95):.3f}  max {max(samples):.3f}")
+    elif args.command == "changes":
+        for route in all_routes(conn, args.metric):
+            for line in describe_changes(route_series(conn, route, args.metric, args.last)):
+                print(f"{route} {args.metric}: {line}")
+        for test in all_tests(conn):
+            for line in describe_changes(test_series(conn, test, args.last)):
+                print(f"{test} duration: {line}")
+    else:
+        write_report(conn, args.out, args.metric, args.last)
+        print(f"wrote {args.out}")
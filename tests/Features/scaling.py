@@ -0,0 +1,64 @@
+import pytest
+from selenium import webdriver
+from selenium.webdriver.support.ui import WebDriverWait
+
+import action_timing
+from backends import WebDriverBackend
+
+
+ACTION_TIMEOUT = 60
+# A page should not slow down with the data volume: each tier may take at most this multiple of the smallest tier.
+FLAT_TOLERANCE = 2.0
+
+# Value of each measurement at the smallest tier of its volumes, keyed by (metric, tier name).
+_baselines: dict[tuple[str, str], float] = {}
+
+
+def volume_fixture(volumes: dict[str, int]):
+    """
+    Return a module fixture that seeds each tier of `volumes` for every test in the module before moving on to the
+    next, and yields the tier's size.
+    """
+    @pytest.fixture(scope="module", params=list(volumes))
+    def volume(request, local_volume):
+        local_volume(request.param)
+        yield volumes[request.param]
+
+    return volume
+
+
+def watch_actions(driver: webdriver.Edge | webdriver.Chrome) -> action_timing.ActionAttribution:
+    actions = action_timing.ActionAttribution()
+    actions.install(driver, WebDriverBackend(driver), "", {})
+    return actions
+
+
+def action_call(driver: webdriver.Edge | webdriver.Chrome, actions: action_timing.ActionAttribution, name: str, phase: str) -> dict:
+    """
+    Wait for the page to report a call of `name` made in `phase` and return its timing.
+    """
+    evaluate = WebDriverBackend(driver).evaluate
+
+    def reported(_):
+        actions.collect(evaluate, "", {})
+        return next((c for c in actions.calls if c["name"] == name and c["phase"] == phase), None)
+
+    return WebDriverWait(driver, ACTION_TIMEOUT).until(reported)
+
+
+def assert_flat(metric: str, value: float, volume: int, volumes: dict[str, int], unit: str):
+    """
+    Fail when `value` exceeds FLAT_TOLERANCE times the metric's value at the smallest tier of `volumes`.
+    The smallest tier only records that baseline; if it has not run in this session (-k, --impacted-by, a rerun of
+    one tier), there is nothing to compare with and the check is left out.
+    """
+    smallest = min(volumes, key=volumes.get)
+    if volume == volumes[smallest]:
+        _baselines[(metric, smallest)] = value
+        return
+    baseline = _baselines.get((metric, smallest))
+    if baseline is None:
+        return
+    assert value <= max(baseline, 1.0) * FLAT_TOLERANCE, (
+        f"FAILED: {metric} grew from {baseline:.0f} at {smallest} to {value:.0f} at {volume} {unit} (limit {FLAT_TOLERANCE}x)"
+    )
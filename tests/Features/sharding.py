@@ -0,0 +1,85 @@
+import heapq
+import json
+import os
+import statistics
+
+import pytest
+
+
+DURATIONS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".test_durations.json")
+HISTORY_LENGTH = 10
+DEFAULT_DURATION = 30.0
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    """
+    Parse a `--shard i/n` value into a 1-based (index, count) pair.
+    """
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{value}', expected i/n e.g. 1/3")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Invalid shard '{value}', index must be between 1 and {count}")
+    return index, count
+
+
+def group_key(item: pytest.Item) -> str:
+    """
+    Tests of one shard_group in one module depend on each other and stay together; any other test stands alone.
+    """
+    marker = item.get_closest_marker("shard_group")
+    return f"{item.path.name}::{marker.args[0]}" if marker else item.nodeid
+
+
+def load_durations(path: str = DURATIONS_PATH) -> dict[str, list[float]]:
+    """
+    Load the per-test duration history, or an empty history if none was stored yet.
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def store_durations(durations: dict[str, float], path: str = DURATIONS_PATH):
+    """
+    Append the durations of this run to the stored history, keeping the last HISTORY_LENGTH runs per test.
+    """
+    history = load_durations(path)
+    for nodeid, duration in durations.items():
+        history[nodeid] = (history.get(nodeid, []) + [round(duration, 3)])[-HISTORY_LENGTH:]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(dict(sorted(history.items())), f, indent=2)
+
+
+def estimate_durations(nodeids: list[str], history: dict[str, list[float]]) -> dict[str, float]:
+    """
+    Estimate each test's duration as the median of its history.
+    Tests without history get the mean of the known estimates so new tests do not all land on one shard.
+    """
+    known = {nodeid: statistics.median(runs) for nodeid, runs in history.items() if runs}
+    fallback = statistics.mean(known.values()) if known else DEFAULT_DURATION
+    return {nodeid: known.get(nodeid, fallback) for nodeid in nodeids}
+
+
+def plan_shards(groups: dict[str, list[str]], estimates: dict[str, float], count: int) -> list[list[str]]:
+    """
+    Assign groups of node IDs to `count` shards with longest-processing-time-first scheduling.
+    A group is never split, so dependency chains always run together on one shard.
+    """
+    weighted = sorted(
+        ((sum(estimates[nodeid] for nodeid in nodeids), key) for key, nodeids in groups.items()),
+        key=lambda item: (-item[0], item[1]),
+    )
+    heap = [(0.0, index) for index in range(count)]
+    shards: list[list[str]] = [[] for _ in range(count)]
+    for weight, key in weighted:
+        load, index = heapq.heappop(heap)
+        shards[index].extend(groups[key])
+        heapq.heappush(heap, (load + weight, index))
+    return shards
+
+
+def shard_loads(shards: list[list[str]], estimates: dict[str, float]) -> list[float]:
+    return [sum(estimates[nodeid] for nodeid in shard) for shard in shards]
@@ -0,0 +1,138 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable
+
+import pytest
+
+import config
+from backends import CDPBackend
+from cdp import CDPBrowser
+from login import login_browser
+from sharding import group_key
+
+
+ROLE_EMAILS = {
+    "patient": "PATIENT_EMAIL",
+    "doctor": "DOCTOR_EMAIL",
+    "admin": "ADMIN_EMAIL",
+}
+
+
+class TabBackend(CDPBackend):
+    """
+    A CDP backend bound to one tab of a shared browser. Calls are scheduled on the pool's event loop,
+    so tabs can be driven from several threads at once over the browser's single websocket.
+    """
+
+    def run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def quit(self):
+        self.run(self.page.close())
+
+
+class TabPool:
+    """
+    One logged-in browser per role; every read-only test gets a fresh tab in its role's browser.
+    """
+
+    def __init__(self, headless: bool = False):
+        self.headless = headless
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        self._browsers: dict[str, CDPBrowser] = {}
+        self._locks = {role: threading.Lock() for role in ROLE_EMAILS}
+
+    def _call(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def _browser_for(self, role: str) -> CDPBrowser:
+        with self._locks[role]:
+            if role not in self._browsers:
+                browser = self._call(CDPBrowser.launch(headless=self.headless))
+                login_tab = TabBackend(self._loop, browser, self._call(browser.new_page()))
+                login_browser(login_tab, config.BASE_URL, getattr(config, ROLE_EMAILS[role]), config.UNIVERSAL_PASSWORD)
+                self._browsers[role] = browser
+            return self._browsers[role]
+
+    def open_tab(self, role: str) -> TabBackend:
+        browser = self._browser_for(role)
+        return TabBackend(self._loop, browser, self._call(browser.new_page()))
+
+    def close(self):
+        for browser in self._browsers.values():
+            try:
+                self._call(browser.close())
+            except Exception:
+                pass
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+def tab_role(item: pytest.Item) -> str | None:
+    """
+    Role whose browser can host this test in a tab: it must be marked read_only and use exactly one <role>_browser fixture.
+    Only the test's own arguments count: conftest's autouse fixtures apply to every test and do not decide where it runs.
+    """
+    if not item.get_closest_marker("read_only"):
+        return None
+    fixtures = set(item._fixtureinfo.argnames) if hasattr(item, "_fixtureinfo") else set()
+    roles = [role for role in ROLE_EMAILS if f"{role}_browser" in fixtures]
+    extra = fixtures - {f"{role}_browser" for role in ROLE_EMAILS} - {"browser", "request"}
+    return roles[0] if len(roles) == 1 and not extra else None
+
+
+def ahead_of_writers(items: list[pytest.Item]) -> list[pytest.Item]:
+    """
+    The tests that can run in tabs before the rest of the session: read-only tests no earlier test of their shard
+    group writes for, e.g. not PT016, which reads the plan PT012 assigns.
+    """
+    ahead, written = [], set()
+    for item in items:
+        if tab_role(item) and group_key(item) not in written:
+            ahead.append(item)
+        else:
+            written.add(group_key(item))
+    return ahead
+
+
+def run_in_tabs(items: list[pytest.Item], workers: int, headless: bool = False,
+                setup: Callable[[pytest.Item, TabBackend], None] | None = None,
+                teardown: Callable[[pytest.Item, TabBackend], None] | None = None):
+    """
+    Run read-only tests concurrently, each in its own tab, and report them through the normal pytest hooks.
+    `setup` and `teardown` take the place of the browser fixture's instrumentation around each test's tab.
+    """
+    pool = TabPool(headless=headless)
+
+    def _run(item: pytest.Item):
+        role = tab_role(item)
+        tab = pool.open_tab(role)
+        try:
+            if setup:
+                setup(item, tab)
+            # tab_role admits no other arguments than these; `browser` is the backend the role fixture logs in.
+            arguments = {f"{role}_browser": tab, "browser": tab, "request": item._request}
+            for name in item._fixtureinfo.argnames:
+                item.funcargs[name] = arguments[name]
+            item.runtest()
+        finally:
+            if teardown:
+                teardown(item, tab)
+            tab.quit()
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(pytest.CallInfo.from_call, lambda item=item: _run(item), "call"): item for item in items}
+            # Reports are emitted from the main thread as tests finish, since terminal reporting is not thread-safe.
+            for future in as_completed(futures):
+                item = futures[future]
+                item.ihook.pytest_runtest_logstart(nodeid=item.nodeid, location=item.location)
+                report = item.ihook.pytest_runtest_makereport(item=item, call=future.result())
+                item.ihook.pytest_runtest_logreport(report=report)
+                item.ihook.pytest_runtest_logfinish(nodeid=item.nodeid, location=item.location)
+    finally:
+        pool.close()
@@ -0,0 +1,163 @@
+from datetime import datetime, timedelta, timezone
+from itertools import combinations
+
+import pytest
+
+from directory_oracle import expected_ids
+
+
+pytestmark = pytest.mark.api
+
+EVENT_TYPES = ["appointment", "clinical_note", "record_update", "status_change", "profile_update", "file_upload"]
+FEE_RANGES = [(None, None), (0, 5000), (5000, 20000)]
+SEARCH_TERMS = [None, "a", "' OR 1=1 --"]
+INVALID_PHONES = ["abc123", "12", "+1 555", "++44 20 7946 0958", "0000000000000000000"]
+
+
+def _doctors(api, **options) -> list[dict]:
+    result = api.action("getDoctors", options)
+    assert "error" not in result, f"FAILED: getDoctors({options}) returned {result.get('error')}"
+    return result["data"]
+
+
+def _ids(doctors: list[dict]) -> set[str]:
+    return {doctor["id"] for doctor in doctors}
+
+
+def _events(api, **options) -> list[dict]:
+    threads = api.action("getPatientTimeline", api.user_id, options)
+    return [event for thread in threads for event in thread["events"]]
+
+
+def _event_key(event: dict) -> tuple[str, str, str]:
+    return event["type"], event["id"], event["date"]
+
+
+def _event_time(event: dict) -> datetime:
+    # The server runs in UTC, so dates without an offset are UTC as well.
+    moment = datetime.fromisoformat(event["date"].replace("Z", "+00:00"))
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+@pytest.fixture(scope="module")
+def organisations(patient_api) -> list[dict]:
+    return patient_api.action("getOrganisations")["data"]
+
+
+@pytest.fixture(scope="module")
+def all_doctors(patient_api) -> list[dict]:
+    return _doctors(patient_api)
+
+
+@pytest.fixture(scope="module")
+def available_doctors(patient_api) -> list[dict]:
+    return _doctors(patient_api, availableOnly=True)
+
+
+@pytest.fixture(scope="module")
+def directory(patient_api, all_doctors) -> list[dict]:
+    """
+    The unfiltered doctors with their availability read from doctor_schedules directly, for directory_oracle.
+    """
+    available = {row["doctor_id"] for row in patient_api.rest("doctor_schedules", select="doctor_id", is_available="eq.true")}
+    return [{**doctor, "available": doctor["id"] in available} for doctor in all_doctors]
+
+
+@pytest.fixture(scope="module")
+def all_events(patient_api) -> list[dict]:
+    return _events(patient_api)
+
+
+@pytest.mark.parametrize("available_only", [False, True])
+def test_API_DF002(patient_api, organisations, all_doctors, available_doctors, available_only):
+    """
+    Filter Appointments by Clinic: For every clinic, verify the clinic filter returns exactly the unfiltered doctors of that clinic
+    """
+    unfiltered = available_doctors if available_only else all_doctors
+    assert organisations, "FAILED: No clinics returned by getOrganisations."
+    for organisation in organisations:
+        doctors = _doctors(patient_api, organisationId=organisation["id"], availableOnly=available_only or None)
+        wrong = [doctor["full_name"] for doctor in doctors if doctor["organisation_id"] != organisation["id"]]
+        assert not wrong, f"FAILED: Doctors from other clinics returned for {organisation['name']}: {wrong}"
+        expected = {doctor["id"] for doctor in unfiltered if doctor["organisation_id"] == organisation["id"]}
+        assert _ids(doctors) == expected, f"FAILED: Clinic filter for {organisation['name']} does not match the unfiltered list."
+
+
+@pytest.mark.parametrize("available_only", [False, True])
+@pytest.mark.parametrize("search", SEARCH_TERMS)
+@pytest.mark.parametrize("min_fee,max_fee", FEE_RANGES)
+def test_API_DF005(patient_api, organisations, directory, min_fee, max_fee, search, available_only):
+    """
+    Combined Filters Clinic + Fee + Name + Availability: Verify every combination returns exactly the unfiltered doctors the oracle keeps
+    """
+    for organisation in organisations:
+        options = {"organisationId": organisation["id"], "minFee": min_fee, "maxFee": max_fee, "search": search, "availableOnly": available_only or None}
+        combined = _doctors(patient_api, **options)
+        for doctor in combined:
+            assert doctor["organisation_id"] == organisation["id"], f"FAILED: {doctor['full_name']} is not in {organisation['name']}."
+            assert min_fee is None or doctor["fee_cents"] >= min_fee, f"FAILED: {doctor['full_name']} fee is below {min_fee}."
+            assert max_fee is None or doctor["fee_cents"] <= max_fee, f"FAILED: {doctor['full_name']} fee is above {max_fee}."
+            assert not search or search.lower() in doctor["full_name"].lower(), f"FAILED: {doctor['full_name']} does not match '{search}'."
+
+        expected = expected_ids(directory, options)
+        assert _ids(combined) == expected, (
+            f"FAILED: Combined filters for {organisation['name']} returned {len(combined)} doctors, expected {len(expected)}: "
+            f"{len(_ids(combined) - expected)} unexpected, {len(expected - _ids(combined))} missing."
+        )
+
+
+def test_API_TL004(patient_api, all_events):
+    """
+    Filter Timeline By Date Range: Verify each date range returns exactly the unfiltered events inside it
+    """
+    assert all_events, "FAILED: Patient timeline is empty, nothing to filter."
+    times = sorted(_event_time(event) for event in all_events)
+    middle = times[len(times) // 2]
+    ranges = [
+        (times[0], middle),
+        (middle, times[-1]),
+        (middle, None),
+        (None, middle),
+        (times[0] - timedelta(days=3650), times[0] - timedelta(days=1)),
+    ]
+    for start, end in ranges:
+        events = _events(patient_api, startDate=start, endDate=end)
+        outside = [event["date"] for event in events if (start and _event_time(event) < start) or (end and _event_time(event) > end)]
+        assert not outside, f"FAILED: Events outside {start} - {end} returned: {outside}"
+        expected = {
+            _event_key(event) for event in all_events
+            if (not start or _event_time(event) >= start) and (not end or _event_time(event) <= end)
+        }
+        assert {_event_key(event) for event in events} == expected, f"FAILED: Date range {start} - {end} does not match the unfiltered timeline."
+
+
+@pytest.mark.parametrize(
+    "types",
+    [list(subset) for size in range(1, len(EVENT_TYPES) + 1) for subset in combinations(EVENT_TYPES, size)],
+    ids=lambda types: "+".join(types),
+)
+def test_API_TL005(patient_api, all_events, types):
+    """
+    Filter Timeline By Type: Verify every combination of event types returns exactly the unfiltered events of those types
+    """
+    events = _events(patient_api, types=types)
+    wrong = sorted({event["type"] for event in events} - set(types))
+    assert not wrong, f"FAILED: Event types {wrong} returned when filtering by {types}."
+    expected = {_event_key(event) for event in all_events if event["type"] in types}
+    assert {_event_key(event) for event in events} == expected, f"FAILED: Type filter {types} does not match the unfiltered timeline."
+
+
+@pytest.mark.parametrize("phone", INVALID_PHONES)
+def test_API_PM004(patient_api, phone):
+    """
+    Edit Contact Details Invalid Phone: Submit a malformed phone number and verify it is rejected and not persisted
+    """
+    before = patient_api.rest("profiles", id=f"eq.{patient_api.user_id}", select="full_name,phone")[0]
+    result = patient_api.action("updateProfile", {"full_name": before["full_name"], "phone": phone})
+
+    after = patient_api.rest("profiles", id=f"eq.{patient_api.user_id}", select="full_name,phone")[0]
+    if after["phone"] != before["phone"]:
+        patient_api.action("updateProfile", {"full_name": before["full_name"], "phone": before["phone"] or ""})
+    assert after["phone"] == before["phone"], f"FAILED: Invalid phone '{phone}' was saved as {after['phone']}."
+    assert result.get("error") == "Validation failed", f"FAILED: Invalid phone '{phone}' was not rejected: {result}"
+    assert "phone" in (result.get("details") or {}), f"FAILED: Rejection of '{phone}' does not point at the phone field: {result}"
@@ -0,0 +1,171 @@
+import config
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+
+import pytest
+
+import booking_load
+import local_stack
+import scaling
+from api_client import AppSession
+from plan_check import run_sql
+from results_store import percentile
+
+
+
+# Every tier reseeds audit_logs, and the unaudited runs revoke inserts on it for the whole stack. The skip is decided
+# before any tier is seeded.
+pytestmark = [pytest.mark.api, pytest.mark.shard_group("audit-volumes"),
+              pytest.mark.skipif(not (config.SUPABASE_URL and config.SUPABASE_ANON_KEY),
+                                 reason="profile saves need NEXT_PUBLIC_SUPABASE_URL and NEXT_PUBLIC_SUPABASE_ANON_KEY of the local stack")]
+
+SEQUENTIAL_SAVES = 30
+CONCURRENT_USERS = 50
+CONCURRENT_SAVES = 5
+MARKER_PREFIX = "audit-overhead"
+RUN_ID = int(time.time())
+# WAL position and on-disk size of the two tables a profile save writes, heap plus indexes.
+WRITE_COUNTERS_SQL = """
+select pg_wal_lsn_diff(pg_current_wal_insert_lsn(), '0/0')::bigint,
+       pg_total_relation_size('public.profiles'), pg_total_relation_size('public.audit_logs');
+"""
+
+
+audit_rows = scaling.volume_fixture(local_stack.AUDIT_VOLUMES)
+
+
+@pytest.fixture(scope="module")
+def audit_db(audit_rows):
+    return local_stack.stack_env()["DB_URL"]
+
+
+@pytest.fixture(scope="module")
+def profile_sessions(audit_rows) -> list[AppSession]:
+    return booking_load.open_sessions(CONCURRENT_USERS, actions=("updateProfile",))
+
+
+@pytest.fixture(scope="module")
+def full_names(profile_sessions) -> dict[str, str]:
+    # updateProfile requires full_name; sending the stored one keeps the change, and the audit entry, to the bio.
+    return {s.user_id: s.rest("profiles", id=f"eq.{s.user_id}", select="full_name")[0]["full_name"] for s in profile_sessions}
+
+
+@contextmanager
+def audit_disabled(db_url: str):
+    """
+    Revoke inserts on audit_logs from signed-in users. logAudit only logs the rejected insert, so saves still
+    succeed, but each one still makes the round trip for it.
+    """
+    run_sql(db_url, "revoke insert on public.audit_logs from authenticated;")
+    try:
+        yield
+    finally:
+        run_sql(db_url, "grant insert on public.audit_logs to authenticated;")
+
+
+def write_counters(db_url: str) -> dict[str, int]:
+    wal, profiles, audit_logs = run_sql(db_url, WRITE_COUNTERS_SQL).strip().split("|")
+    return {"wal": int(wal), "profiles": int(profiles), "audit_logs": int(audit_logs)}
+
+
+def audited(db_url: str, marker: str) -> int:
+    return int(run_sql(db_url, f"select count(*) from public.audit_logs where details->'bio'->>'new' like '{marker} %';"))
+
+
+def save(session: AppSession, full_name: str, bio: str) -> dict:
+    """
+    Save a profile the way the profile page does, and time the updateProfile call.
+    """
+    attempt = {"error": None, "payload": len(bio.encode())}
+    start = time.monotonic()
+    try:
+        result = session.action("updateProfile", {"full_name": full_name, "bio": bio})
+        attempt["error"] = result.get("error")
+    except Exception as e:
+        attempt["error"] = f"{type(e).__name__}: {e}"
+    attempt["latency_ms"] = (time.monotonic() - start) * 1000
+    return attempt
+
+
+def measure(db_url: str, sessions: list[AppSession], full_names: dict[str, str], saves: int, marker: str) -> dict:
+    """
+    Every session saves its profile `saves` times in a row, all sessions at once. Returns latency, throughput and
+    the bytes of WAL and table growth each save caused; `amplification` is WAL bytes per byte of bio saved.
+    """
+    def user(session: AppSession) -> list[dict]:
+        return [save(session, full_names[session.user_id], f"{marker} {session.user_id} {n}") for n in range(saves)]
+
+    before = write_counters(db_url)
+    start = time.monotonic()
+    with ThreadPoolExecutor(len(sessions)) as pool:
+        attempts = [attempt for attempts in pool.map(user, sessions) for attempt in attempts]
+    elapsed = time.monotonic() - start
+    after = write_counters(db_url)
+
+    latencies = [attempt["latency_ms"] for attempt in attempts]
+    saved = sum(1 for attempt in attempts if not attempt["error"])
+    per_save = {f"{name}_per_save": (after[name] - before[name]) / len(attempts) for name in before}
+    payload = sum(attempt["payload"] for attempt in attempts) / len(attempts)
+    return {
+        "saves": len(attempts),
+        "failed": len(attempts) - saved,
+        "p50": percentile(latencies, 0.5),
+        "p95": percentile(latencies, 0.95),
+        "max": max(latencies),
+        "saves_per_s": saved / elapsed if elapsed else 0.0,
+        **per_save,
+        "amplification": per_save["wal_per_save"] / payload,
+        "errors": sorted({attempt["error"] for attempt in attempts if attempt["error"]})[:3],
+    }
+
+
+def compare(db_url: str, sessions: list[AppSession], full_names: dict[str, str], saves: int, name: str, record_metrics) -> dict[str, dict]:
+    """
+    Run the same saves without and then with auditing, record both and their difference, and return both runs.
+    """
+    runs = {}
+    for mode in ("unaudited", "audited"):
+        marker = f"{MARKER_PREFIX} {name} {mode} {RUN_ID}"
+        with audit_disabled(db_url) if mode == "unaudited" else nullcontext():
+            runs[mode] = measure(db_url, sessions, full_names, saves, marker)
+        runs[mode]["audit_entries"] = audited(db_url, marker)
+        record_metrics(f"profile save {name} {mode}", **{k: v for k, v in runs[mode].items() if k != "errors"})
+
+    record_metrics(f"profile save {name} audit cost", p50=runs["audited"]["p50"] - runs["unaudited"]["p50"],
+                   p95=runs["audited"]["p95"] - runs["unaudited"]["p95"],
+                   wal_per_save=runs["audited"]["wal_per_save"] - runs["unaudited"]["wal_per_save"])
+    return runs
+
+
+def test_AL001(audit_rows, audit_db, profile_sessions, full_names, record_metrics):
+    """
+    Audited Profile Save Latency: One user saves the profile repeatedly (PM002/PM003/PM023) with and without the audit insert; record latency, WAL and table growth per save against a pre-grown audit_logs.
+    """
+    session = profile_sessions[0]
+    save(session, full_names[session.user_id], f"{MARKER_PREFIX} warm-up {RUN_ID}")
+
+    runs = compare(audit_db, [session], full_names, SEQUENTIAL_SAVES, "sequential", record_metrics)
+
+    for mode, run in runs.items():
+        assert not run["failed"], f"FAILED: {run['failed']} of {run['saves']} {mode} saves failed: {run['errors']}"
+    assert runs["audited"]["audit_entries"] == SEQUENTIAL_SAVES, (
+        f"FAILED: {runs['audited']['audit_entries']} audit entries for {SEQUENTIAL_SAVES} saves"
+    )
+    assert not runs["unaudited"]["audit_entries"], "FAILED: saves were audited while inserts into audit_logs were revoked"
+    scaling.assert_flat("audited profile save p50 ms", runs["audited"]["p50"], audit_rows, local_stack.AUDIT_VOLUMES, "audit entries")
+
+
+def test_AL002(audit_rows, audit_db, profile_sessions, full_names, record_metrics):
+    """
+    Audited Profile Saves Under Concurrency: Many users save their profiles at once with and without the audit insert; every successful save must leave exactly one audit entry.
+    """
+    runs = compare(audit_db, profile_sessions, full_names, CONCURRENT_SAVES, "concurrent", record_metrics)
+    expected = CONCURRENT_USERS * CONCURRENT_SAVES
+
+    for mode, run in runs.items():
+        assert not run["failed"], f"FAILED: {run['failed']} of {run['saves']} {mode} saves failed: {run['errors']}"
+    assert runs["audited"]["audit_entries"] == expected, (
+        f"FAILED: {runs['audited']['audit_entries']} audit entries for {expected} concurrent saves"
+    )
+    scaling.assert_flat("audited concurrent profile save p95 ms", runs["audited"]["p95"], audit_rows, local_stack.AUDIT_VOLUMES, "audit entries")
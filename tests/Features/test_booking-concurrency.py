@@ -0,0 +1,80 @@
+import config
+import time
+
+import pytest
+
+import booking_load
+import local_stack
+
+
+# Both tests write appointments into the reseeded local stack and share its patient sessions.
+pytestmark = [pytest.mark.api, pytest.mark.shard_group("booking-concurrency")]
+
+SCALE = "small"
+RACE_PATIENTS = 20
+LOAD_PATIENTS = 50
+LOAD_SESSIONS = 10
+LOAD_DURATION = 120
+MARKER_PREFIX = "booking-concurrency"
+RUN_ID = int(time.time())
+
+
+@pytest.fixture(scope="module")
+def booking_db(local_volume):
+    """
+    Seed the small volume and yield the local database URL. Appointments booked by the module are deleted at teardown.
+    """
+    if not (config.SUPABASE_URL and config.SUPABASE_ANON_KEY):
+        pytest.skip("booking load needs NEXT_PUBLIC_SUPABASE_URL and NEXT_PUBLIC_SUPABASE_ANON_KEY of the local stack")
+    local_volume(SCALE)
+    db_url = local_stack.stack_env()["DB_URL"]
+    yield db_url
+    booking_load.clean_up(db_url, MARKER_PREFIX)
+
+
+@pytest.fixture(scope="module")
+def patient_sessions(booking_db):
+    return booking_load.open_sessions(LOAD_PATIENTS)
+
+
+@pytest.fixture(scope="module")
+def target_sessions(booking_db):
+    return booking_load.empty_sessions(booking_db, LOAD_SESSIONS + 1)
+
+
+def test_BC001(booking_db, patient_sessions, target_sessions, record_metrics):
+    """
+    Simultaneous Booking Of One Slot: Distinct patients book the same free session slot at the same moment; exactly one booking may succeed and no slot or session may be overbooked.
+    """
+    marker = f"{MARKER_PREFIX} BC001 {RUN_ID}"
+    doctor_id, date = target_sessions[0]
+    slot = booking_load.free_slots(patient_sessions[0], doctor_id, date)[0]
+
+    attempts, elapsed = booking_load.race(patient_sessions[:RACE_PATIENTS], doctor_id, date, slot, marker)
+    stats = booking_load.summarize(attempts, elapsed)
+    record_metrics("booking race", **stats)
+    violations = booking_load.integrity_violations(booking_db, marker, attempts)
+
+    assert stats["booked"] == 1, (
+        f"FAILED: {stats['booked']} of {RACE_PATIENTS} simultaneous bookings of {date} {slot['startTime']} succeeded"
+    )
+    assert not violations, "FAILED: " + "; ".join(violations)
+
+
+def test_BC002(booking_db, patient_sessions, target_sessions, record_metrics):
+    """
+    Booking Window Rush: Many patients keep booking free slots of a few sessions until they are full; record booking latency and throughput, and check capacity, double bookings and orphan rows.
+    """
+    marker = f"{MARKER_PREFIX} BC002 {RUN_ID}"
+    targets = target_sessions[1:]
+
+    attempts, elapsed = booking_load.sustained(patient_sessions, targets, marker, LOAD_DURATION)
+    stats = booking_load.summarize(attempts, elapsed)
+    record_metrics("booking rush", **stats)
+    violations = booking_load.integrity_violations(booking_db, marker, attempts)
+
+    assert stats["booked"], f"FAILED: none of {stats['attempts']} bookings succeeded: {attempts[0]['error'] if attempts else 'no attempts'}"
+    assert stats["booked"] <= len(targets) * local_stack.SLOTS_PER_DAY, (
+        f"FAILED: {stats['booked']} bookings succeeded for {len(targets) * local_stack.SLOTS_PER_DAY} slots"
+    )
+    assert not violations, "FAILED: " + "; ".join(violations)
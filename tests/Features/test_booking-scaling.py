@@ -0,0 +1,139 @@
+import config
+import importlib
+import time
+
+import pytest
+import requests
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+import local_stack
+import scaling
+import throttling
+from directory_oracle import seed_id
+
+booking = importlib.import_module("test_doctor-filtering")
+
+
+# One seeded volume serves the whole module, so its tests stay on one shard.
+pytestmark = pytest.mark.shard_group("booking-volumes")
+
+RENDER_TIMEOUT = 60
+# The list has finished rendering once its card count holds for one poll.
+SETTLE_POLL = 0.2
+# Installed before the page's scripts, so the first doctor card is timed from navigation start, not from when
+# WebDriver next polls.
+FIRST_CARD_JS = f"""
+new MutationObserver((mutations, observer) => {{
+    if (document.querySelector({booking.DOCTOR_CARDS_SELECTOR!r})) {{
+        window.__firstCard = performance.now();
+        observer.disconnect();
+    }}
+}}).observe(document, {{childList: true, subtree: true}});
+"""
+CARD_COUNT_JS = f"return document.querySelectorAll({booking.DOCTOR_CARDS_SELECTOR!r}).length;"
+
+
+booking_volume = scaling.volume_fixture(local_stack.BOOKING_VOLUMES)
+
+
+def available_doctors(doctors: int) -> int:
+    # SEED_SQL leaves every fourth doctor without an available day.
+    return doctors - doctors // 4
+
+
+def rendered_cards(driver: webdriver.Edge | webdriver.Chrome, expected: int) -> int:
+    """
+    Doctor cards on the page once the list has rendered: `expected`, or the count it settled at short of that.
+    """
+    counts = []
+
+    def settled(d):
+        counts.append(d.execute_script(CARD_COUNT_JS))
+        return counts[-1] == expected or (len(counts) > 1 and counts[-1] == counts[-2] > 0)
+
+    try:
+        WebDriverWait(driver, RENDER_TIMEOUT, poll_frequency=SETTLE_POLL).until(settled)
+    except TimeoutException:
+        pass
+    return counts[-1] if counts else 0
+
+
+def assert_all_listed(rendered: int, expected: int):
+    # local_stack raises PostgREST's max_rows above every volume, so a short list is the app's, not the API's.
+    assert rendered == expected, f"FAILED: the booking page listed {rendered} of {expected} doctors"
+
+
+def test_BV001(booking_volume, record_metrics, patient_login: webdriver.Edge | webdriver.Chrome):
+    """
+    Booking Page Load At Volume: Open /patient/book with every doctor of the network listed; record document and getDoctors server time, payload size and time to the first doctor card.
+    """
+    driver = patient_login
+    actions = scaling.watch_actions(driver)
+    driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": FIRST_CARD_JS})
+    driver.get(f"{config.BASE_URL}{booking.BOOK_APPOINTMENT_PATH}")
+
+    first_card = WebDriverWait(driver, RENDER_TIMEOUT).until(lambda d: d.execute_script("return window.__firstCard;"))
+    get_doctors = scaling.action_call(driver, actions, "getDoctors", "load")
+    navigation = driver.execute_script(f"return {throttling.NAVIGATION_TIMING_JS};")
+    rendered = rendered_cards(driver, booking_volume)
+
+    record_metrics("booking page", ttfb=navigation["ttfb"], first_card=first_card, get_doctors_server=get_doctors["server"],
+                   get_doctors_kb=get_doctors["bytes"] / 1024, get_doctors_client=get_doctors["client"], doctors=booking_volume,
+                   rendered=rendered)
+    assert_all_listed(rendered, booking_volume)
+    scaling.assert_flat("getDoctors server ms", get_doctors["server"], booking_volume, local_stack.BOOKING_VOLUMES, "doctors")
+    scaling.assert_flat("time to first card ms", first_card, booking_volume, local_stack.BOOKING_VOLUMES, "doctors")
+
+
+def test_BV002(booking_volume, record_metrics, patient_login: webdriver.Edge | webdriver.Chrome):
+    """
+    Available Soon Toggle At Volume: Tick Available Soon (DF003) and time the availability query until the filtered list is shown.
+    """
+    driver = patient_login
+    actions = scaling.watch_actions(driver)
+    driver.get(f"{config.BASE_URL}{booking.BOOK_APPOINTMENT_PATH}")
+    scaling.action_call(driver, actions, "getDoctors", "load")
+    listed = rendered_cards(driver, booking_volume)
+
+    start = time.monotonic()
+    booking._toggle_available(WebDriverWait(driver, booking.WAIT_TIME))
+    get_doctors = scaling.action_call(driver, actions, "getDoctors", "interaction")
+    expected = available_doctors(booking_volume)
+    rendered = rendered_cards(driver, expected)
+    filtered_ms = (time.monotonic() - start) * 1000
+
+    record_metrics("booking available soon", filtered=filtered_ms, get_doctors_server=get_doctors["server"],
+                   get_doctors_kb=get_doctors["bytes"] / 1024, doctors=booking_volume, rendered=rendered)
+    assert_all_listed(listed, booking_volume)
+    assert_all_listed(rendered, expected)
+    scaling.assert_flat("available soon getDoctors server ms", get_doctors["server"], booking_volume, local_stack.BOOKING_VOLUMES, "doctors")
+
+
+def test_BV003(booking_volume, record_metrics):
+    """
+    getDoctors Query Breakdown At Volume: Issue each query getDoctors makes, as its service-role client does, and record time, payload and rows per query.
+    """
+    stack = local_stack.stack_env()
+    headers = {"apikey": stack["SERVICE_ROLE_KEY"], "Authorization": f"Bearer {stack['SERVICE_ROLE_KEY']}"}
+    rest = f"{stack['API_URL']}/rest/v1"
+    failed = []
+
+    def query(name: str, url: str, params: dict) -> list:
+        start = time.monotonic()
+        response = requests.get(url, params=params, headers=headers)
+        elapsed_ms = (time.monotonic() - start) * 1000
+        rows = response.json() if response.ok else []
+        record_metrics(f"getDoctors query {name}", ms=elapsed_ms, kb=len(response.content) / 1024, rows=len(rows),
+                       status=response.status_code, doctors=booking_volume)
+        if not response.ok:
+            failed.append(f"{name} returned HTTP {response.status_code}")
+        return rows
+
+    profiles = query("profiles", f"{rest}/profiles", {"select": "id,organisation_id,full_name,fee_cents,specialization", "role": "eq.doctor"})
+    # getDoctors asks for the schedules of the doctors the profiles query returned.
+    doctor_ids = [profile["id"] for profile in profiles]
+    query("doctor_schedules", f"{rest}/doctor_schedules", {"select": "doctor_id", "doctor_id": f"in.({','.join(doctor_ids)})", "is_available": "eq.true"})
+    query("appointments", f"{rest}/appointments", {"select": "doctor_id", "patient_id": f"eq.{seed_id('patient', 1)}"})
+    assert not failed, f"FAILED: getDoctors queries failed at {booking_volume} doctors: " + "; ".join(failed)
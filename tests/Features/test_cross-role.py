@@ -0,0 +1,144 @@
+import config
+import importlib
+import random
+import time
+
+import pytest
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from native_input import replace_text
+
+# Writes are the same UI steps the feature tests use.
+treatment = importlib.import_module("test_personalized-treatment")
+notes = importlib.import_module("test_doctor-notes")
+timeline = importlib.import_module("test_timeline")
+
+
+WAIT_TIME = 15
+RUN_ID = int(time.time())
+# A fresh diagnosis per run, so the patient's newest plan is recognisably the one assigned here.
+DIAGNOSIS_NAME = f"Propagation-Diagnosis-{RUN_ID}"
+TEMPLATE_NAME = f"Propagation-Template-{RUN_ID}"
+# DiagnosisAutocomplete searches 500 ms after the last keystroke.
+SEARCH_DEBOUNCE = 0.6
+
+
+def search_diagnosis(driver: webdriver.Edge | webdriver.Chrome, name: str) -> list:
+    """
+    Search the doctor's diagnosis box for `name` and return the matching options once the search has answered.
+    """
+    WebDriverWait(driver, WAIT_TIME).until(
+        EC.element_to_be_clickable((By.XPATH, "//button[@role='combobox'][contains(., 'Select diagnosis...')]"))
+    ).click()
+    search_box = WebDriverWait(driver, WAIT_TIME).until(
+        EC.presence_of_element_located((By.CSS_SELECTOR, "input[placeholder='Search diagnosis...']"))
+    )
+    # The query outlives the popover; emptying it first makes the box search again even for the same name.
+    replace_text(search_box, "")
+    replace_text(search_box, name)
+    # Until the debounced search starts, the box still shows the previous query's results.
+    time.sleep(SEARCH_DEBOUNCE)
+    WebDriverWait(driver, WAIT_TIME).until(
+        lambda d: not d.find_elements(By.XPATH, "//div[normalize-space()='Loading...']")
+        and (d.find_elements(By.XPATH, f"//div[contains(text(), '{name}')]")
+             or d.find_elements(By.XPATH, "//div[normalize-space()='No diagnosis found.']"))
+    )
+    return driver.find_elements(By.XPATH, f"//div[contains(text(), '{name}')]")
+
+
+def diagnosis_listed(driver: webdriver.Edge | webdriver.Chrome, name: str) -> bool:
+    listed = bool(search_diagnosis(driver, name))
+    driver.switch_to.active_element.send_keys(Keys.ESCAPE)
+    return listed
+
+
+def active_plan_diagnosis(driver: webdriver.Edge | webdriver.Chrome) -> str:
+    WebDriverWait(driver, WAIT_TIME).until(
+        EC.presence_of_element_located((By.XPATH, "//h1[normalize-space()='Treatment Plan']"))
+    )
+    titles = driver.find_elements(By.XPATH, "//*[starts-with(normalize-space(), 'Diagnosis:')]")
+    return titles[0].text if titles else ""
+
+
+def timeline_shows(driver: webdriver.Edge | webdriver.Chrome, text: str) -> bool:
+    timeline.wait_for_heading_and_cards(driver)
+    return bool(driver.find_elements(By.XPATH, f"//*[contains(text(), '{text}')]"))
+
+
+@pytest.mark.shard_group("cross-role")
+def test_XR001(cross_role):
+    """
+    Admin Template Reaches Doctor Search: Admin creates a diagnosis with a template; time until the doctor's diagnosis search lists it.
+    """
+    admin = cross_role.role("admin")
+    admin.get(f"{config.BASE_URL}{treatment.ADMIN_TREATMENT_PATH}")
+
+    def _create():
+        treatment.create_diagnosis(admin, DIAGNOSIS_NAME, "Automation-created diagnosis")
+        treatment.create_template(admin, DIAGNOSIS_NAME, TEMPLATE_NAME)
+
+    result = cross_role.measure(
+        "admin template -> doctor search", _create, "doctor", f"{config.BASE_URL}{treatment.DOCTOR_PATIENT_PATH}",
+        lambda drv: diagnosis_listed(drv, DIAGNOSIS_NAME),
+    )
+    assert not result["visible_before"], "FAILED: diagnosis was listed before the admin created it"
+    assert result["visible_s"] is not None, "FAILED: new diagnosis never appeared in the doctor's search"
+    assert not result["stale_reloads"], f"FAILED: doctor's search served a stale diagnosis list for {result['stale_reloads']} reload(s)"
+
+
+@pytest.mark.shard_group("cross-role")
+def test_XR002(cross_role):
+    """
+    Assigned Plan Reaches Patient: Doctor assigns the new diagnosis's plan; time until the patient's treatment plan page shows it.
+    """
+    doctor = cross_role.role("doctor")
+    doctor.get(f"{config.BASE_URL}{treatment.DOCTOR_PATIENT_PATH}")
+    options = search_diagnosis(doctor, DIAGNOSIS_NAME)
+    assert options, f"FAILED: {DIAGNOSIS_NAME} is not in the doctor's diagnosis search"
+    options[0].click()
+
+    def _assign():
+        # The write is timed from the Assign click until the app confirms it.
+        WebDriverWait(doctor, WAIT_TIME).until(EC.element_to_be_clickable((By.XPATH, "//button[text()='Assign Treatment Plan']"))).click()
+        treatment.wait_for_toast(doctor, "Treatment plan assigned")
+
+    result = cross_role.measure(
+        "doctor assigns plan -> patient plan page", _assign,
+        "patient", f"{config.BASE_URL}{treatment.PATIENT_PATH}",
+        lambda drv: DIAGNOSIS_NAME in active_plan_diagnosis(drv),
+    )
+    assert not result["visible_before"], "FAILED: plan was visible to the patient before it was assigned"
+    assert result["visible_s"] is not None, "FAILED: assigned plan never reached the patient's treatment plan page"
+    assert not result["stale_reloads"], f"FAILED: patient's plan page served stale data for {result['stale_reloads']} reload(s)"
+
+
+@pytest.mark.shard_group("cross-role")
+def test_XR003(cross_role):
+    """
+    Finalized Note Reaches Patient Timeline: Doctor finalizes a consultation note; time until it shows on the patient's timeline.
+    """
+    doctor = cross_role.role("doctor")
+    doctor.get(f"{config.BASE_URL}{notes.PATIENT_PATH}")
+    note_text = f"test_XR003 {RUN_ID}-{random.randint(1000, 9999)}"
+
+    def _finalize():
+        notes_field = WebDriverWait(doctor, WAIT_TIME).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, notes.NOTES_SELECTOR))
+        )
+        replace_text(notes_field, note_text)
+        WebDriverWait(doctor, WAIT_TIME).until(EC.element_to_be_clickable((By.XPATH, "//button[text()='Finalize Consultation']"))).click()
+        WebDriverWait(doctor, WAIT_TIME).until(EC.alert_is_present()).accept()
+        WebDriverWait(doctor, WAIT_TIME).until(
+            EC.presence_of_element_located((By.XPATH, "//div[contains(normalize-space(.), 'Finalized') and .//*[local-name()='svg']]"))
+        )
+
+    result = cross_role.measure(
+        "doctor finalizes note -> patient timeline", _finalize, "patient", f"{config.BASE_URL}{timeline.TIMELINE_PATH}",
+        lambda drv: timeline_shows(drv, note_text),
+    )
+    assert result["visible_s"] is not None, "FAILED: finalized note never appeared on the patient's timeline"
+    assert not result["stale_reloads"], f"FAILED: patient's timeline served stale data for {result['stale_reloads']} reload(s)"
@@ -1,15 +1,20 @@
 import config
+import json
 import time
 
+import pytest
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
+from native_input import press_key
+
 
 BOOK_APPOINTMENT_PATH = "/patient/book"
 DOCTOR_CARDS_SELECTOR = ".grid.gap-4 div.rounded-lg.border.bg-card"
+SEARCH_SELECTOR = "input[placeholder='Name...']"
 WAIT_TIME = 15
 
 
@@ -57,8 +62,7 @@ def test_DF001(patient_login:webdriver.Edge | webdriver.Chrome):
     
     slider = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, 'span[role="slider"]')))
     slider.click()
-    for _ in range(30):
-        slider.send_keys(Keys.LEFT)
+    press_key(driver, Keys.LEFT, 30)
     
     time.sleep(4)  # Wait for filtering to take effect
     filtered_count = len(driver.find_elements(By.CSS_SELECTOR, DOCTOR_CARDS_SELECTOR))
@@ -106,23 +110,23 @@ def test_DF003(patient_login:webdriver.Edge | webdriver.Chrome):
     assert any("Dr Seb" in card.text for card in cards), "FAILED: Available Soon filter did not keep Dr Seb."
 
 
-def test_DF004(patient_login:webdriver.Edge | webdriver.Chrome):
+@pytest.mark.read_only
+@pytest.mark.benchmark
+def test_DF004(patient_browser):
     """
     Filter Appointments by Doctor: Filter appointments by a specific doctor and verify results
     """
-    driver = patient_login
-    driver.get(f"{config.BASE_URL}{BOOK_APPOINTMENT_PATH}")
+    browser = patient_browser
+    browser.get(f"{config.BASE_URL}{BOOK_APPOINTMENT_PATH}")
 
-    wait = WebDriverWait(driver, WAIT_TIME)
-    wait.until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, DOCTOR_CARDS_SELECTOR)))
+    browser.wait_for_selector(DOCTOR_CARDS_SELECTOR, WAIT_TIME)
+    browser.wait_for_selector(SEARCH_SELECTOR, WAIT_TIME)
+    browser.type(SEARCH_SELECTOR, "Dr Gemma Bones")
 
-    search_box = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "input[placeholder='Name...']")))
-    search_box.clear()
-    search_box.send_keys("Dr Gemma Bones")
-
-    wait.until(lambda d: len(_get_cards(d)) == 1)
-    cards = _get_cards(driver)
-    assert "Dr Gemma Bones" in cards[0].text, "FAILED: Doctor filter did not show Dr Gemma Bones."
+    cards_js = f"document.querySelectorAll({json.dumps(DOCTOR_CARDS_SELECTOR)})"
+    browser.wait_until(f"{cards_js}.length === 1", WAIT_TIME)
+    card_text = browser.evaluate(f"{cards_js}[0].innerText")
+    assert "Dr Gemma Bones" in card_text, "FAILED: Doctor filter did not show Dr Gemma Bones."
 
 
 def test_DF005(patient_login:webdriver.Edge | webdriver.Chrome):
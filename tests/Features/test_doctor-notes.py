@@ -1,7 +1,9 @@
 import config
+import json
 import random
 import time
 
+import pytest
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
@@ -13,6 +15,7 @@ NOTES_SELECTOR = 'textarea[placeholder*="Type clinical observations, diagnosis,
 WAIT_TIME = 15
 
 
+@pytest.mark.shard_group("patient-draft")
 def test_DN001(doctor_login:webdriver.Edge | webdriver.Chrome):
     """
     Open Notes Load Existing Draft: Open consultation notes for a patient and verify existing draft loads.
@@ -37,6 +40,7 @@ def test_DN001(doctor_login:webdriver.Edge | webdriver.Chrome):
     assert draft_text == test_text, f"FAILED: Draft text did not persist. Expected: {test_text}, Found: {draft_text}"
 
 
+@pytest.mark.shard_group("patient-draft")
 def test_DN003(doctor_login:webdriver.Edge | webdriver.Chrome):
     """
     Auto Save Draft Interval: Type text and wait for autosave interval to elapse; verify draft saved.
@@ -57,6 +61,7 @@ def test_DN003(doctor_login:webdriver.Edge | webdriver.Chrome):
     assert draft_text == test_text, f"FAILED: Draft text did not persist. Expected: {test_text}, Found: {draft_text}"
 
 
+@pytest.mark.shard_group("patient-draft")
 def test_DN004_DN005(doctor_login:webdriver.Edge | webdriver.Chrome):
     """
     DN-004 - Manual Save Finalize: Click Finalize Consultation and verify draft becomes final record.\n
@@ -82,14 +87,16 @@ def test_DN004_DN005(doctor_login:webdriver.Edge | webdriver.Chrome):
     assert not notes_field.is_enabled(), "FAILED: Notes field is still editable after finalization."
 
 
-def test_DN002(doctor_login:webdriver.Edge | webdriver.Chrome):
+@pytest.mark.shard_group("patient-draft")
+@pytest.mark.read_only
+@pytest.mark.benchmark
+def test_DN002(doctor_browser):
     """
     Start New Note Empty Draft: Open notes when no draft exists and verify editor state
     """
-    driver = doctor_login
-    driver.get(f"{config.BASE_URL}{PATIENT_PATH}")
+    browser = doctor_browser
+    browser.get(f"{config.BASE_URL}{PATIENT_PATH}")
 
-    notes_field = WebDriverWait(driver, WAIT_TIME).until(
-        EC.presence_of_element_located((By.CSS_SELECTOR, NOTES_SELECTOR)) 
-    )
-    assert notes_field.get_attribute("value") == "", "FAILED: Expected empty draft for new note, but found existing text."
\ No newline at end of file
+    browser.wait_for_selector(NOTES_SELECTOR, WAIT_TIME)
+    draft_text = browser.evaluate(f"document.querySelector({json.dumps(NOTES_SELECTOR)}).value")
+    assert draft_text == "", "FAILED: Expected empty draft for new note, but found existing text."
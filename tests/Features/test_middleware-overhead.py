@@ -0,0 +1,84 @@
+import config
+import statistics
+
+import pytest
+import requests
+
+import cache_report
+from api_client import AppSession
+from middleware_timing import COOKIE_STATES, middleware_calls_ms, timed_get
+from results_store import percentile
+from tabs import ROLE_EMAILS
+
+
+pytestmark = pytest.mark.api
+
+REPEATS = 10
+
+
+@pytest.fixture(scope="module")
+def role_sessions() -> dict[str, AppSession]:
+    if not (config.SUPABASE_URL and config.SUPABASE_ANON_KEY):
+        pytest.skip("API tier needs NEXT_PUBLIC_SUPABASE_URL and NEXT_PUBLIC_SUPABASE_ANON_KEY")
+    return {role: AppSession(config.BASE_URL, config.SUPABASE_URL, config.SUPABASE_ANON_KEY, getattr(config, email), config.UNIVERSAL_PASSWORD)
+            for role, email in ROLE_EMAILS.items()}
+
+
+def route_requests(session: AppSession, path: str, state: str) -> list[dict]:
+    """
+    Request a route REPEATS times with the role's cookies valid, expired or left out, and time each response.
+    An expired session is refreshed by middleware, so the refreshed one is taken over before the next request, and
+    the role is left with valid cookies.
+    """
+    anonymous = requests.Session()
+    samples = []
+    for _ in range(REPEATS):
+        if state == "expired":
+            session.expire()
+        elapsed, response = timed_get(anonymous if state == "absent" else session.http, f"{config.BASE_URL}{path}")
+        refreshed = session.adopt_session(response) if state == "expired" else None
+        samples.append({"ms": elapsed, "status": response.status_code, "location": response.headers.get("location", ""), "refreshed": refreshed})
+    return samples
+
+
+@pytest.mark.parametrize("state", COOKIE_STATES)
+def test_MW001(role_sessions, state, record_metrics):
+    """
+    Route TTFB By Auth Cookie State: Request every route the suite visits with valid, expired or no auth cookies; record TTFB per route and check middleware lets signed-in users through, refreshes expired sessions and sends anonymous visitors to /login.
+    """
+    failures = []
+    for role, path in cache_report.suite_routes():
+        samples = route_requests(role_sessions[role], path, state)
+        latencies = [sample["ms"] for sample in samples]
+        record_metrics(f"middleware {state} cookies {role} {path}", p50=percentile(latencies, 0.5), p95=percentile(latencies, 0.95))
+
+        if state == "absent":
+            wrong = [s for s in samples if s["status"] not in (302, 303, 307, 308) or "/login" not in s["location"]]
+        else:
+            wrong = [s for s in samples if s["status"] != 200]
+        if wrong:
+            failures.append(f"{path} as {role}: HTTP {wrong[0]['status']} {wrong[0]['location']}".rstrip())
+        elif state == "expired" and not all(s["refreshed"] for s in samples):
+            failures.append(f"{path} as {role}: middleware did not refresh the expired session")
+    assert not failures, f"FAILED: with {state} cookies: " + "; ".join(failures)
+
+
+def test_MW002(role_sessions, record_metrics):
+    """
+    Middleware Share Of TTFB: Time the getUser and role lookup calls updateSession makes for a signed-in user, and record them as a share of each route's TTFB.
+    """
+    shares = []
+    implausible = []
+    for role, path in cache_report.suite_routes():
+        session = role_sessions[role]
+        calls = middleware_calls_ms(session)
+        ttfb = statistics.median(sample["ms"] for sample in route_requests(session, path, "valid"))
+        share = sum(calls.values()) / ttfb if ttfb else 0.0
+        shares.append(share)
+        record_metrics(f"middleware share {role} {path}", ttfb=ttfb, **calls, share=share)
+        # updateSession runs inside every request, so its calls take some but never all of the route's TTFB.
+        if not 0 < share < 1:
+            implausible.append(f"{role} {path}: {sum(calls.values()):.0f} ms of {ttfb:.0f} ms")
+
+    record_metrics("middleware share of TTFB", median=statistics.median(shares), largest=max(shares))
+    assert not implausible, "FAILED: middleware calls are not a share of TTFB for " + "; ".join(implausible)
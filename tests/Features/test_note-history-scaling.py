@@ -0,0 +1,175 @@
+import config
+import importlib
+import statistics
+import time
+
+import pytest
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+import local_stack
+import native_input
+import scaling
+from backends import WebDriverBackend
+from directory_oracle import seed_id
+from plan_check import run_sql
+
+notes = importlib.import_module("test_doctor-notes")
+
+
+# One seeded history serves the whole module, so its tests stay on one shard. NH004 finalizes the draft, so it runs last.
+pytestmark = pytest.mark.shard_group("note-history-volumes")
+
+RENDER_TIMEOUT = 120
+PATIENT_PATH = f"/doctor/patients/{seed_id('patient', 1)}"
+# Patient 1's only note in the history volumes: the draft SEED_SQL writes, owned by doctor 1.
+DRAFT_CONTENT = "<p>Clinical note 1 for patient 1.</p>"
+# Autosave fires 2 s after the last edit; relation sizes grow in 8 kB pages, so one autosave alone rarely shows.
+AUTOSAVES = 10
+FINALIZED_XPATH = "//div[contains(normalize-space(.), 'Finalized') and .//*[local-name()='svg']]"
+HISTORY_ENTRIES_XPATH = "//div[@role='dialog']//div[contains(@class, 'border') and contains(@class, 'rounded-md')]"
+HISTORY_LOADING_XPATH = "//div[@role='dialog']//*[contains(@class, 'animate-spin')]"
+NO_HISTORY_XPATH = "//div[@role='dialog']//p[normalize-space()='No history found.']"
+RELATION_SIZES_SQL = """
+select c.relname, pg_relation_size(c.oid), pg_indexes_size(c.oid) from pg_class c
+where c.oid in ('public.medical_records'::regclass, 'public.medical_record_versions'::regclass);
+"""
+ARCHIVED_VERSIONS_SQL = f"""
+select count(*) from public.medical_record_versions
+where medical_record_id in (select id from public.medical_records where patient_id = '{seed_id('patient', 1)}');
+"""
+
+
+note_history = scaling.volume_fixture(local_stack.NOTE_HISTORY_VOLUMES)
+
+
+@pytest.fixture(scope="module")
+def db_url(note_history):
+    return local_stack.stack_env()["DB_URL"]
+
+
+def relation_sizes(db_url: str) -> dict[str, dict[str, int]]:
+    sizes = {}
+    for line in run_sql(db_url, RELATION_SIZES_SQL).splitlines():
+        name, table, indexes = line.split("|")
+        sizes[name] = {"table": int(table), "indexes": int(indexes)}
+    return sizes
+
+
+def growth(before: dict, after: dict, writes: int) -> dict[str, float]:
+    """
+    Bytes of table and index growth per write, for each relation, named like medical_records_table.
+    """
+    return {
+        f"{name}_{part}": (after[name][part] - before[name][part]) / writes
+        for name in before for part in ("table", "indexes")
+    }
+
+
+def open_draft(driver: webdriver.Edge | webdriver.Chrome) -> float:
+    """
+    Open the patient page and return the ms until the editor shows the seeded draft.
+    """
+    start = time.monotonic()
+    driver.get(f"{config.BASE_URL}{PATIENT_PATH}")
+    WebDriverWait(driver, RENDER_TIMEOUT, poll_frequency=0.05).until(
+        lambda d: any(field.get_attribute("value") for field in d.find_elements(By.CSS_SELECTOR, notes.NOTES_SELECTOR))
+    )
+    return (time.monotonic() - start) * 1000
+
+
+def test_NH001(note_history, record_metrics, doctor_login: webdriver.Edge | webdriver.Chrome):
+    """
+    Draft Load With Long History: Open the patient page and time until the existing draft is in the editor (DN001).
+    """
+    driver = doctor_login
+    load_ms = open_draft(driver)
+    draft = driver.find_element(By.CSS_SELECTOR, notes.NOTES_SELECTOR).get_attribute("value")
+
+    record_metrics("note draft load", load=load_ms, versions=note_history)
+    assert draft == DRAFT_CONTENT, f"FAILED: editor shows {draft!r} instead of the seeded draft"
+    scaling.assert_flat("draft load ms", load_ms, note_history, local_stack.NOTE_HISTORY_VOLUMES, "versions")
+
+
+def test_NH002(note_history, db_url, record_metrics, doctor_login: webdriver.Edge | webdriver.Chrome):
+    """
+    Autosave With Long History: Edit the draft repeatedly and time each autosave round trip; record table and index growth per autosave (DN003).
+    """
+    driver = doctor_login
+    actions = scaling.watch_actions(driver)
+    open_draft(driver)
+    field = driver.find_element(By.CSS_SELECTOR, notes.NOTES_SELECTOR)
+    before = relation_sizes(db_url)
+
+    latencies = []
+    for n in range(AUTOSAVES):
+        native_input.replace_text(field, f"{DRAFT_CONTENT} Autosave {n} {time.time()}")
+        edited = time.monotonic()
+        WebDriverWait(driver, notes.WAIT_TIME, poll_frequency=0.05).until(
+            EC.presence_of_element_located((By.XPATH, "//*[contains(text(), 'Saving...')]"))
+        )
+        saving = time.monotonic()
+        WebDriverWait(driver, notes.WAIT_TIME, poll_frequency=0.05).until(
+            EC.invisibility_of_element_located((By.XPATH, "//*[contains(text(), 'Saving...')]"))
+        )
+        latencies.append((time.monotonic() - saving) * 1000)
+        assert saving - edited < notes.WAIT_TIME, "FAILED: autosave did not start after an edit"
+
+    after = relation_sizes(db_url)
+    actions.collect(WebDriverBackend(driver).evaluate, "", {})
+    server = [c["server"] for c in actions.calls if c["name"] == "saveNoteDraft" and c["phase"] == "interaction"]
+    assert len(server) >= AUTOSAVES, f"FAILED: {len(server)} saveNoteDraft calls seen for {AUTOSAVES} edits"
+
+    autosave_ms = statistics.median(latencies)
+    record_metrics("note autosave", median=autosave_ms, slowest=max(latencies), server=statistics.median(server),
+                   versions=note_history, **growth(before, after, AUTOSAVES))
+    scaling.assert_flat("autosave ms", autosave_ms, note_history, local_stack.NOTE_HISTORY_VOLUMES, "versions")
+
+
+def test_NH003(note_history, record_metrics, doctor_login: webdriver.Edge | webdriver.Chrome):
+    """
+    Version History Dialog With Long History: Open History on the draft, time until the version list has loaded and check every archived version is listed.
+    """
+    driver = doctor_login
+    open_draft(driver)
+
+    start = time.monotonic()
+    WebDriverWait(driver, notes.WAIT_TIME).until(EC.element_to_be_clickable((By.XPATH, "//button[normalize-space()='History']"))).click()
+    WebDriverWait(driver, RENDER_TIMEOUT, poll_frequency=0.05).until(
+        lambda d: not d.find_elements(By.XPATH, HISTORY_LOADING_XPATH)
+        and (d.find_elements(By.XPATH, HISTORY_ENTRIES_XPATH) or d.find_elements(By.XPATH, NO_HISTORY_XPATH))
+    )
+    history_ms = (time.monotonic() - start) * 1000
+    listed = len(driver.find_elements(By.XPATH, HISTORY_ENTRIES_XPATH))
+
+    record_metrics("note history dialog", load=history_ms, versions=note_history, listed=listed)
+    # getNoteHistory reads every version in one PostgREST request; local_stack raises max_rows above the longest history,
+    # so a short list is the app's, not the API's.
+    assert listed >= note_history, f"FAILED: the History dialog lists {listed} of {note_history} archived versions"
+
+
+def test_NH004(note_history, db_url, record_metrics, doctor_login: webdriver.Edge | webdriver.Chrome):
+    """
+    Finalize With Long History: Finalize the draft and time until it shows as finalized; record the version table growth (DN004).
+    """
+    driver = doctor_login
+    actions = scaling.watch_actions(driver)
+    open_draft(driver)
+    before = relation_sizes(db_url)
+    archived = int(run_sql(db_url, ARCHIVED_VERSIONS_SQL))
+
+    start = time.monotonic()
+    WebDriverWait(driver, notes.WAIT_TIME).until(EC.element_to_be_clickable((By.XPATH, "//button[text()='Finalize Consultation']"))).click()
+    WebDriverWait(driver, notes.WAIT_TIME).until(EC.alert_is_present()).accept()
+    WebDriverWait(driver, RENDER_TIMEOUT, poll_frequency=0.05).until(EC.presence_of_element_located((By.XPATH, FINALIZED_XPATH)))
+    finalize_ms = (time.monotonic() - start) * 1000
+
+    finalize_note = scaling.action_call(driver, actions, "finalizeNote", "interaction")
+
+    after = relation_sizes(db_url)
+    record_metrics("note finalize", finalize=finalize_ms, server=finalize_note["server"], versions=note_history,
+                   **growth(before, after, 1))
+    assert int(run_sql(db_url, ARCHIVED_VERSIONS_SQL)) > archived, "FAILED: finalizing did not archive a version"
+    scaling.assert_flat("finalizeNote server ms", finalize_note["server"], note_history, local_stack.NOTE_HISTORY_VOLUMES, "versions")
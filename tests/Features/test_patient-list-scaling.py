@@ -0,0 +1,99 @@
+import config
+import re
+import time
+
+import pytest
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+import local_stack
+import scaling
+
+
+# One seeded volume serves the whole module, so its tests stay on one shard.
+pytestmark = pytest.mark.shard_group("patient-list-volumes")
+
+DOCTOR_PATIENTS_PATH = "/doctor/patients"
+ADMIN_PATIENTS_PATH = "/admin/patients"
+# The largest volumes render tens of thousands of cards in one server response.
+RENDER_TIMEOUT = 120
+COUNT_PATTERN = re.compile(r"\((\d+)\)")
+ERROR_TEXT = "Error loading patients"
+
+LIST_STATE_JS = """
+return {
+    rendered: Array.from(document.querySelectorAll('a')).filter(a => a.textContent.trim() === 'View Records').length,
+    paginated: !!document.querySelector("nav[aria-label='pagination'], [data-slot='pagination']"),
+};
+"""
+# The lists have no search box, so "search" is finding a patient the way a user would: locating the card by name
+# and bringing it into view, with layout forced so the cost of the long page is included.
+FIND_PATIENT_JS = """
+const start = performance.now();
+const heading = Array.from(document.querySelectorAll('h3')).find(h => h.textContent.trim() === arguments[0]);
+if (heading) {
+    heading.scrollIntoView({block: 'center'});
+    heading.getBoundingClientRect();
+}
+return {found: !!heading, ms: performance.now() - start};
+"""
+
+
+patient_volume = scaling.volume_fixture(local_stack.PATIENT_LIST_SIZES)
+
+
+def measure_patient_list(driver: webdriver.Edge | webdriver.Chrome, path: str, heading: str, patients: int, record_metrics) -> dict:
+    driver.execute_cdp_cmd("Performance.enable", {})
+    start = time.monotonic()
+    driver.get(f"{config.BASE_URL}{path}")
+    title = WebDriverWait(driver, RENDER_TIMEOUT).until(
+        EC.presence_of_element_located((By.XPATH, f"//*[starts-with(normalize-space(), '{heading} (') or contains(text(), '{ERROR_TEXT}')]"))
+    )
+    render_ms = (time.monotonic() - start) * 1000
+    if ERROR_TEXT in title.text:
+        return {"error": title.text, "render_ms": render_ms}
+
+    state = driver.execute_script(LIST_STATE_JS)
+    found = driver.execute_script(FIND_PATIENT_JS, f"Patient {patients}")
+    performance = {m["name"]: m["value"] for m in driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]}
+    result = {
+        "error": None,
+        "render_ms": render_ms,
+        "listed": int(COUNT_PATTERN.search(title.text).group(1)),
+        "rendered": state["rendered"],
+        "paginated": state["paginated"],
+        "find_ms": found["ms"] if found["found"] else None,
+        "heap_mb": performance["JSHeapUsedSize"] / 2**20,
+        "dom_nodes": int(performance["Nodes"]),
+        "layout_ms": performance["LayoutDuration"] * 1000,
+        "script_ms": performance["ScriptDuration"] * 1000,
+    }
+    record_metrics(f"patient list {path}", render=render_ms, find=result["find_ms"] or 0.0, heap_mb=result["heap_mb"],
+                   dom_nodes=result["dom_nodes"], layout=result["layout_ms"], script=result["script_ms"], rendered=result["rendered"])
+    return result
+
+
+def assert_complete_list(result: dict, patients: int):
+    assert not result["error"], f"FAILED: page failed with {patients} patients: {result['error']}"
+    assert result["listed"] == patients, f"FAILED: list reports {result['listed']} of {patients} patients"
+    assert result["rendered"] == result["listed"] or result["paginated"], (
+        f"FAILED: {result['rendered']} of {result['listed']} patient cards rendered without pagination"
+    )
+
+
+def test_PL001(patient_volume, record_metrics, doctor_login: webdriver.Edge | webdriver.Chrome):
+    """
+    Doctor Patient List At Volume: Open /doctor/patients for a doctor who has seen every seeded patient; record render time, find-by-name time, heap and DOM size.
+    """
+    result = measure_patient_list(doctor_login, DOCTOR_PATIENTS_PATH, "My Patients", patient_volume, record_metrics)
+    assert_complete_list(result, patient_volume)
+
+
+def test_PL002(patient_volume, record_metrics, admin_login: webdriver.Edge | webdriver.Chrome):
+    """
+    Admin Organisation Patient List At Volume: Open /admin/patients for an organisation holding every seeded patient; record render time, find-by-name time, heap and DOM size.
+    """
+    result = measure_patient_list(admin_login, ADMIN_PATIENTS_PATH, "Organisation Patients", patient_volume, record_metrics)
+    assert_complete_list(result, patient_volume)
@@ -10,6 +10,9 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
+from backends import xpath_count_js
+from native_input import replace_text
+
 
 ADMIN_TREATMENT_PATH = "/admin/treatment-plans"
 DOCTOR_PATIENT_PATH = "/doctor/patients/4fa73507-0e87-41e2-a66a-f055b994c260"
@@ -167,8 +170,7 @@ def fill_field_by_label(dialog, label_text: str, value: str):
             By.XPATH,
             f".//label[normalize-space()='{label_text}']/following::input[1] | .//label[normalize-space()='{label_text}']/following::textarea[1]",
         )
-        field.clear()
-        field.send_keys(value)
+        replace_text(field, value)
         return True
     except Exception:
         return False
@@ -214,8 +216,7 @@ def open_add_dialog(driver: webdriver.Edge | webdriver.Chrome, card, button_labe
 def fill_any_input(dialog, value: str):
     inputs = dialog.find_elements(By.XPATH, ".//input[@type='text' or @type='search']")
     if inputs:
-        inputs[0].clear()
-        inputs[0].send_keys(value)
+        replace_text(inputs[0], value)
         return True
     return False
 
@@ -223,8 +224,7 @@ def fill_any_input(dialog, value: str):
 def fill_any_textarea(dialog, value: str):
     textareas = dialog.find_elements(By.TAG_NAME, "textarea")
     if textareas:
-        textareas[0].clear()
-        textareas[0].send_keys(value)
+        replace_text(textareas[0], value)
         return True
     return False
 
@@ -239,6 +239,7 @@ def submit_dialog(dialog):
     return False
 
 
+@pytest.mark.shard_group("admin-template")
 def test_PT001(admin_login:webdriver.Edge | webdriver.Chrome):
     """
     Admin Create Diagnosis: Admin creates a new diagnosis type with name and description.
@@ -256,6 +257,7 @@ def test_PT001(admin_login:webdriver.Edge | webdriver.Chrome):
     assert created["ok"], "FAILED: diagnosis not created"
 
 
+@pytest.mark.shard_group("admin-template")
 def test_PT003(admin_login:webdriver.Edge | webdriver.Chrome):
     """
     Admin Create Treatment Template: Admin adds a template under a diagnosis with steps and metadata.
@@ -328,6 +330,7 @@ def test_PT004(admin_login:webdriver.Edge | webdriver.Chrome):
 """
 
 
+@pytest.mark.shard_group("admin-template")
 def test_PT005(admin_login:webdriver.Edge | webdriver.Chrome):
     """
     Admin Add Multiple Templates: Admin adds an ordered multiple steps to a template.
@@ -355,6 +358,7 @@ def test_PT005(admin_login:webdriver.Edge | webdriver.Chrome):
     assert step_added["ok"], "FAILED: template step not added"
 
 
+@pytest.mark.shard_group("admin-template")
 def test_PT006(admin_login:webdriver.Edge | webdriver.Chrome):
     """
     Admin Add Workflow Steps: Admin adds multiple steps to a template workflow.
@@ -447,6 +451,7 @@ def test_PT010(doctor_login:webdriver.Edge | webdriver.Chrome):
     assert result_found["ok"], "FAILED: diagnosis search returned no results"
 
 
+@pytest.mark.shard_group("patient-plan")
 def test_PT012(doctor_login:webdriver.Edge | webdriver.Chrome):
     """
     Doctor Assign Template To Patient: Doctor assigns a chosen template to a patient creating a PatientTreatmentPlan.
@@ -482,22 +487,24 @@ def test_PT012(doctor_login:webdriver.Edge | webdriver.Chrome):
     assert assigned["ok"], "FAILED: template not assigned to patient"
 
 
-def test_PT016(patient_login:webdriver.Edge | webdriver.Chrome):
+@pytest.mark.shard_group("patient-plan")
+@pytest.mark.read_only
+@pytest.mark.benchmark
+def test_PT016(patient_browser):
     """
     Patient View Assigned Treatment Plan: Patient opens treatment plan page and sees roadmap and step statuses.
     """
-    driver = patient_login
-
-    def _view(drv):
-        time.sleep(3)
-        timeline = WebDriverWait(drv, WAIT_TIME).until(
-            EC.presence_of_all_elements_located((By.XPATH, "//div[text()='Active Plan']"))
-        )
-        assert timeline, "FAILED: no treatment plan steps displayed"
+    browser = patient_browser
+    browser.get(f"{config.BASE_URL}{PATIENT_PATH}")
+    if "404" in browser.title():
+        pytest.skip("Page not found (404)")
 
-    with_page(driver, PATIENT_PATH, _view)
+    time.sleep(3)
+    plans = browser.wait_until(xpath_count_js("//div[text()='Active Plan']"), WAIT_TIME)
+    assert plans, "FAILED: no treatment plan steps displayed"
 
 
+@pytest.mark.shard_group("patient-plan")
 def test_PT017(patient_login:webdriver.Edge | webdriver.Chrome):
     """
     Patient Book Step From Plan: Patient clicks Book Now on a pending step and is redirected to prefilled booking form.
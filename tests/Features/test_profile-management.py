@@ -1,11 +1,14 @@
 import config
 
+import pytest
 from selenium import webdriver
 from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
+from native_input import replace_text
+
 
 PROFILE_PATH = "/profile"
 WAIT_TIME = 15
@@ -54,8 +57,7 @@ def wait_for_save_button_enabled(driver: webdriver.Edge | webdriver.Chrome):
 
 
 def clear_and_type(element, text: str):
-    element.clear()
-    element.send_keys(text)
+    replace_text(element, text)
 
 
 def wait_for_field_error(driver: webdriver.Edge | webdriver.Chrome, field_name: str):
@@ -85,20 +87,27 @@ def wait_for_field_error(driver: webdriver.Edge | webdriver.Chrome, field_name:
     return WebDriverWait(driver, WAIT_TIME).until(_find_error)
 
 
-def test_PM001(patient_login:webdriver.Edge | webdriver.Chrome):
+@pytest.mark.read_only
+@pytest.mark.benchmark
+def test_PM001(patient_browser):
     """
     View Profile Page: Open profile page and verify user details render.
     """
-    driver = patient_login
-    driver.get(f"{config.BASE_URL}{PROFILE_PATH}")
-
-    full_name_input = wait_for_personal_tab(driver)
-    phone_input = driver.find_element(By.CSS_SELECTOR, "input[name='phone']")
-    address_input = driver.find_element(By.CSS_SELECTOR, "input[name='address']")
+    browser = patient_browser
+    browser.get(f"{config.BASE_URL}{PROFILE_PATH}")
+
+    browser.wait_for_selector("input[name='full_name']", WAIT_TIME)
+    fields = browser.evaluate(
+        """({
+            full_name: document.querySelector("input[name='full_name']").value,
+            phone_visible: !!document.querySelector("input[name='phone']")?.getClientRects().length,
+            address_visible: !!document.querySelector("input[name='address']")?.getClientRects().length,
+        })"""
+    )
 
-    assert full_name_input.get_attribute("value"), "FAILED: full name is empty"
-    assert phone_input.is_displayed(), "FAILED: phone input not visible"
-    assert address_input.is_displayed(), "FAILED: address input not visible"
+    assert fields["full_name"], "FAILED: full name is empty"
+    assert fields["phone_visible"], "FAILED: phone input not visible"
+    assert fields["address_visible"], "FAILED: address input not visible"
 
 
 def test_PM002(patient_login:webdriver.Edge | webdriver.Chrome):
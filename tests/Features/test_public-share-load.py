@@ -0,0 +1,94 @@
+import config
+import time
+
+import pytest
+
+import local_stack
+import public_load
+from directory_oracle import seed_id
+from plan_check import run_sql
+
+
+# Both tests read the reseeded local stack's query statistics, so they run on one shard against one app.
+pytestmark = [pytest.mark.api, pytest.mark.shard_group("public-share-load")]
+
+SCALE = "small"
+PUBLIC_DOCTORS = 20
+PRIVATE_PATIENTS = 100
+HOT_LINKS = 5
+REPEAT_HITS = 50
+BURST_HITS = 3000
+BURST_CONCURRENCY = 100
+HOT_SHARE = 0.8
+UNKNOWN_SHARE = 0.05
+RUN_ID = int(time.time())
+PRIVATE_TEXT = "This profile is private."
+PUBLISH_SQL = """
+update public.profiles set preferences = coalesce(preferences, '{{}}'::jsonb) || '{{"privacy_settings": {{"is_public": {public}}}}}'::jsonb
+where role = 'doctor';
+"""
+
+
+@pytest.fixture(scope="module")
+def public_db(local_volume):
+    """
+    Seed the small volume with every doctor's profile public and yield the local database URL.
+    """
+    local_volume(SCALE)
+    db_url = local_stack.stack_env()["DB_URL"]
+    run_sql(db_url, PUBLISH_SQL.format(public="true"))
+    yield db_url
+    run_sql(db_url, PUBLISH_SQL.format(public="false"))
+
+
+@pytest.fixture(scope="module")
+def public_ids(public_db) -> list[str]:
+    return [seed_id("doctor", n) for n in range(1, PUBLIC_DOCTORS + 1)]
+
+
+def hammer(db_url: str, paths: list[str], concurrency: int) -> tuple[list[dict], dict]:
+    """
+    Load the paths and summarize the hits, with how many of them looked the profile up in Supabase.
+    """
+    reads = public_load.profile_reads(db_url)
+    hits, elapsed = public_load.load(config.BASE_URL, paths, concurrency)
+    stats = public_load.summarize(hits, elapsed)
+    stats["supabase_reads_per_hit"] = (public_load.profile_reads(db_url) - reads) / len(hits)
+    return hits, stats
+
+
+def test_PS001(public_db, public_ids, record_metrics):
+    """
+    Repeated Hits On One Shared Link: Open one public profile anonymously many times in a row; record latency, cache headers and how many hits reached Supabase.
+    """
+    path = public_load.PUBLIC_PATH.format(id=public_ids[0])
+    hits, stats = hammer(public_db, [path] * REPEAT_HITS, 1)
+    record_metrics("public profile repeat", **stats)
+    cache_control = sorted({hit["cache"].get("cache-control", "-") for hit in hits})
+
+    failed = [hit for hit in hits if hit["error"] or hit["status"] != 200]
+    assert not failed, f"FAILED: {len(failed)} of {REPEAT_HITS} hits of {path} failed: {failed[0]['error'] or failed[0]['status']}"
+    assert not any(PRIVATE_TEXT in hit["body"] for hit in hits), f"FAILED: {path} rendered as private after it was made public"
+    # A page that invites shared caching but still looks the profile up on every hit is neither cached nor fresh.
+    if stats["shared_cacheable"] == REPEAT_HITS:
+        assert stats["supabase_reads_per_hit"] < 1, (
+            f"FAILED: {path} is sent as cacheable ({', '.join(cache_control)}) but every hit reached Supabase"
+        )
+
+
+def test_PS002(public_db, public_ids, record_metrics):
+    """
+    Share Burst On Public Profiles: Many anonymous visitors open hot, distinct and unknown public profile links at once; no hit may fail and the app must still answer afterwards.
+    """
+    others = [seed_id("patient", n) for n in range(1, PRIVATE_PATIENTS + 1)]
+    paths = public_load.share_paths(public_ids, others, HOT_LINKS, BURST_HITS, HOT_SHARE, UNKNOWN_SHARE, seed=RUN_ID)
+    hits, stats = hammer(public_db, paths, BURST_CONCURRENCY)
+    record_metrics("public profile burst", **stats, concurrency=BURST_CONCURRENCY)
+
+    after, _ = public_load.load(config.BASE_URL, [public_load.PUBLIC_PATH.format(id=public_ids[0])], 1)
+    errors = sorted({hit["error"] or str(hit["status"]) for hit in hits if hit["error"] or hit["status"] >= 500})
+    unexpected = sorted({hit["status"] for hit in hits if not hit["error"] and hit["status"] not in (200, 404)})
+
+    assert not stats["errors"], f"FAILED: {stats['errors']} of {BURST_HITS} hits failed under the burst: {', '.join(errors[:3])}"
+    assert not unexpected, f"FAILED: public profile hits answered with HTTP {unexpected}"
+    assert after[0]["status"] == 200, f"FAILED: the public page answered {after[0]['error'] or after[0]['status']} after the burst"
@@ -0,0 +1,49 @@
+import pytest
+
+from tabs import ahead_of_writers, tab_role
+
+
+# Every read_only test and the role whose browser --tabs runs it in.
+TAB_TESTS = {
+    ("test_personalized-treatment.py", "test_PT016"): "patient",
+    ("test_doctor-filtering.py", "test_DF004"): "patient",
+    ("test_doctor-notes.py", "test_DN002"): "doctor",
+    ("test_profile-management.py", "test_PM001"): "patient",
+    ("test_timeline.py", "test_TL001"): "patient",
+    ("test_timeline.py", "test_TL008"): "patient",
+}
+
+
+def _items(request, filename: str) -> dict[str, pytest.Item]:
+    # Collected under this directory's node, so conftest's autouse fixtures apply as they do in a real run.
+    directory = request.node.getparent(pytest.Dir)
+    module = pytest.Module.from_parent(directory, path=directory.path / filename)
+    return {item.name: item for item in module.collect() if isinstance(item, pytest.Function)}
+
+
+@pytest.mark.parametrize(("filename", "name"), sorted(TAB_TESTS))
+def test_TB001(request, filename, name):
+    """
+    Read-Only Tests Run In Tabs: Every read_only test resolves to its role's browser, with conftest's autouse fixtures in place.
+    """
+    item = _items(request, filename)[name]
+    assert tab_role(item) == TAB_TESTS[(filename, name)], f"FAILED: {name} would not run in a {TAB_TESTS[(filename, name)]} tab"
+
+
+def test_TB002(request):
+    """
+    Writers Stay Out Of Tabs: Tests that are not marked read_only never run in a tab.
+    """
+    items = _items(request, "test_personalized-treatment.py")
+    assert tab_role(items["test_PT012"]) is None, "FAILED: PT012 writes the plan but would run in a tab"
+
+
+def test_TB003(request):
+    """
+    Readers Wait For Their Writers: Read-only tests of a shard group an earlier test writes to keep their place instead of running ahead in tabs.
+    """
+    items = [item for filename in ("test_personalized-treatment.py", "test_doctor-notes.py", "test_doctor-filtering.py")
+             for item in _items(request, filename).values()]
+    ahead = {item.name for item in ahead_of_writers(items)}
+    assert "test_DF004" in ahead, "FAILED: DF004 has no writer before it but would not run in a tab"
+    assert not ahead & {"test_PT016", "test_DN002"}, f"FAILED: {sorted(ahead & {'test_PT016', 'test_DN002'})} would run before the tests that write their data"
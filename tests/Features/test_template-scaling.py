@@ -0,0 +1,144 @@
+import config
+import importlib
+import time
+
+import pytest
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+import local_stack
+import scaling
+from directory_oracle import seed_id
+
+treatment = importlib.import_module("test_personalized-treatment")
+
+
+# One seeded volume serves the whole module, so its tests stay on one shard.
+pytestmark = pytest.mark.shard_group("template-volumes")
+
+RENDER_TIMEOUT = 60
+RUN_ID = int(time.time())
+# Template n belongs to Diagnosis ((n - 1) % 10 + 1) in SEED_SQL. The admin extends Template 2, the doctor assigns
+# Diagnosis 3, and seeded patient 1 follows Template 1 until that assignment replaces it.
+ADMIN_DIAGNOSIS, ADMIN_TEMPLATE = "Diagnosis 2", "Template 2"
+ASSIGN_DIAGNOSIS = "Diagnosis 3"
+DOCTOR_PATIENT_PATH = f"/doctor/patients/{seed_id('patient', 1)}"
+ADMIN_STEPS_XPATH = ".//div[contains(@class, 'bg-muted/30')]"
+ROADMAP_STEPS_XPATH = "//span[starts-with(normalize-space(), 'Step ') and contains(., ':')]"
+BOOK_STEP_SELECTOR = "a[href*='/patient/book?type=']"
+
+
+template_steps = scaling.volume_fixture(local_stack.TEMPLATE_VOLUMES)
+
+
+def count_until(driver: webdriver.Edge | webdriver.Chrome, count, expected: int) -> float:
+    """
+    Wait until `count(driver)` reaches `expected` and return the ms it took.
+    """
+    start = time.monotonic()
+    WebDriverWait(driver, RENDER_TIMEOUT, poll_frequency=0.05).until(lambda d: count(d) >= expected)
+    return (time.monotonic() - start) * 1000
+
+
+def test_TS001(template_steps, record_metrics, admin_login: webdriver.Edge | webdriver.Chrome):
+    """
+    Admin Long Template At Volume: Open /admin/treatment-plans, select a template of the seeded length until every step is listed, then add one more step (PT005).
+    """
+    driver = admin_login
+    start = time.monotonic()
+    driver.get(f"{config.BASE_URL}{treatment.ADMIN_TREATMENT_PATH}")
+    treatment.wait_for_heading(driver, "Treatment Plans")
+    page_ms = (time.monotonic() - start) * 1000
+
+    treatment.select_item_by_text(treatment.find_card_by_title(driver, "Diagnoses"), ADMIN_DIAGNOSIS)
+    treatment.select_item_by_text(treatment.find_card_by_title(driver, "Templates"), ADMIN_TEMPLATE)
+
+    def listed(drv) -> int:
+        return len(treatment.find_card_by_title(drv, "Workflow Steps").find_elements(By.XPATH, ADMIN_STEPS_XPATH))
+
+    steps_ms = count_until(driver, listed, template_steps)
+
+    start = time.monotonic()
+    treatment.add_template_step(driver, ADMIN_TEMPLATE, f"Step-TS001-{RUN_ID}")
+    add_ms = (time.monotonic() - start) * 1000
+
+    record_metrics("admin template", page=page_ms, steps=steps_ms, add_step=add_ms, template_steps=template_steps)
+    assert listed(driver) == template_steps + 1, f"FAILED: added step not listed after {template_steps} steps"
+
+
+def test_TS002(template_steps, record_metrics, doctor_login: webdriver.Edge | webdriver.Chrome):
+    """
+    Doctor Search And Assign Long Template At Volume: Search a diagnosis on a patient page, preview its template and assign it (PT010/PT012); record each step's latency.
+    """
+    driver = doctor_login
+    driver.get(f"{config.BASE_URL}{DOCTOR_PATIENT_PATH}")
+    WebDriverWait(driver, RENDER_TIMEOUT).until(
+        EC.element_to_be_clickable((By.XPATH, "//button[@role='combobox'][contains(., 'Select diagnosis...')]"))
+    ).click()
+    search_box = WebDriverWait(driver, treatment.WAIT_TIME).until(
+        EC.presence_of_element_located((By.CSS_SELECTOR, "input[placeholder='Search diagnosis...']"))
+    )
+
+    start = time.monotonic()
+    search_box.send_keys(ASSIGN_DIAGNOSIS)
+    option = WebDriverWait(driver, RENDER_TIMEOUT, poll_frequency=0.05).until(
+        EC.element_to_be_clickable((By.XPATH, f"//div[contains(text(), '{ASSIGN_DIAGNOSIS}')]"))
+    )
+    search_ms = (time.monotonic() - start) * 1000
+
+    # The patient's current plan may already be shown with its own steps; the preview adds the template's.
+    def roadmap_steps(drv) -> int:
+        return len(drv.find_elements(By.XPATH, ROADMAP_STEPS_XPATH))
+
+    shown = roadmap_steps(driver)
+    option.click()
+    preview_ms = count_until(driver, roadmap_steps, shown + template_steps)
+
+    start = time.monotonic()
+    WebDriverWait(driver, treatment.WAIT_TIME).until(
+        EC.element_to_be_clickable((By.XPATH, "//button[text()='Assign Treatment Plan']"))
+    ).click()
+    treatment.wait_for_toast(driver, "assigned")
+    assign_ms = (time.monotonic() - start) * 1000
+
+    record_metrics("doctor assign template", search=search_ms, preview=preview_ms, assign=assign_ms, template_steps=template_steps)
+
+
+def test_TS003(template_steps, record_metrics, patient_login: webdriver.Edge | webdriver.Chrome):
+    """
+    Patient Roadmap At Volume: Open /patient/treatment-plan and time until every step of the active plan's roadmap is shown (PT016).
+    """
+    driver = patient_login
+    driver.execute_cdp_cmd("Performance.enable", {})
+    start = time.monotonic()
+    driver.get(f"{config.BASE_URL}{treatment.PATIENT_PATH}")
+    WebDriverWait(driver, RENDER_TIMEOUT, poll_frequency=0.05).until(
+        lambda d: len(d.find_elements(By.XPATH, ROADMAP_STEPS_XPATH)) >= template_steps
+    )
+    roadmap_ms = (time.monotonic() - start) * 1000
+    performance = {m["name"]: m["value"] for m in driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]}
+
+    record_metrics("patient roadmap", render=roadmap_ms, dom_nodes=int(performance["Nodes"]), template_steps=template_steps)
+    scaling.assert_flat("patient roadmap ms", roadmap_ms, template_steps, local_stack.TEMPLATE_VOLUMES, "steps")
+
+
+def test_TS004(template_steps, record_metrics, patient_login: webdriver.Edge | webdriver.Chrome):
+    """
+    Patient Book Step From Long Roadmap At Volume: Click Book Appointment on a pending roadmap step and time the redirect to the prefilled booking form (PT017).
+    """
+    driver = patient_login
+    driver.get(f"{config.BASE_URL}{treatment.PATIENT_PATH}")
+    book_link = WebDriverWait(driver, RENDER_TIMEOUT).until(EC.element_to_be_clickable((By.CSS_SELECTOR, BOOK_STEP_SELECTOR)))
+    driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", book_link)
+
+    start = time.monotonic()
+    book_link.click()
+    WebDriverWait(driver, RENDER_TIMEOUT, poll_frequency=0.05).until(EC.url_contains("/patient/book"))
+    WebDriverWait(driver, RENDER_TIMEOUT).until(EC.presence_of_element_located((By.XPATH, "//h1[normalize-space()='Book Appointment']")))
+    redirect_ms = (time.monotonic() - start) * 1000
+
+    record_metrics("patient book from roadmap", redirect=redirect_ms, template_steps=template_steps)
+    assert "stepId=" in driver.current_url, f"FAILED: booking form not prefilled from the roadmap step: {driver.current_url}"
+    scaling.assert_flat("book from roadmap ms", redirect_ms, template_steps, local_stack.TEMPLATE_VOLUMES, "steps")
@@ -1,7 +1,9 @@
 import config
+import json
 import time
 from datetime import datetime
 
+import pytest
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
@@ -12,6 +14,22 @@ from selenium.webdriver.support.ui import WebDriverWait
 TIMELINE_PATH = "/timeline"
 WAIT_TIME = 15
 CARD_XPATH = "//div[contains(@class,'tracking-tight')]/ancestor::div[contains(@class,'rounded-lg') and contains(@class,'border')][1]"
+EMPTY_STATE_TEXT = "No activities found matching your criteria."
+
+# Backend-neutral equivalents of get_cards/extract_card_data, evaluated in the page.
+CARD_DATA_JS = """
+(() => {
+    const cards = document.evaluate(%s, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    return Array.from({length: cards.snapshotLength}, (_, i) => {
+        const card = cards.snapshotItem(i);
+        const title = card.querySelector("div[class*='tracking-tight']");
+        const ts = card.querySelector("span[class*='text-xs'][class*='text-muted-foreground']");
+        return {title: title ? title.innerText.trim() : "", timestamp_text: ts ? ts.innerText.trim() : ""};
+    });
+})()
+""" % json.dumps(CARD_XPATH)
+HEADING_VISIBLE_JS = "Array.from(document.querySelectorAll('h2')).some(h => h.textContent.trim() === 'Activity Log' && h.getClientRects().length > 0)"
+EMPTY_STATE_VISIBLE_JS = "Array.from(document.querySelectorAll('div')).some(d => Array.from(d.childNodes).some(n => n.nodeType === 3 && n.textContent.includes(%s)) && d.getClientRects().length > 0)" % json.dumps(EMPTY_STATE_TEXT)
 
 
 def wait_for_heading_and_cards(driver, min_cards: int = 1):
@@ -22,6 +40,11 @@ def wait_for_heading_and_cards(driver, min_cards: int = 1):
     return get_cards(driver)
 
 
+def wait_for_card_data(browser, min_cards: int = 1) -> list[dict]:
+    browser.wait_until(f"{HEADING_VISIBLE_JS} && {CARD_DATA_JS}.length >= {min_cards}", WAIT_TIME)
+    return browser.evaluate(CARD_DATA_JS)
+
+
 def get_cards(driver):
     return driver.find_elements(By.XPATH, CARD_XPATH)
 
@@ -124,23 +147,18 @@ def select_calendar_day(driver, dt: datetime):
     raise TimeoutError("FAILED:Could not select date in calendar (headless-safe)")
 
 
-def scroll_to_bottom(driver):
-    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-    time.sleep(1)
-
-
-def test_TL001(patient_login:webdriver.Edge | webdriver.Chrome):
+@pytest.mark.read_only
+@pytest.mark.benchmark
+def test_TL001(patient_browser):
     """
     Initial Timeline Load: Open timeline for a patient and verify records load and render.
     """
-    driver = patient_login
-    driver.get(f"{config.BASE_URL}{TIMELINE_PATH}")
+    browser = patient_browser
+    browser.get(f"{config.BASE_URL}{TIMELINE_PATH}")
 
-    cards = wait_for_heading_and_cards(driver, min_cards=1)
-    card_data = [extract_card_data(c) for c in cards]
+    card_data = wait_for_card_data(browser, min_cards=1)
 
-    empty_state = driver.find_elements(By.XPATH, "//div[contains(text(),'No activities found matching your criteria.')]")
-    assert not empty_state or not empty_state[0].is_displayed(), "FAILED:Unexpected empty state displayed"
+    assert not browser.evaluate(EMPTY_STATE_VISIBLE_JS), "FAILED:Unexpected empty state displayed"
     assert all(data["title"] for data in card_data), "FAILED:Card title missing"
 
     if len(card_data) >= 2:
@@ -250,22 +268,23 @@ def test_TL006(patient_login:webdriver.Edge | webdriver.Chrome):
     wait_for_heading_and_cards(driver, min_cards=2)
 
 
-def test_TL008(patient_login:webdriver.Edge | webdriver.Chrome):
+@pytest.mark.read_only
+@pytest.mark.benchmark
+def test_TL008(patient_browser):
     """
     Pagination and Infinite Scroll: Scroll through timeline with many records and verify pagination or infinite load works.
     """
-    driver = patient_login
-    driver.get(f"{config.BASE_URL}{TIMELINE_PATH}")
+    browser = patient_browser
+    browser.get(f"{config.BASE_URL}{TIMELINE_PATH}")
 
-    cards = wait_for_heading_and_cards(driver, min_cards=2)
-    titles_before = [extract_card_data(c)["title"] for c in cards]
-    count_before = len(cards)
+    cards = wait_for_card_data(browser, min_cards=2)
+    titles_before = [data["title"] for data in cards]
 
-    scroll_to_bottom(driver)
-    cards_after = get_cards(driver)
-    titles_after = [extract_card_data(c)["title"] for c in cards_after]
+    browser.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+    time.sleep(1)
+    titles_after = [data["title"] for data in browser.evaluate(CARD_DATA_JS)]
 
-    assert count_before == len(cards_after), "FAILED:Card count changed after scroll"
+    assert len(titles_before) == len(titles_after), "FAILED:Card count changed after scroll"
     assert titles_before == titles_after, "FAILED:Order changed after scroll"
 
 
@@ -0,0 +1,170 @@
+import json
+import os
+import re
+import statistics
+import sys
+import time
+from urllib.parse import urlparse
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+
+# Network values follow DevTools conventions: latency in ms, throughput in bytes per second.
+PROFILES = {
+    "none": {"network": None, "cpu": 1},
+    "3g-slow": {"network": {"latency": 2000, "downloadThroughput": 50 * 1024, "uploadThroughput": 50 * 1024}, "cpu": 1},
+    "3g-fast": {"network": {"latency": 563, "downloadThroughput": 180 * 1024, "uploadThroughput": 84 * 1024}, "cpu": 1},
+    "clinic-dsl": {"network": {"latency": 80, "downloadThroughput": 1024 * 1024 // 8, "uploadThroughput": 256 * 1024 // 8}, "cpu": 1},
+    "cpu-4x": {"network": None, "cpu": 4},
+    "clinic-pc": {"network": {"latency": 80, "downloadThroughput": 1024 * 1024 // 8, "uploadThroughput": 256 * 1024 // 8}, "cpu": 4},
+}
+BASELINE_PROFILE = "none"
+TIMINGS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".route_timings")
+NEAR_TIMEOUT_SHARE = 0.8
+UUID_PATTERN = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", re.IGNORECASE)
+
+NAVIGATION_TIMING_JS = """
+(() => {
+    const nav = performance.getEntriesByType('navigation')[0];
+    return nav ? {ttfb: nav.responseStart, dom_content_loaded: nav.domContentLoadedEventEnd, load: nav.loadEventEnd} : null;
+})()
+"""
+
+
+def apply_profile(send, name: str):
+    """
+    Apply a named profile to one tab. `send(method, params)` issues a CDP command, e.g. driver.execute_cdp_cmd.
+    """
+    profile = PROFILES[name]
+    if profile["network"]:
+        send("Network.enable", {})
+        send("Network.emulateNetworkConditions", {"offline": False, **profile["network"]})
+    if profile["cpu"] > 1:
+        send("Emulation.setCPUThrottlingRate", {"rate": profile["cpu"]})
+
+
+def route_of(url: str) -> str:
+    """
+    Map a URL to its app route, e.g. /doctor/patients/<uuid> to /doctor/patients/[id].
+    """
+    return UUID_PATTERN.sub("[id]", urlparse(url).path) or "/"
+
+
+def record_navigations(target, evaluate, timings: dict[str, list[dict]]):
+    """
+    Wrap target.get so every full page load records its Navigation Timing under the route it loaded.
+    """
+    original_get = target.get
+
+    def get(url: str):
+        original_get(url)
+        metrics = evaluate(NAVIGATION_TIMING_JS)
+        if metrics:
+            timings.setdefault(route_of(url), []).append(metrics)
+
+    target.get = get
+
+
+def timings_path(profile: str) -> str:
+    return os.path.join(TIMINGS_DIR, f"{profile}.json")
+
+
+def save_timings(profile: str, timings: dict[str, list[dict]]):
+    """
+    Store the routes this run loaded under the profile; routes it did not load (-k, one module) keep their samples.
+    """
+    os.makedirs(TIMINGS_DIR, exist_ok=True)
+    merged = {**load_timings(profile), **timings}
+    with open(timings_path(profile), "w", encoding="utf-8") as f:
+        json.dump(merged, f, indent=2)
+
+
+def load_timings(profile: str) -> dict[str, list[dict]]:
+    if not os.path.exists(timings_path(profile)):
+        return {}
+    with open(timings_path(profile), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def median_metric(samples: list[dict], metric: str) -> float:
+    return statistics.median(sample[metric] for sample in samples)
+
+
+def compare_routes(profile: str, timings: dict[str, list[dict]], baseline: dict[str, list[dict]]) -> list[str]:
+    """
+    Lines of a per-route table, slowest relative to the baseline first.
+    """
+    rows = []
+    for route, samples in timings.items():
+        load = median_metric(samples, "load")
+        base = median_metric(baseline[route], "load") if route in baseline else None
+        rows.append((load / base if base else 0.0, route, base, load, median_metric(samples, "ttfb")))
+    lines = [f"{'route':<40}{'baseline load ms':>18}{profile + ' load ms':>22}{'ttfb ms':>10}{'slowdown':>10}"]
+    for ratio, route, base, load, ttfb in sorted(rows, reverse=True):
+        base_text = f"{base:.0f}" if base else "-"
+        ratio_text = f"{ratio:.1f}x" if ratio else "-"
+        lines.append(f"{route:<40}{base_text:>18}{load:>22.0f}{ttfb:>10.0f}{ratio_text:>10}")
+    return lines
+
+
+# Modules whose time.sleep wrappers may call each other.
+SLEEP_WRAPPERS = {"throttling.py", "wait_profiler.py"}
+
+
+class WaitMonitor:
+    """
+    Tracks, per test, explicit waits that timed out or came close to their timeout, and blind sleeps taken in test code.
+    """
+
+    def __init__(self):
+        self.current: str | None = None
+        self.waits: dict[str, list[str]] = {}
+        self.sleeps: dict[str, float] = {}
+        self.flags: dict[str, list[str]] = {}
+
+    def install(self, monkeypatch):
+        monitor = self
+        original_until = WebDriverWait.until
+        original_until_not = WebDriverWait.until_not
+        original_sleep = time.sleep
+
+        def _timed(original):
+            def wrapper(wait, method, message: str = ""):
+                start = time.monotonic()
+                try:
+                    return original(wait, method, message)
+                except TimeoutException:
+                    monitor._note_wait(f"wait timed out after {wait._timeout:g}s")
+                    raise
+                finally:
+                    elapsed = time.monotonic() - start
+                    if NEAR_TIMEOUT_SHARE * wait._timeout <= elapsed < wait._timeout:
+                        monitor._note_wait(f"wait used {elapsed:.1f}s of {wait._timeout:g}s")
+            return wrapper
+
+        def sleep(seconds: float):
+            # Only sleeps written in the test modules count; Selenium polls with time.sleep too. Under --profile-waits
+            # the profiler's own time.sleep wrapper sits between the caller and this one.
+            caller = sys._getframe(1)
+            while caller and os.path.basename(caller.f_code.co_filename) in SLEEP_WRAPPERS:
+                caller = caller.f_back
+            if caller and os.path.basename(caller.f_code.co_filename).startswith("test_") and monitor.current:
+                monitor.sleeps[monitor.current] = monitor.sleeps.get(monitor.current, 0.0) + seconds
+            original_sleep(seconds)
+
+        monkeypatch.setattr(WebDriverWait, "until", _timed(original_until))
+        monkeypatch.setattr(WebDriverWait, "until_not", _timed(original_until_not))
+        monkeypatch.setattr(time, "sleep", sleep)
+
+    def _note_wait(self, text: str):
+        if self.current:
+            self.waits.setdefault(self.current, []).append(text)
+
+    def finish(self, nodeid: str, failed: bool):
+        flags = list(dict.fromkeys(self.waits.get(nodeid, [])))
+        if failed and self.sleeps.get(nodeid):
+            flags.append(f"failed after {self.sleeps[nodeid]:g}s of blind time.sleep")
+        if flags:
+            self.flags[nodeid] = flags
+        self.current = None
@@ -0,0 +1,149 @@
+import functools
+import os
+import sys
+import time
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.support.ui import WebDriverWait
+
+
+# Shared helpers of the test modules whose total cost is reported separately.
+HELPERS = ("wait_for_toast", "wait_for_dialog_closed", "wait_for_toasts_to_clear", "select_calendar_day", "open_add_dialog")
+# Where the time goes. Navigation and long polling waits are the app being slow; the rest is harness overhead.
+CATEGORIES = {
+    "sleep": "blind time.sleep",
+    "wait_immediate": "waits satisfied on the first poll",
+    "wait_long": "waits that polled until satisfied",
+    "wait_timeout": "waits that timed out",
+    "command": "WebDriver command round trips",
+    "navigation": "page loads (driver.get)",
+}
+APP_CATEGORIES = ("wait_long", "navigation")
+TOP_OFFENDERS = 10
+
+
+def _call_site() -> str:
+    """
+    file:line of the innermost frame in a test module, e.g. the helper line that slept.
+    """
+    frame = sys._getframe(2)
+    while frame and not os.path.basename(frame.f_code.co_filename).startswith("test_"):
+        frame = frame.f_back
+    return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno}" if frame else "?"
+
+
+class WaitProfiler:
+    """
+    Splits each test's time into the CATEGORIES and totals time per call site and per shared helper.
+
+    Only the outermost wait, sleep or command is counted, so time is never counted twice: the polling sleeps and
+    find_element calls inside a WebDriverWait belong to the wait.
+    """
+
+    def __init__(self):
+        self.current: str | None = None
+        self.tests: dict[str, dict[str, float]] = {}
+        self.sites: dict[str, list[float]] = {}
+        self.helpers: dict[str, list[float]] = {}
+        self._depth = 0
+        self._polls = 0
+
+    def install(self, monkeypatch, module):
+        profiler = self
+        original_execute = WebDriver.execute
+        original_sleep = time.sleep
+
+        def _wait(original):
+            def wrapper(wait, method, message: str = ""):
+                if profiler._depth:
+                    return original(wait, method, message)
+                site, start, category = _call_site(), time.monotonic(), "wait_long"
+                profiler._depth, profiler._polls = 1, 0
+                try:
+                    return original(wait, method, message)
+                except TimeoutException:
+                    category = "wait_timeout"
+                    raise
+                finally:
+                    profiler._depth = 0
+                    if category == "wait_long" and not profiler._polls:
+                        category = "wait_immediate"
+                    profiler._add(category, f"wait {site}", time.monotonic() - start)
+            return wrapper
+
+        def sleep(seconds: float):
+            if profiler._depth:
+                profiler._polls += 1
+                return original_sleep(seconds)
+            site, start = _call_site(), time.monotonic()
+            original_sleep(seconds)
+            profiler._add("sleep", f"sleep {site}", time.monotonic() - start)
+
+        def execute(driver, driver_command, params=None):
+            if profiler._depth:
+                return original_execute(driver, driver_command, params)
+            start = time.monotonic()
+            profiler._depth = 1
+            try:
+                return original_execute(driver, driver_command, params)
+            finally:
+                profiler._depth = 0
+                profiler._add("navigation" if driver_command == Command.GET else "command", None, time.monotonic() - start)
+
+        def _helper(name, original):
+            @functools.wraps(original)
+            def wrapper(*args, **kwargs):
+                start = time.monotonic()
+                try:
+                    return original(*args, **kwargs)
+                finally:
+                    profiler.helpers.setdefault(f"{module.__name__}.{name}", []).append(time.monotonic() - start)
+            return wrapper
+
+        monkeypatch.setattr(WebDriverWait, "until", _wait(WebDriverWait.until))
+        monkeypatch.setattr(WebDriverWait, "until_not", _wait(WebDriverWait.until_not))
+        monkeypatch.setattr(WebDriver, "execute", execute)
+        monkeypatch.setattr(time, "sleep", sleep)
+        for name in HELPERS:
+            if hasattr(module, name):
+                monkeypatch.setattr(module, name, _helper(name, getattr(module, name)))
+
+    def _add(self, category: str, site: str | None, seconds: float):
+        if not self.current:
+            return
+        test = self.tests.setdefault(self.current, dict.fromkeys(CATEGORIES, 0.0))
+        test[category] += seconds
+        if site:
+            self.sites.setdefault(site, []).append(seconds)
+
+    def report_lines(self, durations: dict[str, float]) -> list[str]:
+        """
+        Run totals per category, then the top tests by harness overhead, call sites and helpers.
+        `durations` are the tests' total seconds; what no category explains is test code and fixtures.
+        """
+        total = sum(durations.get(nodeid, 0.0) for nodeid in self.tests) or 1.0
+        lines = [f"{'':<40}{'s':>10}{'share':>8}"]
+        for category, label in CATEGORIES.items():
+            seconds = sum(test[category] for test in self.tests.values())
+            lines.append(f"{label:<40}{seconds:>10.1f}{seconds / total:>8.0%}")
+        unexplained = total - sum(sum(test.values()) for test in self.tests.values())
+        lines.append(f"{'other (test code, fixtures, browser)':<40}{unexplained:>10.1f}{unexplained / total:>8.0%}")
+
+        overhead = {nodeid: sum(v for k, v in test.items() if k not in APP_CATEGORIES) for nodeid, test in self.tests.items()}
+        lines += ["", f"tests with the most harness overhead (s): {'  '.join(CATEGORIES)}"]
+        for nodeid in sorted(overhead, key=overhead.get, reverse=True)[:TOP_OFFENDERS]:
+            test = self.tests[nodeid]
+            lines.append(f"{overhead[nodeid]:>7.1f}  {nodeid}  (" + ", ".join(f"{test[k]:.1f}" for k in CATEGORIES) + ")")
+
+        lines += ["", "call sites by total time (s, calls):"]
+        for site in sorted(self.sites, key=lambda s: sum(self.sites[s]), reverse=True)[:TOP_OFFENDERS]:
+            lines.append(f"{sum(self.sites[site]):>7.1f}  {len(self.sites[site]):>4}  {site}")
+
+        if self.helpers:
+            lines += ["", "shared helpers by total time (s, calls, mean):"]
+            for name in sorted(self.helpers, key=lambda h: sum(self.helpers[h]), reverse=True)[:TOP_OFFENDERS]:
+                calls = self.helpers[name]
+                lines.append(f"{sum(calls):>7.1f}  {len(calls):>4}  {sum(calls) / len(calls):>5.2f}  {name}")
+        return lines
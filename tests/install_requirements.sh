@@ -1 +1 @@
-pip install selenium webdriver-manager pytest
\ No newline at end of file
+pip install selenium webdriver-manager pytest websockets requests
\ No newline at end of file
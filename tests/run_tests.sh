@@ -1,3 +1,3 @@
 cd ./Features
-python -m pytest -v
+python -m pytest -v "$@"
 cd ..
\ No newline at end of file